@@ -1,3 +1,8 @@
+import multiprocessing
+
 from . import run
 
-run()
+# Worker processes import this module too so only run the app from the main process
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
+    run()
@@ -0,0 +1,58 @@
+"""Helpers for plugins that process several models in one pass.
+
+Inputs with the same length and sample spacing are stacked side by side
+into a single frame so a transform that works column by column can
+handle all of their channels at once. The result is then split back
+into one frame per input.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+
+def sample_spacing(df: pd.DataFrame) -> float | None:
+    """Return the mean spacing between the rows in seconds, the same way endaq does."""
+    if len(df) <= 1:
+        return None
+    spacing = (df.index[-1] - df.index[0]) / (len(df) - 1)
+    if isinstance(spacing, (np.timedelta64, pd.Timedelta)):
+        spacing = spacing / np.timedelta64(1, "s")
+    return float(spacing)
+
+
+def stackable_groups(frames: list[pd.DataFrame]) -> list[list[int]]:
+    """Group the positions of the frames that can be stacked together.
+
+    Frames can be stacked if they have the same number of rows and the
+    same sample spacing. Groups are in the order of their first frame.
+    """
+    groups: dict[tuple, list[int]] = {}
+    for i, df in enumerate(frames):
+        groups.setdefault((len(df), sample_spacing(df)), []).append(i)
+    return list(groups.values())
+
+
+def stack(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Stack frames with the same number of rows side by side.
+
+    The columns are labelled by position since the frames may share
+    column names. The index of the first frame is used.
+    """
+    if len(frames) == 1:
+        return frames[0].set_axis(range(frames[0].shape[1]), axis="columns")
+
+    values = np.column_stack([df.to_numpy() for df in frames])
+    return pd.DataFrame(values, index=frames[0].index)
+
+
+def unstack(df: pd.DataFrame, frames: list[pd.DataFrame]) -> list[pd.DataFrame]:
+    """Split the result of transforming a stacked frame back into one frame per input."""
+    results = []
+    start = 0
+    for frame in frames:
+        part = df.iloc[:, start : start + frame.shape[1]]
+        results.append(part.set_axis(frame.columns, axis="columns"))
+        start += frame.shape[1]
+    return results
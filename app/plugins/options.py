@@ -9,8 +9,11 @@ class DataOption:
 @dataclass
 class NumericOption(DataOption):
     value: int | float
-    min: int | float
-    max: int | float
+    # None leaves the value unbounded. A max of 0 does too.
+    min: int | float | None
+    max: int | float | None
+    # Only used by float values
+    decimals: int = 2
 
 
 @dataclass
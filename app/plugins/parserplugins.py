@@ -1,10 +1,22 @@
+import csv
+import io
+import logging
+import os
 from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 from yapsy.IPlugin import IPlugin
+from yapsy.PluginManager import PluginManager
 
+from app.plugins.options import DataOption
+from app.plugins.progress import Cancelled, Progress, call_with_progress
 from app.utils import generate_time_index
+from app.utils.catalog import RecordingSummary
+from app.utils.compression import data_extension, is_compressed, open_binary
 from app.views import ViewModel
 
 
@@ -21,28 +33,283 @@ class ParserPlugin(IPlugin, ABC):
     def supported_extensions() -> tuple[str]:
         pass
 
+    @staticmethod
+    def reads_compressed() -> bool:
+        """Return whether files can be parsed when compressed or within an archive.
+
+        Only parsers that read files through open_binary can. Those that
+        need a real file, e.g. to memory map it, can't.
+        """
+        return False
+
+    def sniff(self, header: bytes) -> float:
+        """Return how confident this parser is that it can parse a file.
+
+        The header contains the first bytes of the file. 1.0 means the file
+        is certainly supported, 0.0 means it certainly isn't and the parser
+        won't be tried. The default of 0.5 is for parsers that can't tell.
+        """
+        return 0.5
+
+    def load_options(self, file: Path) -> dict[str, DataOption]:
+        """Return the options the user can choose from before the file is parsed.
+
+        Parsers that can cheaply scan a file's contents use this to let the
+        user pick what gets loaded. The chosen values are passed to parse
+        as keyword arguments. No options are shown by default.
+        """
+        return {}
+
+    def options_cancelled(self, file: Path) -> None:
+        """Called instead of parse when the user cancels choosing the load options.
+
+        Parsers that keep anything open from load_options for parse to
+        use should release it here.
+        """
+        pass
+
     @abstractmethod
     def parse(self, file: Path, **kwargs) -> ViewModel:
+        """Parse the file into a model.
+
+        Parsers that add a progress keyword argument are passed a Progress
+        to report how much is done and check whether to stop.
+        """
         pass
 
+    def summarize(self, file: Path) -> RecordingSummary:
+        """Return a summary of the file for the catalog.
+
+        Parses the whole file by default. Parsers that can read the
+        summary from the file's metadata should override this.
+        """
+        return RecordingSummary.from_df(self.parse(file).df)
+
+
+ChooseOptions = Callable[[Path, dict[str, DataOption]], dict | None]
+
+
+class ParserRegistry:
+    """Picks the parser for a file by sniffing the start of its contents.
+
+    The first bytes of the file are read once and passed to the sniff method
+    of each parser supporting the file's extension. The parser with the
+    highest confidence is used. Lower ranked parsers are only tried if
+    it fails to parse the file.
+    """
+
+    header_size = 8192
+
+    def __init__(self, parsers: Iterable[ParserPlugin] = ()) -> None:
+        self._parsers = list(parsers)
+
+    def __iter__(self):
+        return iter(self._parsers)
+
+    @property
+    def supported_extensions(self) -> list[str]:
+        exts = set()
+        for parser in self._parsers:
+            exts.update(ext.lower() for ext in parser.supported_extensions())
+        return list(exts)
+
+    @property
+    def compressible_extensions(self) -> list[str]:
+        """The extensions of the parsers that can read compressed files."""
+        exts = set()
+        for parser in self._parsers:
+            if parser.reads_compressed():
+                exts.update(ext.lower() for ext in parser.supported_extensions())
+        return list(exts)
+
+    def read_header(self, file: Path) -> bytes:
+        with open_binary(file) as f:
+            return f.read(self.header_size)
+
+    def rank(self, file: Path, header: bytes) -> list[ParserPlugin]:
+        """Return the parsers that may support the file, most confident first."""
+        ext = data_extension(file)
+        compressed = is_compressed(file)
+        scores = []
+        for parser in self._parsers:
+            if compressed and not parser.reads_compressed():
+                continue
+            if ext in (e.lower() for e in parser.supported_extensions()):
+                score = parser.sniff(header)
+                if score > 0:
+                    scores.append((score, parser))
+
+        # sorted is stable so ties keep the plugin load order
+        return [parser for _, parser in sorted(scores, key=lambda s: -s[0])]
+
+    def parse(
+        self,
+        file: Path,
+        header: bytes | None = None,
+        choose_options: ChooseOptions | None = None,
+        progress: Progress | None = None,
+    ) -> ViewModel | None:
+        """Parse the file with the most confident parser that succeeds.
+
+        If a parser has load options they are passed to choose_options,
+        which returns the chosen values or None to cancel parsing the file.
+        Cancelled is raised if parsing is cancelled through the progress.
+        """
+        if header is None:
+            header = self.read_header(file)
+
+        for parser in self.rank(file, header):
+            try:
+                values = {}
+                if choose_options is not None:
+                    options = parser.load_options(file)
+                    if options:
+                        values = choose_options(file, options)
+                        if values is None:
+                            parser.options_cancelled(file)
+                            return None
+                return call_with_progress(
+                    parser.parse, file, progress=progress, **values
+                )
+            except Cancelled:
+                raise
+            except ParseError:
+                pass
+            except Exception:
+                logging.exception(__name__)
+        return None
+
+    def summarize(self, file: Path) -> RecordingSummary | None:
+        header = self.read_header(file)
+        for parser in self.rank(file, header):
+            try:
+                return parser.summarize(file)
+            except ParseError:
+                pass
+            except Exception:
+                logging.exception(__name__)
+        return None
+
+
+def load_parsers(plugin_path: str) -> ParserRegistry:
+    """Load only the parser plugins, e.g. within a worker process."""
+    pm = PluginManager()
+    pm.setPluginInfoExtension("plugin")
+    pm.setPluginPlaces([os.path.join(plugin_path, "parsers")])
+    pm.setCategoriesFilter({"parsers": ParserPlugin})
+    pm.collectPlugins()
+    return ParserRegistry(
+        plugin.plugin_object for plugin in pm.getPluginsOfCategory("parsers")
+    )
+
+
+def header_lines(header: bytes, encoding: str = "iso-8859-1") -> list[str]:
+    """Split the header bytes into lines, dropping the last one if it may be incomplete."""
+    # Only split on newlines like read_header. splitlines also splits
+    # on characters such as form feeds that may appear within a line.
+    lines = header.split(b"\n")
+    # The last line is either empty or may be incomplete
+    return [line.decode(encoding).rstrip("\r") for line in lines[:-1]]
+
+
+@dataclass
+class FileHeader:
+    """The first lines of a file along with the byte offset of each line.
+
+    Lines are numbered as they appear in the file. Rows are numbered the
+    way Pandas counts them for its header argument, skipping blank lines.
+    """
+
+    lines: list[str]
+    offsets: list[int]
+
+    def line(self, number: int) -> str:
+        """Return the line with the given line number, starting from 1."""
+        if number > len(self.lines):
+            return ""
+        return self.lines[number - 1]
+
+    def offset(self, number: int) -> int:
+        """Return the byte offset of the start of the given line number, starting from 1."""
+        return self.offsets[min(number, len(self.offsets)) - 1]
+
+    def row(self, number: int) -> str:
+        """Return the row with the given row number, starting from 1."""
+        return self.line(self._row_line(number))
+
+    def row_offset(self, number: int) -> int:
+        """Return the byte offset of the start of the given row number, starting from 1."""
+        return self.offset(self._row_line(number))
+
+    def _row_line(self, number: int) -> int:
+        for i, line in enumerate(self.lines, 1):
+            if line.strip():
+                number -= 1
+                if not number:
+                    return i
+        # Past the end of the lines that were read
+        return len(self.lines) + 1
+
+
+def read_header(file: Path, row_count: int, encoding: str = "iso-8859-1") -> FileHeader:
+    """Read only the first lines of a file, up to the given number of rows.
+
+    Blank lines don't count as rows, as Pandas skips them. The offsets
+    let the data be read starting after the header without having to
+    skip over the header lines again.
+    """
+    lines = []
+    offsets = [0]
+    with open_binary(file) as f:
+        while row_count > 0:
+            # Limit the line length in case this isn't a text file
+            line = f.readline(65536)
+            if not line:
+                break
+            # Only keep the start of a longer line but skip to its end
+            end = line
+            while not end.endswith(b"\n"):
+                end = f.readline(65536)
+                if not end:
+                    break
+            text = line.decode(encoding).rstrip("\r\n")
+            lines.append(text)
+            offsets.append(f.tell())
+            if text.strip():
+                row_count -= 1
+    return FileHeader(lines, offsets)
+
 
 class CSVParser(ParserPlugin):
     @staticmethod
     def supported_extensions() -> tuple[str]:
         return ("csv",)
 
+    @staticmethod
+    def reads_compressed() -> bool:
+        return True
+
     def _parse_to_df(
         self,
         file: Path,
         header_row: int = 1,
         index_type: str | None = None,
         sample_rate: int | None = None,
+        offset: int = 0,
         **kwargs,
     ) -> pd.DataFrame:
+        """Read the file into a DataFrame.
+
+        If an offset is given the file is read starting at that byte
+        and the header row is counted from there.
+        """
         if index_type:
             index_type = index_type.lower()
 
-        df = pd.read_csv(file, header=header_row - 1, **kwargs)
+        # Compressed files are decompressed as they are read
+        with open_binary(file) as f:
+            f.seek(offset)
+            df = pd.read_csv(f, header=header_row - 1, **kwargs)
         
         for col in df:
             df[col] = pd.to_numeric(df[col], errors="coerce")
@@ -62,11 +329,7 @@ class CSVParser(ParserPlugin):
             index = generate_time_index(sample_rate, size=len(df))
             df.set_index(index, inplace=True)
         elif index_type and index_type != "number":
-            time_units = index_type
-            if index_type == "timestamp":
-                time_units = None
-
-            index = pd.to_timedelta(df.index, unit=time_units) #type: ignore
+            index = pd.to_timedelta(df.index, unit=_time_units(index_type)) #type: ignore
             index = index - index[0]
             df.set_index(index, inplace=True)
         if df.index.inferred_type == "timedelta64":
@@ -83,3 +346,117 @@ class CSVParser(ParserPlugin):
     ) -> ViewModel:
         df = self._parse_to_df(file=file, **kwargs)
         return ViewModel(df, y_axis=y_axis_title)
+
+
+class CSVTail:
+    """Reads the rows appended to a CSV file since it was parsed by CSVParser.
+
+    The rows are converted using the same settings the file was parsed
+    with. Only complete lines are read so a row that is still being
+    written is left until the next read. Pass the offset and rows of a
+    previous tail to carry on from where it stopped.
+    """
+
+    def __init__(
+        self,
+        file: Path,
+        columns: list[str],
+        rows: int,
+        header_row: int = 1,
+        index_type: str | None = None,
+        sample_rate: int | None = None,
+        encoding: str = "utf-8",
+        offset: int | None = None,
+        **kwargs,
+    ) -> None:
+        self._file = file
+        self._columns = columns
+        self._rows = rows
+        self._index_type = index_type.lower() if index_type else None
+        self._sample_rate = sample_rate
+        self._kwargs = dict(kwargs, encoding=encoding)
+
+        line = read_header(file, header_row, encoding).row(header_row)
+        fields = next(csv.reader([line], quoting=csv.QUOTE_MINIMAL), [])
+        # Use the same names Pandas gives to blank headers
+        self._names = [field or f"Unnamed: {i}" for i, field in enumerate(fields)]
+
+        self._origin = None
+        if not sample_rate and self._index_type and self._index_type != "number":
+            first = pd.read_csv(file, header=header_row - 1, nrows=1, **self._kwargs)
+            units = _time_units(self._index_type)
+            self._origin = pd.to_timedelta(first.index, unit=units)[0] #type: ignore
+
+        if offset is None:
+            offset = self._find_offset(header_row + rows)
+        self._offset = offset
+
+    @property
+    def offset(self) -> int:
+        """The byte offset the next read starts from."""
+        return self._offset
+
+    @property
+    def rows(self) -> int:
+        """The number of rows parsed and read from the file so far."""
+        return self._rows
+
+    def _find_offset(self, lines: int) -> int:
+        """Return the byte offset after the given number of lines.
+
+        Blank lines aren't counted since Pandas skips them.
+        """
+        offset = 0
+        with self._file.open("rb") as f:
+            for line in f:
+                if not lines:
+                    break
+                offset += len(line)
+                if line.strip():
+                    lines -= 1
+        return offset
+
+    def read(self) -> pd.DataFrame | None:
+        """Return the rows appended since the last read or None if there aren't any."""
+        if self._file.stat().st_size <= self._offset:
+            return None
+
+        with self._file.open("rb") as f:
+            f.seek(self._offset)
+            data = f.read()
+
+        end = data.rfind(b"\n")
+        if end < 0:
+            return None
+        data = data[: end + 1]
+        self._offset += len(data)
+
+        df = pd.read_csv(io.BytesIO(data), header=None, names=self._names, **self._kwargs)
+        for col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+        df = df.reindex(columns=self._columns)
+        if df.empty:
+            return None
+
+        if self._sample_rate:
+            # Continue on from the index generated by generate_time_index
+            spacing = int(1_000_000_000 / self._sample_rate)
+            values = np.arange(self._rows, self._rows + len(df)) * spacing
+            df.index = pd.to_timedelta(values, unit="ns")
+        elif self._origin is not None:
+            units = _time_units(self._index_type) #type: ignore
+            df.index = pd.to_timedelta(df.index, unit=units) - self._origin #type: ignore
+        elif self._kwargs.get("index_col") in (None, False):
+            df.index = pd.RangeIndex(self._rows, self._rows + len(df))
+
+        if df.index.inferred_type == "timedelta64":
+            df.index.rename("Time (s)", inplace=True)
+
+        self._rows += len(df)
+        return df
+
+
+def _time_units(index_type: str) -> str | None:
+    if index_type == "timestamp":
+        return None
+    return index_type
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import inspect
+import threading
+from collections.abc import Callable
+
+
+class Cancelled(Exception):
+    pass
+
+
+class Progress:
+    """Lets a long running plugin report how much is done and be cancelled.
+
+    Passed to plugins whose process or parse method has a progress
+    keyword argument. Plugins report the fraction done between blocks of
+    work and call check, which raises Cancelled once the user has asked
+    to stop. Plugins without the argument are called as before.
+    """
+
+    def __init__(self, callback: Callable[[float], None] | None = None) -> None:
+        self._callback = callback
+        self._cancelled = threading.Event()
+        # The range of the overall progress this reports within
+        self._start = 0.0
+        self._end = 1.0
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    def check(self) -> None:
+        """Raise Cancelled if the task has been cancelled."""
+        if self._cancelled.is_set():
+            raise Cancelled()
+
+    def report(self, fraction: float) -> None:
+        """Report the fraction of the task that is done, from 0 to 1."""
+        if self._callback is not None:
+            fraction = min(max(fraction, 0.0), 1.0)
+            self._callback(self._start + fraction * (self._end - self._start))
+
+    def sub(self, start: float, end: float) -> "Progress":
+        """Return a Progress for a part of this task, e.g. one of several models.
+
+        The part reports from 0 to 1 which is scaled to the range between
+        start and end of this task. Cancelling either cancels both.
+        """
+        progress = Progress(self._callback)
+        progress._cancelled = self._cancelled
+        progress._start = self._start + start * (self._end - self._start)
+        progress._end = self._start + end * (self._end - self._start)
+        return progress
+
+
+def accepts_progress(func: Callable) -> bool:
+    try:
+        return "progress" in inspect.signature(func).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+def call_with_progress(func: Callable, *args, progress: Progress | None, **kwargs):
+    """Call a plugin method, passing progress only if the method accepts it."""
+    if progress is None:
+        return func(*args, **kwargs)
+
+    progress.check()
+    if accepts_progress(func):
+        result = func(*args, progress=progress, **kwargs)
+    else:
+        result = func(*args, **kwargs)
+    progress.check()
+    progress.report(1.0)
+    return result
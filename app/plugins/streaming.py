@@ -0,0 +1,163 @@
+"""Processing of data in chunks by plugins that support it.
+
+A plugin declares how it wants its input split with a ChunkSpec and
+transforms one chunk at a time. The host reads each chunk from a
+ChunkSource, along with any context rows, and passes the output
+straight to a ChunkSink.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+import pandas as pd
+
+from app.plugins.progress import Progress
+
+if TYPE_CHECKING:
+    from app.plugins.viewmodelplugin import ViewModelPlugin
+
+
+@dataclass(frozen=True)
+class ChunkSpec:
+    """How a plugin wants its input split into chunks."""
+
+    # Rows of output produced by each chunk
+    size: int = 1_000_000
+    # Rows before each chunk needed to prime the transform, e.g. the
+    # length of a rolling window. Only used as context.
+    warm_up: int = 0
+    # Rows on both sides of each chunk used as context, e.g. to let a
+    # filter settle before and after the chunk.
+    overlap: int = 0
+
+
+@dataclass
+class ChunkContext:
+    """Where a chunk is within the input."""
+
+    # Total number of rows in the input
+    rows: int
+    sample_rate: float
+    # Position of the first row of the chunk including the context rows
+    first_row: int = 0
+    # Positions of the rows the chunk produces output for
+    start: int = 0
+    stop: int = 0
+    # Lets plugins keep state between the chunks of a single run
+    state: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def last(self) -> bool:
+        return self.stop >= self.rows
+
+
+class ChunkSource(ABC):
+    @property
+    @abstractmethod
+    def rows(self) -> int:
+        pass
+
+    @property
+    @abstractmethod
+    def sample_rate(self) -> float:
+        pass
+
+    @abstractmethod
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        pass
+
+
+class DataFrameSource(ChunkSource):
+    def __init__(self, df: pd.DataFrame, sample_rate: float) -> None:
+        self._df = df
+        self._sample_rate = sample_rate
+
+    @property
+    def rows(self) -> int:
+        return len(self._df)
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    def read(self, start: int, stop: int) -> pd.DataFrame:
+        return self._df.iloc[start:stop]
+
+
+class ChunkSink(ABC):
+    @abstractmethod
+    def write(self, df: pd.DataFrame) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class FrameSink(ChunkSink):
+    """Collects the chunks into a single DataFrame."""
+
+    def __init__(self) -> None:
+        self._frames: list[pd.DataFrame] = []
+
+    def write(self, df: pd.DataFrame) -> None:
+        self._frames.append(df)
+
+    def result(self) -> pd.DataFrame:
+        if not self._frames:
+            return pd.DataFrame()
+        if len(self._frames) == 1:
+            return self._frames[0]
+        return pd.concat(self._frames)
+
+
+def run_chunks(
+    plugin: ViewModelPlugin,
+    source: ChunkSource,
+    sink: ChunkSink,
+    progress: Progress | None = None,
+    **kwargs,
+) -> None:
+    """Run a plugin over the source one chunk at a time, writing the output to the sink.
+
+    Each chunk is read along with the context rows the plugin asked for.
+    Only the output within the chunk's own range of the index is kept so
+    context rows never produce duplicate output. Progress is reported
+    and cancellation checked between chunks.
+    """
+    rows = source.rows
+    spec = plugin.chunk_spec(rows, source.sample_rate, **kwargs)
+    process_chunk = getattr(plugin, "process_chunk", None)
+    if spec is None or process_chunk is None:
+        raise ValueError(f"{plugin.name} doesn't support processing in chunks")
+
+    context = ChunkContext(rows, source.sample_rate)
+    size = max(spec.size, 1)
+    try:
+        for start in range(0, rows, size):
+            if progress is not None:
+                progress.check()
+            stop = min(start + size, rows)
+            first = max(start - spec.warm_up - spec.overlap, 0)
+            last = min(stop + spec.overlap, rows)
+            chunk = source.read(first, last)
+
+            context.first_row = first
+            context.start = start
+            context.stop = stop
+            output = process_chunk(chunk, context, **kwargs)
+
+            keep = output.index >= chunk.index[start - first]
+            if stop < rows:
+                keep &= output.index <= chunk.index[stop - first - 1]
+            sink.write(output[keep])
+            if progress is not None:
+                progress.report(stop / rows)
+
+        tail = plugin.finish_chunks(context, **kwargs)
+        if tail is not None:
+            sink.write(tail)
+    finally:
+        sink.close()
@@ -1,11 +1,16 @@
+import os
 from abc import ABC, abstractmethod
 
+import pandas as pd
 from yapsy.IPlugin import IPlugin
+from yapsy.PluginManager import PluginManager
 
 from PySide6.QtGui import QIcon
 
 from app.views import ViewModel
 from .options import DataOption
+from .progress import Progress, call_with_progress
+from .streaming import ChunkContext, ChunkSpec, DataFrameSource, FrameSink, run_chunks
 
 
 class ViewModelPlugin(IPlugin, ABC):
@@ -32,8 +37,53 @@ class ViewModelPlugin(IPlugin, ABC):
 
     @abstractmethod
     def process(self, model: ViewModel, **kwargs) -> ViewModel:
+        """Return a new model from the given one.
+
+        Plugins that add a progress keyword argument are passed a Progress
+        to report how much is done and check whether to stop.
+        """
         pass
 
+    def process_many(
+        self, models: list[ViewModel], progress: Progress | None = None, **kwargs
+    ) -> list[ViewModel]:
+        """Return a new model for each of the given models.
+
+        Used when the results of several models are combined into one view.
+        Plugins can override this to process the inputs that share a sample
+        rate in a single pass. Each model is processed on its own by default.
+        """
+        progress = progress or Progress()
+        results = []
+        for i, model in enumerate(models):
+            part = progress.sub(i / len(models), (i + 1) / len(models))
+            results.append(call_with_progress(self.process, model, progress=part, **kwargs))
+        return results
+
+    def chunk_spec(self, rows: int, sample_rate: float, **kwargs) -> ChunkSpec | None:
+        """Return how the input should be split to process it in chunks.
+
+        None means the plugin can only process the whole input at once.
+        Plugins that return a ChunkSpec must also define
+        process_chunk(chunk, context, **kwargs), which transforms a chunk
+        of the input including its context rows into a DataFrame. Any
+        output outside of the chunk's own rows is discarded.
+        """
+        return None
+
+    def finish_chunks(self, context: ChunkContext, **kwargs) -> pd.DataFrame | None:
+        """Return any output left over once every chunk has been processed."""
+        return None
+
+    def process_chunked(
+        self, model: ViewModel, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
+        """Process a model one chunk at a time using the streaming interface."""
+        sink = FrameSink()
+        source = DataFrameSource(model.df, model.sample_rate)
+        run_chunks(self, source, sink, progress, **kwargs)
+        return ViewModel(sink.result(), y_axis=model.y_axis)
+
 
 class FilterPlugin(ViewModelPlugin):
     pass
@@ -43,3 +93,15 @@ class ViewPlugin(ViewModelPlugin):
     @property
     def display_markers(self) -> bool:
         return False
+
+
+def load_plugins(plugin_path: str) -> list[ViewModelPlugin]:
+    """Load only the filter and view plugins, e.g. within a worker process."""
+    pm = PluginManager()
+    pm.setPluginInfoExtension("plugin")
+    pm.setPluginPlaces(
+        [os.path.join(plugin_path, "filters"), os.path.join(plugin_path, "views")]
+    )
+    pm.setCategoriesFilter({"dataframe": ViewModelPlugin})
+    pm.collectPlugins()
+    return [plugin.plugin_object for plugin in pm.getPluginsOfCategory("dataframe")]
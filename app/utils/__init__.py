@@ -60,6 +60,43 @@ def generate_time_index(sample_rate: int, size: int) -> pd.TimedeltaIndex:
     return pd.to_timedelta(values[:size], unit="ns")
 
 
+def index_to_float(index: pd.Index) -> np.ndarray:
+    """Convert a Pandas index into the float values used on the chart's x-axis."""
+
+    if index.inferred_type == "timedelta64":
+        return index.total_seconds().to_numpy(dtype=float) #type: ignore
+    elif index.inferred_type == "datetime64":
+        return (index.astype(np.int64) // 10**9).to_numpy(dtype=float)
+    return index.to_numpy(dtype=float)
+
+
+def valid_values(index: pd.Index, values: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Return the x and y values of a column without NaN values, sorted by x."""
+
+    x = index_to_float(index)
+    y = np.asarray(values, dtype=float)
+    valid = ~np.isnan(y)
+    x = x[valid]
+    y = y[valid]
+    if x.size and np.any(x[1:] < x[:-1]):
+        order = np.argsort(x, kind="stable")
+        x = x[order]
+        y = y[order]
+    return x, y
+
+
+def nearest_indices(values: np.ndarray, targets: np.ndarray) -> np.ndarray:
+    """Return the index of the nearest value for each target. Values must be sorted."""
+
+    if not values.size:
+        return np.empty(0, dtype=np.int64)
+
+    right = np.clip(np.searchsorted(values, targets), 0, values.size - 1)
+    left = np.clip(right - 1, 0, values.size - 1)
+    use_left = np.abs(targets - values[left]) <= np.abs(values[right] - targets)
+    return np.where(use_left, left, right)
+
+
 class SignalBlocker:
     def __init__(self, widgets: Iterable[QWidget] | QWidget) -> None:
         if not isinstance(widgets, Iterable):
@@ -79,6 +116,8 @@ class SignalBlocker:
                 widget.blockSignals(self._blocking[widget])
 
 
+from .coalescer import UpdateCoalescer
+from .csvexport import CSVExporter
 from .markergenerator import MarkerGenerator, MarkerShape
 from .optionsuimanager import OptionsUiManager
 from .undoable import undoable
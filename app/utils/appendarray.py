@@ -0,0 +1,59 @@
+"""Arrays that grow at the end and shrink from the start without copying.
+
+Values are appended by writing past the end of the values kept so far and
+dropped from the start by moving past them. When the spare capacity runs
+out the kept values are copied into a new array twice their size, so each
+value is copied a constant number of times on average.
+
+Nothing is ever written over values that were handed out, so arrays
+returned by values stay valid while more values are appended.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+class AppendArray:
+    min_capacity = 1024
+
+    def __init__(self, values: np.ndarray) -> None:
+        self._data = np.empty(
+            max(values.size * 2, self.min_capacity), dtype=values.dtype
+        )
+        self._data[: values.size] = values
+        self._start = 0
+        self._stop = values.size
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    @property
+    def values(self) -> np.ndarray:
+        """Return a view of the values kept."""
+        return self._data[self._start : self._stop]
+
+    def can_hold(self, values: np.ndarray) -> bool:
+        """Return whether the values can be appended without losing anything."""
+        return np.can_cast(values.dtype, self._data.dtype, casting="safe")
+
+    def extend(self, values: np.ndarray) -> None:
+        stop = self._stop + values.size
+        if stop > self._data.size:
+            # Move to a new array rather than overwriting dropped
+            # values, which may still be in use.
+            kept = len(self)
+            size = kept + values.size
+            data = np.empty(max(size * 2, self.min_capacity), dtype=self._data.dtype)
+            data[:kept] = self.values
+            self._data = data
+            self._start = 0
+            self._stop = kept
+            stop = size
+
+        self._data[self._stop : stop] = values
+        self._stop = stop
+
+    def drop(self, count: int) -> None:
+        """Drop values from the start."""
+        self._start = min(self._start + count, self._stop)
@@ -0,0 +1,342 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from PySide6.QtCore import QObject, Signal
+
+from app.utils import index_to_float
+from app.utils.compression import data_extension
+from app.utils.workerpool import summarize_file, worker_pool
+
+
+@dataclass
+class ChannelSummary:
+    name: str
+    peak: float
+    rms: float
+    # Min and max of each block of the channel, shape (2, blocks)
+    envelope: np.ndarray = field(repr=False)
+
+
+@dataclass
+class RecordingSummary:
+    """A small summary of a recording used to search the catalog."""
+
+    # Zero if the recording isn't sampled over time at a fixed rate
+    sample_rate: float
+    duration: float
+    channels: list[ChannelSummary]
+
+    envelope_size = 64
+
+    @property
+    def peak(self) -> float:
+        return max((channel.peak for channel in self.channels), default=float("nan"))
+
+    @property
+    def rms(self) -> float:
+        return max((channel.rms for channel in self.channels), default=float("nan"))
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "RecordingSummary":
+        x = index_to_float(df.index)
+        sample_rate = 0.0
+        duration = 0.0
+        if x.size > 1:
+            duration = float(x[-1] - x[0])
+            if df.index.inferred_type == "timedelta64":
+                spacing = float(np.median(np.diff(x)))
+                sample_rate = 1 / spacing if spacing > 0 else 0.0
+
+        channels = []
+        for col, series in df.items():
+            y = series.to_numpy(dtype=float)
+            valid = y[~np.isnan(y)]
+            if not valid.size:
+                continue
+
+            channels.append(
+                ChannelSummary(
+                    name=str(col),
+                    peak=float(np.abs(valid).max()),
+                    rms=float(np.sqrt(np.dot(valid, valid) / valid.size)),
+                    envelope=envelope(valid, cls.envelope_size),
+                )
+            )
+        return cls(sample_rate, duration, channels)
+
+
+def envelope(values: np.ndarray, size: int) -> np.ndarray:
+    """Reduce the values to the min and max of up to size equal blocks."""
+    starts = np.unique(np.linspace(0, values.size, size, endpoint=False).astype(np.int64))
+    return np.vstack(
+        (np.minimum.reduceat(values, starts), np.maximum.reduceat(values, starts))
+    ).astype(np.float32)
+
+
+@dataclass
+class CatalogEntry:
+    path: Path
+    sample_rate: float
+    duration: float
+    peak: float
+    rms: float
+    channels: list[ChannelSummary]
+
+
+@dataclass
+class CatalogFilter:
+    text: str = ""
+    min_sample_rate: float = 0
+    min_duration: float = 0
+    min_peak: float = 0
+    min_rms: float = 0
+
+
+class Catalog:
+    """SQLite index of the recordings found within directory trees.
+
+    Only the summary of each file is stored along with its modification
+    time so unchanged files are skipped when a directory is scanned again.
+    Each thread must use its own Catalog.
+    """
+
+    _schema = """
+        CREATE TABLE IF NOT EXISTS files (
+            path TEXT PRIMARY KEY,
+            mtime REAL NOT NULL,
+            sample_rate REAL,
+            duration REAL,
+            peak REAL,
+            rms REAL,
+            -- Set if the file couldn't be summarized
+            error TEXT
+        );
+        CREATE TABLE IF NOT EXISTS channels (
+            path TEXT NOT NULL REFERENCES files(path) ON DELETE CASCADE,
+            name TEXT NOT NULL,
+            peak REAL,
+            rms REAL,
+            envelope BLOB
+        );
+        CREATE INDEX IF NOT EXISTS channels_path ON channels(path);
+    """
+
+    def __init__(self, file: Path | str) -> None:
+        self._db = sqlite3.connect(file)
+        # Allow searching while a scan is writing
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.executescript(self._schema)
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def mtimes(self, directory: Path) -> dict[str, float]:
+        """Return the modification time of each indexed file within a directory."""
+        prefix = os.path.join(str(directory), "")
+        rows = self._db.execute(
+            "SELECT path, mtime FROM files WHERE substr(path, 1, ?) = ?",
+            (len(prefix), prefix),
+        )
+        return dict(rows.fetchall())
+
+    def update(
+        self,
+        path: str,
+        mtime: float,
+        summary: RecordingSummary | None,
+        error: str | None = None,
+    ) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM files WHERE path = ?", (path,))
+            if summary is None:
+                self._db.execute(
+                    "INSERT INTO files (path, mtime, error) VALUES (?, ?, ?)",
+                    (path, mtime, error or "Unsupported file"),
+                )
+                return
+
+            self._db.execute(
+                "INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                (
+                    path,
+                    mtime,
+                    summary.sample_rate,
+                    summary.duration,
+                    summary.peak,
+                    summary.rms,
+                ),
+            )
+            self._db.executemany(
+                "INSERT INTO channels VALUES (?, ?, ?, ?, ?)",
+                [
+                    (
+                        path,
+                        channel.name,
+                        channel.peak,
+                        channel.rms,
+                        channel.envelope.astype(np.float32).tobytes(),
+                    )
+                    for channel in summary.channels
+                ],
+            )
+
+    def remove(self, paths: list[str]) -> None:
+        with self._db:
+            self._db.executemany("DELETE FROM files WHERE path = ?", [(p,) for p in paths])
+
+    def search(self, where: CatalogFilter, limit: int = 1000) -> list[CatalogEntry]:
+        query = """
+            SELECT path, sample_rate, duration, peak, rms FROM files
+            WHERE error IS NULL
+        """
+        params: list = []
+        # Only filter on the values that are set since some may be unknown
+        minimums = {
+            "sample_rate": where.min_sample_rate,
+            "duration": where.min_duration,
+            "peak": where.min_peak,
+            "rms": where.min_rms,
+        }
+        for column, minimum in minimums.items():
+            if minimum:
+                query += f" AND {column} >= ?"
+                params.append(minimum)
+        if where.text:
+            # Match either the file's path or the name of one of its channels
+            query += """
+                AND (path LIKE ? ESCAPE '\\' OR EXISTS (
+                    SELECT 1 FROM channels
+                    WHERE channels.path = files.path AND name LIKE ? ESCAPE '\\'
+                ))
+            """
+            pattern = "%" + _escape_like(where.text) + "%"
+            params += [pattern, pattern]
+        query += " ORDER BY path LIMIT ?"
+        params.append(limit)
+
+        entries = [
+            CatalogEntry(Path(path), rate, duration, peak, rms, [])
+            for path, rate, duration, peak, rms in self._db.execute(query, params)
+        ]
+        for entry in entries:
+            rows = self._db.execute(
+                "SELECT name, peak, rms, envelope FROM channels WHERE path = ?",
+                (str(entry.path),),
+            )
+            for name, peak, rms, blob in rows:
+                values = np.frombuffer(blob, dtype=np.float32).reshape(2, -1)
+                entry.channels.append(ChannelSummary(name, peak, rms, values))
+        return entries
+
+
+class CatalogScanner(QObject):
+    """Updates the catalog with the recordings within a directory tree.
+
+    New and modified files are summarized by the app's worker pool.
+    Intended to be moved to a worker thread. The scan can be cancelled
+    between files.
+    """
+
+    # Number of files scanned and the total number of files to scan
+    progress = Signal(int, int)
+    finished = Signal(bool)
+    failed = Signal(str)
+
+    def __init__(
+        self,
+        catalog_file: Path,
+        directory: Path,
+        extensions: list[str],
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._catalog_file = catalog_file
+        self._directory = directory
+        self._extensions = {ext.lower() for ext in extensions}
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        self._cancelled = True
+
+    def run(self) -> None:
+        try:
+            with Catalog(self._catalog_file) as catalog:
+                completed = self._scan(catalog)
+        except Exception as ex:
+            self.failed.emit(str(ex))
+            return
+        self.finished.emit(completed)
+
+    def _find_files(self) -> dict[str, float]:
+        files = {}
+        for root, _, names in os.walk(self._directory):
+            for name in names:
+                path = os.path.join(root, name)
+                if data_extension(Path(name)) in self._extensions:
+                    try:
+                        files[path] = os.stat(path).st_mtime
+                    except OSError:
+                        pass
+        return files
+
+    def _scan(self, catalog: Catalog) -> bool:
+        files = self._find_files()
+        indexed = catalog.mtimes(self._directory)
+        catalog.remove([path for path in indexed if path not in files])
+
+        stale = [path for path, mtime in files.items() if indexed.get(path) != mtime]
+        self.progress.emit(0, len(stale))
+        if not stale:
+            return True
+
+        pool = worker_pool()
+        pending = {
+            pool.submit(summarize_file, path, memory=_file_size(path)): path
+            for path in stale
+        }
+        try:
+            done_count = 0
+            while pending:
+                if self._cancelled:
+                    return False
+
+                done, _ = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        summary = future.result()
+                        error = None if summary else "No parser could read the file"
+                    except Exception as ex:
+                        summary, error = None, str(ex)
+                    catalog.update(path, files[path], summary, error)
+                    done_count += 1
+                    self.progress.emit(done_count, len(stale))
+        finally:
+            for future in pending:
+                future.cancel()
+        return True
+
+
+def _escape_like(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
@@ -0,0 +1,45 @@
+from collections.abc import Callable
+
+from PySide6.QtCore import QObject, QTimer
+
+
+class UpdateCoalescer(QObject):
+    """Batch repeated update requests into a single call per frame.
+
+    The first request starts a timer and any further requests made before it
+    fires are dropped, so the callback runs at most once per interval.
+    """
+
+    frame_interval = 16
+
+    def __init__(
+        self,
+        callback: Callable[[], None],
+        interval: int = frame_interval,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._callback = callback
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(interval)
+        self._timer.timeout.connect(self._callback)
+
+    @property
+    def pending(self) -> bool:
+        return self._timer.isActive()
+
+    def request(self, *args) -> None:
+        # Accept and ignore any arguments so this
+        # can be connected directly to signals.
+        if not self._timer.isActive():
+            self._timer.start()
+
+    def flush(self) -> None:
+        """Run the callback now if an update is pending."""
+        if self._timer.isActive():
+            self._timer.stop()
+            self._callback()
+
+    def cancel(self) -> None:
+        self._timer.stop()
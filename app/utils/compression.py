@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import bz2
+import gzip
+import io
+import lzma
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, TextIO
+
+# Extension: function used to open a stream of the decompressed data
+COMPRESSED_EXTENSIONS = {
+    "gz": gzip.open,
+    "xz": lzma.open,
+    "bz2": bz2.open,
+}
+ARCHIVE_EXTENSION = "zip"
+
+
+def compression(file: Path) -> str | None:
+    """Return the compression extension of a file or None if it isn't compressed."""
+    ext = file.suffix.lower()[1:]
+    return ext if ext in COMPRESSED_EXTENSIONS else None
+
+
+def data_extension(file: Path) -> str:
+    """Return the extension of the data within a file, e.g. csv for data.csv.gz."""
+    if compression(file):
+        file = file.with_suffix("")
+    return file.suffix.lower()[1:]
+
+
+def compressed_extensions(extensions: list[str]) -> list[str]:
+    """Return the compressed variants of each extension along with archives."""
+    exts = [f"{ext}.{c}" for ext in extensions for c in COMPRESSED_EXTENSIONS]
+    exts.append(ARCHIVE_EXTENSION)
+    return exts
+
+
+def archive_members(archive: Path) -> list[Path]:
+    """Return a path for each file in a zip archive.
+
+    The paths are the archive path joined with the member name,
+    e.g. data.zip/run1.csv, which can be passed to open_binary.
+    """
+    with zipfile.ZipFile(archive) as zf:
+        return [archive / info.filename for info in zf.infolist() if not info.is_dir()]
+
+
+def split_archive(file: Path) -> tuple[Path, str] | None:
+    """Return the archive containing a member path and the member's name."""
+    for parent in file.parents:
+        if parent.suffix.lower() == f".{ARCHIVE_EXTENSION}" and parent.is_file():
+            return parent, file.relative_to(parent).as_posix()
+    return None
+
+
+def is_compressed(file: Path) -> bool:
+    return compression(file) is not None or split_archive(file) is not None
+
+
+def open_binary(file: Path) -> BinaryIO:
+    """Open a file for reading, decompressing it as it is read if needed.
+
+    Nothing is decompressed ahead of time. The data is inflated a block
+    at a time as the stream is read so only one copy is ever in memory.
+    Seeking forward skips over the decompressed data.
+    """
+    ext = compression(file)
+    if ext is not None:
+        return COMPRESSED_EXTENSIONS[ext](file, "rb") #type: ignore
+
+    member = split_archive(file)
+    if member is not None:
+        archive, name = member
+        # The member keeps the archive open until it is closed
+        with zipfile.ZipFile(archive) as zf:
+            return zf.open(name) #type: ignore
+
+    return file.open("rb")
+
+
+def open_text(file: Path, encoding: str) -> TextIO:
+    return io.TextIOWrapper(open_binary(file), encoding=encoding) #type: ignore
@@ -54,7 +54,8 @@ class OptionsUiManager:
                 continue
 
             if isinstance(v, NumericOption):
-                min = v.min or -99999999
+                # Zero is a real minimum, only None leaves it unbounded
+                min = -99999999 if v.min is None else v.min
                 max = v.max or 99999999
 
                 if isinstance(v.value, int):
@@ -63,6 +64,7 @@ class OptionsUiManager:
                     widget.setValue(v.value)
                 elif isinstance(v.value, float):
                     widget = QDoubleSpinBox()
+                    widget.setDecimals(v.decimals)
                     widget.setRange(float(min), float(max))
                     widget.setValue(v.value)
                 else:
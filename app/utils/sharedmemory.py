@@ -0,0 +1,293 @@
+"""Passing arrays and DataFrames between processes through shared memory.
+
+Only small descriptors holding the names of the shared memory blocks are
+pickled. The receiving process maps the blocks and builds its arrays on
+top of them, so the data itself is copied at most once, into the block.
+
+Each process keeps a reference count for every block it has mapped. An
+array built on a block holds a reference until it is garbage collected.
+The block is closed once nothing references it, and unlinked as well if
+this process owns it.
+"""
+
+from __future__ import annotations
+
+import threading
+import weakref
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from typing import Any, Hashable
+
+import numpy as np
+import pandas as pd
+
+# Arrays smaller than this are cheaper to pickle than to share
+MIN_SHARED_BYTES = 1024 * 1024
+
+
+@dataclass
+class _Block:
+    memory: shared_memory.SharedMemory
+    refs: int
+    # The owner unlinks the block once it is no longer referenced
+    owner: bool
+
+
+class SharedBlocks:
+    """Reference counts of the shared memory blocks mapped by this process."""
+
+    def __init__(self) -> None:
+        self._blocks: dict[str, _Block] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def create(self, size: int) -> shared_memory.SharedMemory:
+        """Create a block owned by this process with a single reference."""
+        # Zero sized blocks aren't allowed
+        memory = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        with self._lock:
+            self._blocks[memory.name] = _Block(memory, 1, True)
+        return memory
+
+    def acquire(self, name: str) -> shared_memory.SharedMemory:
+        """Add a reference to a block, mapping it if this process hasn't yet."""
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None:
+                block = _Block(shared_memory.SharedMemory(name=name), 0, False)
+                self._blocks[name] = block
+            block.refs += 1
+            return block.memory
+
+    def release(self, name: str) -> None:
+        with self._lock:
+            block = self._blocks.get(name)
+            if block is None:
+                return
+            block.refs -= 1
+            if block.refs > 0:
+                return
+            del self._blocks[name]
+
+        try:
+            block.memory.close()
+        except BufferError:
+            # An array still uses the mapping. It is unmapped once collected.
+            pass
+        if block.owner:
+            block.memory.unlink()
+
+    def adopt(self, name: str) -> None:
+        """Take over unlinking a block created by another process."""
+        with self._lock:
+            if name in self._blocks:
+                self._blocks[name].owner = True
+
+    def disown(self, name: str) -> None:
+        """Leave unlinking a block created by this process to another process."""
+        with self._lock:
+            if name in self._blocks:
+                self._blocks[name].owner = False
+
+    def array(self, name: str, shape: tuple[int, ...], dtype: np.dtype) -> np.ndarray:
+        """Return an array on top of a block that references it while alive."""
+        memory = self.acquire(name)
+        array = np.ndarray(shape, dtype=dtype, buffer=memory.buf)
+        weakref.finalize(array, self.release, name)
+        return array
+
+    def clear(self) -> None:
+        """Close every block, unlinking those owned by this process."""
+        with self._lock:
+            blocks = list(self._blocks.values())
+            self._blocks.clear()
+        for block in blocks:
+            try:
+                block.memory.close()
+            except BufferError:
+                pass
+            if block.owner:
+                try:
+                    block.memory.unlink()
+                except FileNotFoundError:
+                    pass
+
+
+# The blocks mapped by this process
+blocks = SharedBlocks()
+
+
+@dataclass(frozen=True)
+class SharedArray:
+    """Describes an array stored in a shared memory block."""
+
+    name: str
+    shape: tuple[int, ...]
+    dtype: str
+
+    @property
+    def nbytes(self) -> int:
+        return int(np.prod(self.shape)) * np.dtype(self.dtype).itemsize
+
+    @property
+    def names(self) -> list[str]:
+        return [self.name]
+
+    @classmethod
+    def from_array(cls, array: np.ndarray) -> "SharedArray":
+        """Copy an array into a new block with a reference held by the descriptor."""
+        memory = blocks.create(array.nbytes)
+        shared = np.ndarray(array.shape, dtype=array.dtype, buffer=memory.buf)
+        shared[...] = array
+        del shared
+        return cls(memory.name, array.shape, array.dtype.str)
+
+    def to_array(self) -> np.ndarray:
+        return blocks.array(self.name, self.shape, np.dtype(self.dtype))
+
+
+@dataclass(frozen=True)
+class SharedFrame:
+    """Describes a DataFrame whose index and values are stored in shared memory.
+
+    Columns with the same data type are stored together in a single
+    columns by rows block so the frame can be rebuilt without copying when
+    all of its columns share a type.
+    """
+
+    columns: list[Hashable]
+    # The positions of the columns stored in each block
+    groups: list[tuple[list[int], SharedArray]]
+    # Either a shared array or the start, stop and step of a RangeIndex
+    index: SharedArray | tuple[int, int, int]
+    index_name: Hashable = None
+    attrs: dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        size = sum(array.nbytes for _, array in self.groups)
+        if isinstance(self.index, SharedArray):
+            size += self.index.nbytes
+        return size
+
+    @property
+    def names(self) -> list[str]:
+        names = [array.name for _, array in self.groups]
+        if isinstance(self.index, SharedArray):
+            names.append(self.index.name)
+        return names
+
+    @staticmethod
+    def supports(df: pd.DataFrame) -> bool:
+        """Return whether the frame only holds types that can be shared."""
+        dtypes = list(df.dtypes) + [df.index.dtype]
+        return all(_shareable(dtype) for dtype in dtypes) and df.columns.is_unique
+
+    @classmethod
+    def from_df(cls, df: pd.DataFrame) -> "SharedFrame":
+        """Copy a frame into new blocks with a reference held by the descriptor."""
+        groups = []
+        by_dtype: dict[np.dtype, list[int]] = {}
+        for i, dtype in enumerate(df.dtypes):
+            by_dtype.setdefault(dtype, []).append(i)
+        for dtype, positions in by_dtype.items():
+            memory = blocks.create(len(positions) * len(df) * dtype.itemsize)
+            values = np.ndarray((len(positions), len(df)), dtype=dtype, buffer=memory.buf)
+            for row, i in enumerate(positions):
+                values[row] = df.iloc[:, i].to_numpy()
+            del values
+            groups.append(
+                (positions, SharedArray(memory.name, (len(positions), len(df)), dtype.str))
+            )
+
+        index: SharedArray | tuple[int, int, int]
+        if isinstance(df.index, pd.RangeIndex):
+            index = (df.index.start, df.index.stop, df.index.step)
+        else:
+            index = SharedArray.from_array(df.index.to_numpy())
+
+        return cls(list(df.columns), groups, index, df.index.name, dict(df.attrs))
+
+    def to_df(self) -> pd.DataFrame:
+        if isinstance(self.index, SharedArray):
+            index = pd.Index(self.index.to_array(), name=self.index_name)
+        else:
+            index = pd.RangeIndex(*self.index, name=self.index_name)
+
+        if len(self.groups) == 1:
+            # A frame built from a columns by rows array keeps it as its only block
+            positions, array = self.groups[0]
+            columns = [self.columns[i] for i in positions]
+            df = pd.DataFrame(array.to_array().T, index=index, columns=columns, copy=False)
+        else:
+            data = {}
+            for positions, array in self.groups:
+                values = array.to_array()
+                for row, i in enumerate(positions):
+                    data[i] = values[row]
+            df = pd.DataFrame(
+                {i: data[i] for i in range(len(self.columns))}, index=index, copy=False
+            )
+            df.columns = self.columns
+
+        df.attrs.update(self.attrs)
+        return df
+
+
+def share(value: Any) -> Any:
+    """Replace large arrays and frames within a value with shared descriptors.
+
+    Tuples, lists and dicts are searched. Anything that can't be
+    shared is left as is to be pickled.
+    """
+    if isinstance(value, pd.DataFrame):
+        if _nbytes(value) >= MIN_SHARED_BYTES and SharedFrame.supports(value):
+            return SharedFrame.from_df(value)
+    elif isinstance(value, np.ndarray):
+        if value.nbytes >= MIN_SHARED_BYTES and _shareable(value.dtype):
+            return SharedArray.from_array(value)
+    elif isinstance(value, (tuple, list)):
+        return type(value)(share(item) for item in value)
+    elif isinstance(value, dict):
+        return {key: share(item) for key, item in value.items()}
+    return value
+
+
+def unshare(value: Any) -> Any:
+    """Replace the shared descriptors within a value with the data they describe."""
+    if isinstance(value, SharedFrame):
+        return value.to_df()
+    if isinstance(value, SharedArray):
+        return value.to_array()
+    if isinstance(value, (tuple, list)):
+        return type(value)(unshare(item) for item in value)
+    if isinstance(value, dict):
+        return {key: unshare(item) for key, item in value.items()}
+    return value
+
+
+def shared_names(value: Any) -> list[str]:
+    """Return the names of the blocks described within a value."""
+    if isinstance(value, (SharedArray, SharedFrame)):
+        return value.names
+    if isinstance(value, (tuple, list)):
+        return [name for item in value for name in shared_names(item)]
+    if isinstance(value, dict):
+        return [name for item in value.values() for name in shared_names(item)]
+    return []
+
+
+def release(value: Any) -> None:
+    """Release the references held by the shared descriptors within a value."""
+    for name in shared_names(value):
+        blocks.release(name)
+
+
+def _shareable(dtype) -> bool:
+    return isinstance(dtype, np.dtype) and dtype.kind in "biufcmM"
+
+
+def _nbytes(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=False).sum())
@@ -0,0 +1,419 @@
+"""A pool of worker processes for parsing and processing data.
+
+Large arrays and DataFrames are passed to and from the workers through
+shared memory (see app.utils.sharedmemory) rather than being pickled.
+The workers are started once and kept running with the plugins already
+loaded, so a job only pays for its own work.
+"""
+
+from __future__ import annotations
+
+import ctypes
+import itertools
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+import threading
+import traceback
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from multiprocessing.connection import Connection, wait
+from pathlib import Path
+from typing import Any
+
+import pandas as pd
+
+from app.utils import sharedmemory
+from app.utils.sharedmemory import blocks, release, share, shared_names, unshare
+
+
+@dataclass
+class _Job:
+    id: int
+    future: Future
+    func: Callable
+    args: tuple
+    kwargs: dict
+    # Estimated bytes used while the job runs
+    memory: int
+
+
+@dataclass
+class _Worker:
+    process: multiprocessing.process.BaseProcess
+    conn: Connection
+    job: _Job | None = None
+
+
+class WorkerPool:
+    """Runs jobs in a pool of persistent worker processes.
+
+    Jobs are module level functions. Any large DataFrames or arrays within
+    their arguments and results are moved through shared memory. Jobs are
+    started in the order they were submitted as long as there is an idle
+    worker and the memory they are estimated to use fits within the memory
+    budget. A job larger than the whole budget runs on its own.
+    """
+
+    def __init__(
+        self,
+        plugin_path: str,
+        workers: int | None = None,
+        memory_budget: int | None = None,
+    ) -> None:
+        if memory_budget is None:
+            memory = physical_memory()
+            # Leave the other half for the app and everything else
+            memory_budget = memory // 2 if memory else sys.maxsize
+
+        self._memory_budget = memory_budget
+        self._memory_used = 0
+        self._ids = itertools.count()
+        self._pending: deque[_Job] = deque()
+        self._lock = threading.Lock()
+        self._stopping = False
+
+        # Forking a process with Qt running isn't safe
+        self._context = multiprocessing.get_context("spawn")
+        self._plugin_path = plugin_path
+        self._workers = [self._start_worker() for _ in range(workers or os.cpu_count() or 1)]
+
+        self._wakeup_reader, self._wakeup_writer = self._context.Pipe(duplex=False)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    @property
+    def memory_budget(self) -> int:
+        return self._memory_budget
+
+    def submit(
+        self, func: Callable, *args, memory: int | None = None, **kwargs
+    ) -> Future:
+        """Run func(*args, **kwargs) in a worker and return a future for its result.
+
+        Descriptors already created with share are passed as is and stay
+        valid until released by the caller. If the memory the job uses
+        isn't given it is estimated from the size of the shared arguments.
+        """
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("Cannot submit jobs after the pool is shut down")
+
+        # The job holds its own reference to anything the caller shared
+        for name in shared_names((args, kwargs)):
+            blocks.acquire(name)
+        args, kwargs = share((args, kwargs))
+        if memory is None:
+            # Room for the inputs and a result of about the same size
+            memory = 2 * _shared_size((args, kwargs))
+
+        future: Future = Future()
+        job = _Job(next(self._ids), future, func, args, kwargs, memory)
+        with self._lock:
+            self._pending.append(job)
+        self._wakeup()
+        return future
+
+    def share(self, value: Any) -> Any:
+        """Move the large arrays and frames within a value to shared memory.
+
+        Use this to pass the same data to several jobs without copying it
+        each time. The returned value must be released once it's no longer
+        needed.
+        """
+        return share(value)
+
+    def release(self, value: Any) -> None:
+        release(value)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers once the running jobs finish. Pending jobs are cancelled."""
+        with self._lock:
+            self._stopping = True
+            pending = list(self._pending)
+            self._pending.clear()
+        for job in pending:
+            job.future.cancel()
+            release((job.args, job.kwargs))
+
+        self._wakeup()
+        if wait:
+            self._thread.join()
+
+    def _start_worker(self) -> _Worker:
+        conn, worker_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_main, args=(worker_conn, self._plugin_path), daemon=True
+        )
+        process.start()
+        worker_conn.close()
+        return _Worker(process, conn)
+
+    def _wakeup(self) -> None:
+        try:
+            self._wakeup_writer.send(None)
+        except OSError:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            self._schedule()
+            busy = [worker for worker in self._workers if worker.job is not None]
+            with self._lock:
+                if self._stopping and not busy:
+                    break
+
+            ready = wait([self._wakeup_reader] + [worker.conn for worker in busy])
+            for conn in ready:
+                if conn is self._wakeup_reader:
+                    while self._wakeup_reader.poll():
+                        self._wakeup_reader.recv()
+                    continue
+
+                worker = next(worker for worker in busy if worker.conn is conn)
+                self._receive(worker)
+
+        for worker in self._workers:
+            try:
+                worker.conn.send(("stop",))
+            except OSError:
+                pass
+        for worker in self._workers:
+            worker.process.join(timeout=5)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.conn.close()
+
+    def _schedule(self) -> None:
+        """Start as many pending jobs as there are idle workers and memory for."""
+        while True:
+            idle = next((worker for worker in self._workers if worker.job is None), None)
+            if idle is None:
+                return
+
+            with self._lock:
+                job = self._next_job()
+                if job is None:
+                    return
+                self._pending.remove(job)
+
+            if not job.future.set_running_or_notify_cancel():
+                release((job.args, job.kwargs))
+                continue
+
+            try:
+                idle.conn.send(("job", job.id, job.func, job.args, job.kwargs))
+            except (OSError, pickle.PicklingError, AttributeError, TypeError) as ex:
+                release((job.args, job.kwargs))
+                job.future.set_exception(ex)
+                continue
+
+            idle.job = job
+            self._memory_used += job.memory
+
+    def _next_job(self) -> _Job | None:
+        """Return the first pending job that fits within the memory budget."""
+        if not self._pending:
+            return None
+        if not self._memory_used:
+            # Always run something when nothing else is running
+            return self._pending[0]
+        for job in self._pending:
+            if self._memory_used + job.memory <= self._memory_budget:
+                return job
+        return None
+
+    def _receive(self, worker: _Worker) -> None:
+        job = worker.job
+        assert job is not None
+        try:
+            message = worker.conn.recv()
+        except (EOFError, OSError):
+            message = ("failed", job.id)
+
+        worker.job = None
+        self._memory_used -= job.memory
+        release((job.args, job.kwargs))
+
+        kind = message[0]
+        if kind == "done":
+            names = shared_names(message[2])
+            try:
+                value = self._adopt(message[2], names)
+            except Exception as ex:
+                job.future.set_exception(ex)
+            else:
+                job.future.set_result(value)
+            finally:
+                # The worker keeps the blocks mapped until they've been mapped here
+                worker.conn.send(("release", names))
+        elif kind == "error":
+            error, trace = message[2], message[3]
+            logging.getLogger(__name__).debug(trace)
+            job.future.set_exception(error)
+        else:
+            # Replace the worker so the pool keeps its size
+            index = self._workers.index(worker)
+            worker.conn.close()
+            self._workers[index] = self._start_worker()
+            job.future.set_exception(
+                BrokenProcessPool("A worker process stopped while running a job")
+            )
+
+    @staticmethod
+    def _adopt(value: Any, names: list[str]) -> Any:
+        """Map the blocks holding a result and take over unlinking them."""
+        # Hold a reference while the result is built in case it's copied
+        for name in names:
+            blocks.acquire(name)
+            blocks.adopt(name)
+        try:
+            return unshare(value)
+        finally:
+            for name in names:
+                blocks.release(name)
+
+
+# The pool shared by the whole app, started the first time it's needed
+_pool: WorkerPool | None = None
+_pool_lock = threading.Lock()
+
+
+def worker_pool() -> WorkerPool:
+    """Return the app's worker pool, starting it if it isn't running."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            from app.utils import get_plugin_path
+
+            _pool = WorkerPool(get_plugin_path())
+        return _pool
+
+
+def shutdown_worker_pool() -> None:
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown()
+
+
+def physical_memory() -> int | None:
+    """Return the bytes of physical memory or None if it can't be found."""
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+    except (AttributeError, ValueError, OSError):
+        pass
+
+    if sys.platform == "win32":
+
+        class MemoryStatus(ctypes.Structure):
+            _fields_ = [
+                ("dwLength", ctypes.c_ulong),
+                ("dwMemoryLoad", ctypes.c_ulong),
+                ("ullTotalPhys", ctypes.c_ulonglong),
+                ("ullAvailPhys", ctypes.c_ulonglong),
+                ("ullTotalPageFile", ctypes.c_ulonglong),
+                ("ullAvailPageFile", ctypes.c_ulonglong),
+                ("ullTotalVirtual", ctypes.c_ulonglong),
+                ("ullAvailVirtual", ctypes.c_ulonglong),
+                ("sullAvailExtendedVirtual", ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatus()
+        status.dwLength = ctypes.sizeof(MemoryStatus)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)): #type: ignore
+            return status.ullTotalPhys
+    return None
+
+
+def _shared_size(value: Any) -> int:
+    if isinstance(value, (sharedmemory.SharedArray, sharedmemory.SharedFrame)):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_shared_size(item) for item in value)
+    if isinstance(value, dict):
+        return sum(_shared_size(item) for item in value.values())
+    return 0
+
+
+# The plugins loaded by each worker process
+_parsers = None
+_plugins: dict = {}
+
+
+def _worker_main(conn: Connection, plugin_path: str) -> None:
+    global _parsers, _plugins
+    # Import the widgets first to load the app's modules in the usual order
+    import app.widgets
+    from app.plugins.parserplugins import load_parsers
+    from app.plugins.viewmodelplugin import load_plugins
+
+    _parsers = load_parsers(plugin_path)
+    _plugins = {plugin.name: plugin for plugin in load_plugins(plugin_path)}
+
+    while True:
+        try:
+            message = conn.recv()
+        except (EOFError, OSError):
+            break
+
+        kind = message[0]
+        if kind == "stop":
+            break
+        if kind == "release":
+            # The pool has mapped the blocks holding a result and will unlink them
+            for name in message[1]:
+                blocks.disown(name)
+                blocks.release(name)
+            continue
+
+        _, job_id, func, args, kwargs = message
+        try:
+            result = share(func(*unshare(args), **unshare(kwargs)))
+        except BaseException as ex:
+            trace = traceback.format_exc()
+            try:
+                pickle.dumps(ex)
+            except Exception:
+                ex = RuntimeError(f"{type(ex).__name__}: {ex}")
+            conn.send(("error", job_id, ex, trace))
+            continue
+        conn.send(("done", job_id, result))
+
+    blocks.clear()
+
+
+def parse_file(path: str, **options) -> tuple[pd.DataFrame, str] | None:
+    """Parse a file in a worker, returning its data and y-axis title."""
+    assert _parsers is not None
+    choose_options = (lambda file, available: options) if options else None
+    model = _parsers.parse(Path(path), choose_options=choose_options)
+    if model is None:
+        return None
+    return model.df, model.y_axis
+
+
+def summarize_file(path: str):
+    """Summarize a file for the catalog in a worker."""
+    assert _parsers is not None
+    return _parsers.summarize(Path(path))
+
+
+def process_data(
+    plugin_name: str, df: pd.DataFrame, y_axis: str = "", **kwargs
+) -> tuple[pd.DataFrame, str]:
+    """Run a filter or view plugin in a worker, returning the new data and y-axis title."""
+    from app.views import ViewModel
+
+    plugin = _plugins.get(plugin_name)
+    if plugin is None:
+        raise KeyError(f"No plugin named {plugin_name}")
+    model = plugin.process(ViewModel(df, y_axis=y_axis), **kwargs)
+    return model.df, model.y_axis
+
@@ -1,2 +1,3 @@
 from .viewcontroller import ViewController, ViewSeries
 from .viewmodel import ViewModel
+from .statistics import ColumnStats, RegionIndex, RegionStats
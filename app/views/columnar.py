@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import json
+from importlib.util import find_spec
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# Key used to store the view metadata within each format
+METADATA_KEY = "accelexplorer"
+
+# Extension: (file dialog filter, supports multiple views in one file)
+COLUMNAR_FORMATS = {
+    "npz": ("NumPy (*.npz)", True),
+    "parquet": ("Parquet (*.parquet)", False),
+    "h5": ("HDF5 (*.h5)", True),
+}
+
+# Parquet and HDF5 are only supported if their optional dependencies are installed
+_REQUIREMENTS = {"parquet": "pyarrow", "h5": "tables"}
+
+ColumnarView = tuple[dict, pd.DataFrame]
+
+
+def available_formats() -> list[str]:
+    return [
+        ext
+        for ext in COLUMNAR_FORMATS
+        if ext not in _REQUIREMENTS or find_spec(_REQUIREMENTS[ext]) is not None
+    ]
+
+
+def supports_multiple_views(ext: str) -> bool:
+    return COLUMNAR_FORMATS[ext][1]
+
+
+def write_views(file: Path | str, views: list[ColumnarView]) -> None:
+    """Write the views to a columnar file with the metadata embedded.
+
+    Formats that don't support multiple views only accept a single view.
+    """
+
+    ext = _get_ext(file)
+    if not supports_multiple_views(ext) and len(views) != 1:
+        raise ValueError(f"{ext} files can only contain a single view")
+
+    if ext == "npz":
+        _write_npz(file, views)
+    elif ext == "parquet":
+        _write_parquet(file, *views[0])
+    elif ext == "h5":
+        _write_hdf(file, views)
+    else:
+        raise ValueError(f"Unsupported format: {ext}")
+
+
+def read_views(file: Path | str) -> list[ColumnarView]:
+    """Read all of the views from a columnar file.
+
+    Returns an empty list if the file wasn't exported by AccelExplorer.
+    """
+
+    ext = _get_ext(file)
+    if ext == "npz":
+        return _read_npz(file)
+    elif ext == "parquet":
+        return _read_parquet(file)
+    elif ext == "h5":
+        return _read_hdf(file)
+    raise ValueError(f"Unsupported format: {ext}")
+
+
+def _get_ext(file: Path | str) -> str:
+    return Path(file).suffix.lower()[1:]
+
+
+def _write_npz(file: Path | str, views: list[ColumnarView]) -> None:
+    arrays = {}
+    for i, (metadata, df) in enumerate(views):
+        arrays[f"view{i}_index"] = df.index.to_numpy()
+        for j, (_, series) in enumerate(df.items()):
+            arrays[f"view{i}_column{j}"] = series.to_numpy()
+
+    # Column names are stored in the metadata since the array
+    # names need to be valid file names within the archive.
+    metadata = [
+        {"metadata": metadata, "columns": [str(col) for col in df.columns]}
+        for metadata, df in views
+    ]
+    arrays[METADATA_KEY] = np.array(json.dumps(metadata))
+    np.savez_compressed(file, **arrays)
+
+
+def _read_npz(file: Path | str) -> list[ColumnarView]:
+    with np.load(file, allow_pickle=False) as npz:
+        if METADATA_KEY not in npz.files:
+            return []
+
+        views = []
+        for i, view in enumerate(json.loads(str(npz[METADATA_KEY]))):
+            metadata = view["metadata"]
+            index = pd.Index(npz[f"view{i}_index"], name=metadata["index_name"])
+            data = {
+                column: npz[f"view{i}_column{j}"]
+                for j, column in enumerate(view["columns"])
+            }
+            views.append((metadata, pd.DataFrame(data, index=index)))
+        return views
+
+
+def _write_parquet(file: Path | str, metadata: dict, df: pd.DataFrame) -> None:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    table = pa.Table.from_pandas(df)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY.encode()] = json.dumps(metadata).encode()
+    pq.write_table(table.replace_schema_metadata(schema_metadata), file)
+
+
+def _read_parquet(file: Path | str) -> list[ColumnarView]:
+    import pyarrow.parquet as pq
+
+    table = pq.read_table(file)
+    schema_metadata = table.schema.metadata or {}
+    if METADATA_KEY.encode() not in schema_metadata:
+        return []
+
+    metadata = json.loads(schema_metadata[METADATA_KEY.encode()])
+    return [(metadata, table.to_pandas())]
+
+
+def _write_hdf(file: Path | str, views: list[ColumnarView]) -> None:
+    with pd.HDFStore(file, mode="w", complevel=5, complib="blosc") as store:
+        for i, (metadata, df) in enumerate(views):
+            key = f"view{i}"
+            store.put(key, df, format="fixed")
+            setattr(store.get_storer(key).attrs, METADATA_KEY, json.dumps(metadata))
+
+
+def _read_hdf(file: Path | str) -> list[ColumnarView]:
+    views = []
+    with pd.HDFStore(file, mode="r") as store:
+        # Sort so view10 comes after view9
+        for key in sorted(store.keys(), key=lambda key: (len(key), key)):
+            attrs = store.get_storer(key).attrs
+            if METADATA_KEY in attrs:
+                metadata = json.loads(getattr(attrs, METADATA_KEY))
+                views.append((metadata, store.get(key)))
+    return views
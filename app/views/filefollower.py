@@ -0,0 +1,74 @@
+import logging
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from app.plugins.parserplugins import CSVTail
+
+from .viewcontroller import ViewController
+from .viewmodel import ViewModel
+
+
+class FileFollower(QObject):
+    """Appends rows to a view as they are written to the file it was parsed from.
+
+    The file is polled at a fixed interval and everything appended since
+    the last poll is added in one go, which limits how often the model
+    emits data_changed. Following stops if the view's model is replaced.
+    """
+
+    stopped = Signal()
+
+    interval = 250
+
+    def __init__(
+        self,
+        tail: CSVTail,
+        controller: ViewController,
+        max_rows: int | None = None,
+        parent: QObject | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._tail = tail
+        self._controller = controller
+        self._model = controller.model
+        self._max_rows = max_rows
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(self.interval)
+        self._timer.timeout.connect(self._poll)
+        self._timer.start()
+
+    @property
+    def controller(self) -> ViewController:
+        return self._controller
+
+    @property
+    def model(self) -> ViewModel:
+        """The model being appended to."""
+        return self._model
+
+    @property
+    def tail(self) -> CSVTail:
+        return self._tail
+
+    def stop(self) -> None:
+        if self._timer.isActive():
+            self._timer.stop()
+            self.stopped.emit()
+
+    def _poll(self) -> None:
+        if self._controller.model is not self._model:
+            self.stop()
+            return
+
+        try:
+            df = self._tail.read()
+        except Exception:
+            logging.exception(__name__)
+            self.stop()
+            return
+
+        if df is not None:
+            # Series may have been renamed since the file was parsed
+            df.columns = self._model.columns
+            self._model.append(df, self._max_rows)
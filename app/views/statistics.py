@@ -0,0 +1,258 @@
+from __future__ import annotations
+
+import dataclasses
+from collections.abc import Callable
+
+import numpy as np
+
+
+@dataclasses.dataclass(frozen=True)
+class ColumnStats:
+    """Summary statistics for a single column of a ViewModel.
+
+    X values are stored in chart coordinates (seconds for time data)
+    so they can be used directly for axis ranges.
+    """
+
+    size: int
+    count: int
+    min: float
+    max: float
+    mean: float
+    rms: float
+    first_valid: float
+    last_valid: float
+    # The x range of the valid values, which only matches
+    # first_valid and last_valid when the x values are sorted.
+    x_min: float
+    x_max: float
+    # Whether the x values of the valid values are in ascending order
+    ascending: bool = True
+
+    @property
+    def nan_count(self) -> int:
+        return self.size - self.count
+
+    @property
+    def empty(self) -> bool:
+        return self.count == 0
+
+    @classmethod
+    def from_values(cls, x: np.ndarray, y: np.ndarray) -> "ColumnStats":
+        valid = np.flatnonzero(~np.isnan(y))
+        if valid.size == 0:
+            nan = float("nan")
+            return cls(y.size, 0, nan, nan, nan, nan, nan, nan, nan, nan)
+
+        values = y[valid]
+        valid_x = x[valid]
+        return cls(
+            size=y.size,
+            count=valid.size,
+            min=float(values.min()),
+            max=float(values.max()),
+            mean=float(values.mean()),
+            rms=float(np.sqrt(np.dot(values, values) / valid.size)),
+            first_valid=float(x[valid[0]]),
+            last_valid=float(x[valid[-1]]),
+            x_min=float(valid_x.min()),
+            x_max=float(valid_x.max()),
+            ascending=bool(np.all(valid_x[1:] >= valid_x[:-1])),
+        )
+
+    def combined(self, other: "ColumnStats") -> "ColumnStats":
+        """Return the stats of this column followed by the values of other."""
+        if other.empty:
+            return self.resized(self.size + other.size)
+        if self.empty:
+            return dataclasses.replace(other, size=self.size + other.size)
+
+        count = self.count + other.count
+        mean_sq = (self.count * self.rms**2 + other.count * other.rms**2) / count
+        return ColumnStats(
+            size=self.size + other.size,
+            count=count,
+            min=min(self.min, other.min),
+            max=max(self.max, other.max),
+            mean=(self.count * self.mean + other.count * other.mean) / count,
+            rms=float(np.sqrt(mean_sq)),
+            first_valid=self.first_valid,
+            last_valid=other.last_valid,
+            x_min=min(self.x_min, other.x_min),
+            x_max=max(self.x_max, other.x_max),
+            ascending=(
+                self.ascending and other.ascending and other.first_valid >= self.last_valid
+            ),
+        )
+
+    def trimmed(
+        self,
+        removed: "ColumnStats",
+        x: Callable[[np.ndarray], np.ndarray],
+        y: np.ndarray,
+    ) -> "ColumnStats":
+        """Return the stats of this column once the removed values are dropped from its start.
+
+        Y holds the values left in the column and x returns the x values of
+        the given rows of it, so only the rows needed are converted. The
+        values left are only scanned for an extreme that was removed.
+        """
+        size = self.size - removed.size
+        if removed.empty:
+            return self.resized(size)
+        count = self.count - removed.count
+        if count <= 0:
+            nan = float("nan")
+            return ColumnStats(size, 0, nan, nan, nan, nan, nan, nan, nan, nan)
+
+        total = self.count * self.mean - removed.count * removed.mean
+        # Clamp to zero in case of floating point error
+        total_sq = max(self.count * self.rms**2 - removed.count * removed.rms**2, 0.0)
+
+        y_min, y_max = self.min, self.max
+        if removed.min <= y_min or removed.max >= y_max:
+            y_min, y_max = float(np.nanmin(y)), float(np.nanmax(y))
+
+        first_valid = float(x(np.array([_first_valid(y)]))[0])
+        x_min, x_max = self.x_min, self.x_max
+        if self.ascending:
+            x_min = first_valid
+        elif removed.x_min <= x_min or removed.x_max >= x_max:
+            valid_x = x(np.flatnonzero(~np.isnan(y)))
+            x_min, x_max = float(valid_x.min()), float(valid_x.max())
+
+        return ColumnStats(
+            size=size,
+            count=count,
+            min=y_min,
+            max=y_max,
+            mean=total / count,
+            rms=float(np.sqrt(total_sq / count)),
+            first_valid=first_valid,
+            last_valid=self.last_valid,
+            x_min=x_min,
+            x_max=x_max,
+            ascending=self.ascending,
+        )
+
+    def resized(self, size: int) -> "ColumnStats":
+        """Return a copy of these stats for a column padded with NaN to the given size."""
+        return dataclasses.replace(self, size=size)
+
+    def to_text(self) -> str:
+        return (
+            f"Min: {self.min:.2f}\n"
+            f"Max: {self.max:.2f}\n"
+            f"Mean: {self.mean:.2f}\n"
+            f"RMS: {self.rms:.2f}"
+        )
+
+
+def _first_valid(y: np.ndarray, block_size: int = 4096) -> int:
+    """Return the position of the first value that isn't NaN, checking a block at a time."""
+    for start in range(0, y.size, block_size):
+        valid = np.flatnonzero(~np.isnan(y[start : start + block_size]))
+        if valid.size:
+            return start + int(valid[0])
+    return -1
+
+
+@dataclasses.dataclass(frozen=True)
+class RegionStats:
+    """Statistics for a single column over a span of the x-axis."""
+
+    count: int
+    min: float
+    max: float
+    mean: float
+    rms: float
+
+    @property
+    def peak(self) -> float:
+        return max(abs(self.min), abs(self.max))
+
+    @property
+    def crest_factor(self) -> float:
+        if not self.rms:
+            return float("nan")
+        return self.peak / self.rms
+
+
+class RegionIndex:
+    """Precomputed lookups for answering RegionStats queries on a single column.
+
+    Cumulative sums give the mean and RMS of any span in O(1). Min / max use
+    a sparse table built over fixed size blocks of samples so the memory stays
+    linear; only the partial blocks at either end of a span are scanned.
+    Locating the span within the x values is a binary search.
+    """
+
+    block_size = 64
+
+    def __init__(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Build the index from x values sorted in ascending order and y values without NaN."""
+        self._x = x
+        self._y = y
+        self._sum = np.concatenate(([0.0], np.cumsum(y)))
+        self._sum_sq = np.concatenate(([0.0], np.cumsum(y * y)))
+
+        blocks = -(-y.size // self.block_size)
+        padded = np.full(blocks * self.block_size, np.nan)
+        padded[: y.size] = y
+        padded = padded.reshape(blocks, self.block_size)
+
+        self._min_table = self._build_table(np.nanmin(padded, axis=1), np.minimum)
+        self._max_table = self._build_table(np.nanmax(padded, axis=1), np.maximum)
+
+    @property
+    def size(self) -> int:
+        return self._y.size
+
+    @staticmethod
+    def _build_table(values: np.ndarray, func) -> list[np.ndarray]:
+        # Level k holds the result of func over 2**k consecutive blocks
+        table = [values]
+        width = 1
+        while width * 2 <= values.size:
+            previous = table[-1]
+            table.append(func(previous[:-width], previous[width:]))
+            width *= 2
+        return table
+
+    @staticmethod
+    def _query_table(table: list[np.ndarray], start: int, end: int, func) -> float:
+        level = (end - start).bit_length() - 1
+        return func(table[level][start], table[level][end - (1 << level)])
+
+    def _extreme(self, start: int, end: int, table: list[np.ndarray], func) -> float:
+        size = self.block_size
+        first_block = -(-start // size)
+        last_block = end // size
+        if last_block <= first_block:
+            return float(func.reduce(self._y[start:end]))
+
+        value = self._query_table(table, first_block, last_block, func)
+        if start < first_block * size:
+            value = func(value, func.reduce(self._y[start : first_block * size]))
+        if end > last_block * size:
+            value = func(value, func.reduce(self._y[last_block * size : end]))
+        return float(value)
+
+    def stats(self, start: float, end: float) -> RegionStats | None:
+        """Return the stats for all samples with an x value between start and end."""
+        i = int(np.searchsorted(self._x, start, side="left"))
+        j = int(np.searchsorted(self._x, end, side="right"))
+        count = j - i
+        if count <= 0:
+            return None
+
+        mean = (self._sum[j] - self._sum[i]) / count
+        # Clamp to zero in case of floating point error
+        mean_sq = max((self._sum_sq[j] - self._sum_sq[i]) / count, 0.0)
+        return RegionStats(
+            count=count,
+            min=self._extreme(i, j, self._min_table, np.minimum),
+            max=self._extreme(i, j, self._max_table, np.maximum),
+            mean=float(mean),
+            rms=float(np.sqrt(mean_sq)),
+        )
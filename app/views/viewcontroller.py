@@ -1,15 +1,26 @@
 from __future__ import annotations
 
+from functools import partial
+
 import numpy as np
 import pandas as pd
 from PySide6.QtCharts import QChart, QValueAxis, QLineSeries
-from PySide6.QtCore import QObject, QPointF, QPointFList, Qt, Signal, QTimer
+from PySide6.QtCore import QObject, QPointF, QPointFList, Qt, Signal
 from PySide6.QtGui import QColor, QUndoStack, QImage, QPainter
-from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem
-
-from app.utils import MarkerGenerator, MarkerShape, undoable
-from app.widgets import InteractiveChart, ColorWidget
-
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+
+from app.utils import (
+    MarkerGenerator,
+    MarkerShape,
+    UpdateCoalescer,
+    nearest_indices,
+    undoable,
+    valid_values,
+)
+from app.widgets import InteractiveChart, ColorDelegate, OverviewStrip
+from app.widgets.arrayseriesitem import ArraySeriesItem
+
+from .statistics import RegionStats
 from .viewmodel import ViewModel
 
 
@@ -25,8 +36,9 @@ class ViewSeries(QObject):
 
         self._chart_series = QLineSeries()
         self._chart_series.colorChanged.connect(self._color_changed) # type: ignore
+        self._chart_series.visibleChanged.connect(self._visible_changed)
 
-        self._color_widget = None
+        self._array_item: ArraySeriesItem | None = None
 
         self._tree_item = QTreeWidgetItem()
         self._tree_item.setFlags(self._tree_item.flags() | Qt.ItemFlag.ItemIsEditable)
@@ -36,6 +48,7 @@ class ViewSeries(QObject):
 
         self.setParent(parent)
         self.set_name(name, undo=False) # type: ignore
+        self._update_color_data()
         self.marker_size = 15
         self._update_marker_image()
 
@@ -45,7 +58,6 @@ class ViewSeries(QObject):
 
         parent.tree_item.addChild(self._tree_item)
         self.undo_stack = parent.undo_stack
-        self._parent_changed()
         super().setParent(parent)
 
     @property
@@ -64,10 +76,13 @@ class ViewSeries(QObject):
     def set_name(self, name: str) -> None:
         if self._name != name:
             self.model.rename({self._name: name})
+            self._rename(name)
 
-            self._name = name
-            self._tree_item.setText(0, name)
-            self._chart_series.setName(name)
+    def _rename(self, name: str) -> None:
+        # Update what displays the name without renaming the model's column
+        self._name = name
+        self._tree_item.setText(0, name)
+        self._chart_series.setName(name)
 
     @property
     def chart_series(self) -> QLineSeries:
@@ -85,6 +100,67 @@ class ViewSeries(QObject):
     def points(self, points: list[QPointF] | QPointFList) -> None:
         self.chart_series.replace(points) #type: ignore
 
+    @property
+    def use_array_renderer(self) -> bool:
+        return self._array_item is not None
+
+    @use_array_renderer.setter
+    def use_array_renderer(self, use: bool) -> None:
+        """Draw the series from the model's arrays instead of the QLineSeries points.
+
+        The QLineSeries is kept, without any points, so the rest of the
+        chart (axes, visibility, hit testing) continues to work.
+        """
+        if use == self.use_array_renderer:
+            return
+
+        if use:
+            controller = self.controller
+            self._array_item = ArraySeriesItem(
+                controller.chart, controller.x_axis, controller.y_axis
+            )
+            self._array_item.color = self.color
+            self._array_item.width = self.width
+            self._array_item.setVisible(self._chart_series.isVisible())
+            self._update_marker_image()
+        else:
+            self._array_item.deleteLater() # type: ignore
+            self._array_item = None
+
+    def update_data(self) -> None:
+        if self._array_item is not None:
+            self._chart_series.clear()
+            self._array_item.set_data(*self.model.values(self._name))
+        else:
+            self.points = self.model.column_points(self._name)
+
+    def append_data(self, x: np.ndarray, y: np.ndarray, removed: int) -> None:
+        """Add points to the end of the series without redrawing the existing ones."""
+        if self._array_item is not None:
+            self._array_item.set_data(*self.model.values(self._name))
+            return
+
+        self._chart_series.append([QPointF(i, v) for i, v in zip(x.tolist(), y.tolist())])
+        # Some of the new points may be removed as well
+        removed = min(removed, self._chart_series.count())
+        if removed:
+            self._chart_series.removePoints(0, removed)
+
+    def select_points(self, x_values: np.ndarray) -> None:
+        """Display markers on the points nearest to each x value."""
+        x, y = self.model.values(self._name)
+        indices = nearest_indices(x, x_values)
+        self._chart_series.deselectAllPoints()
+        if self._array_item is not None:
+            self._array_item.set_markers(x[indices], y[indices])
+        else:
+            self._chart_series.selectPoints(indices.tolist())
+
+    def deselect_all_points(self) -> None:
+        self._chart_series.deselectAllPoints()
+        if self._array_item is not None:
+            self._array_item.set_markers(np.empty(0), np.empty(0))
+
     @property
     def color(self) -> QColor:
         return self._chart_series.color()
@@ -106,6 +182,8 @@ class ViewSeries(QObject):
         pen = self._chart_series.pen()
         pen.setWidth(width)
         self._chart_series.setPen(pen)
+        if self._array_item is not None:
+            self._array_item.width = width
 
     @property
     def marker_shape(self) -> MarkerShape | None:
@@ -128,37 +206,39 @@ class ViewSeries(QObject):
     def marker_size(self, size: float) -> None:
         if size != self._chart_series.markerSize():
             self._chart_series.setMarkerSize(size)
+            self._update_marker_image()
 
     def _update_marker_image(self) -> None:
         if self._marker_shape is None:
-            self._chart_series.setSelectedLightMarker(QImage())
+            image = QImage()
         else:
-            self._chart_series.setSelectedLightMarker(
-                MarkerGenerator.get_marker(self._marker_shape, 50, self.color)
-            )
+            image = MarkerGenerator.get_marker(self._marker_shape, 50, self.color)
+
+        self._chart_series.setSelectedLightMarker(image)
+        if self._array_item is not None:
+            self._array_item.set_marker_image(image, self.marker_size)
 
     def _color_changed(self, color: QColor) -> None:
-        if self._color_widget:
-            self._color_widget.color = color
+        self._update_color_data()
+        self.controller.overview.set_color(self._name, color)
+        if self._array_item is not None:
+            self._array_item.color = color
         self._update_marker_image()
 
-    def _parent_changed(self) -> None:
-        if self._tree_item.treeWidget():
-            if self._color_widget is None:
-                self._color_widget = ColorWidget(self._chart_series.color())
-                self._color_widget.clicked.connect(self.legend_clicked)
-            self._tree_item.treeWidget().setItemWidget(
-                self._tree_item, 1, self._color_widget
-            )
-        elif self._color_widget is not None:
-            self._color_widget.deleteLater()
-            self._color_widget = None
+    def _visible_changed(self) -> None:
+        if self._array_item is not None:
+            self._array_item.setVisible(self._chart_series.isVisible())
+        self.controller.overview.set_visible(self._name, self._chart_series.isVisible())
+
+    def _update_color_data(self) -> None:
+        # The swatch in the tree is painted from the item's data by a ColorDelegate
+        self._tree_item.setData(1, ColorDelegate.color_role, self._chart_series.color())
 
     def deleteLater(self) -> None:
         self._chart_series.deleteLater()
 
-        if self._color_widget is not None:
-            self._color_widget.deleteLater()
+        if self._array_item is not None:
+            self._array_item.deleteLater()
 
         if self._tree_item.parent():
             self._tree_item.parent().removeChild(self._tree_item)
@@ -167,6 +247,14 @@ class ViewSeries(QObject):
 
 class ViewController(QObject):
     legend_clicked = Signal(ViewSeries)
+    region_changed = Signal()
+    # Emitted when the model's data changes or the model is replaced
+    data_changed = Signal()
+
+    # Max distance in pixels from the cursor to show a tooltip for a point
+    hover_distance = 10
+    # Models larger than this are drawn with ArraySeriesItem instead of QLineSeries
+    array_renderer_threshold = 500000
 
     def __init__(
         self,
@@ -180,8 +268,12 @@ class ViewController(QObject):
         self._name: str | None = None
         self._tooltip_lines: list[str] = []
         self._view_series: dict[QTreeWidgetItem, ViewSeries] = {}
+        # The same series looked up by name, kept in sync with the model's names
+        self._series_names: dict[str, ViewSeries] = {}
 
         self._series_width = 1
+        self._use_array_renderer = False
+        self._marker_range: tuple[float, float] | None = None
         self._marker_size = 10
         self._marker_count = 5
         self._display_markers = display_markers
@@ -193,6 +285,9 @@ class ViewController(QObject):
         self._chart_view = InteractiveChart()
         self._chart_view.setRenderHint(QPainter.RenderHint.Antialiasing, False)
         self._chart_view.chart().legend().hide()
+        self._chart_view.regionSelected.connect(self.region_changed)
+        self._chart_view.regionCleared.connect(self.region_changed)
+        self._chart_view.mouseHovered.connect(self._mouse_hovered)
 
         self._x_axis = QValueAxis()
         self._y_axis = QValueAxis()
@@ -200,13 +295,27 @@ class ViewController(QObject):
         self.chart.addAxis(self._x_axis, Qt.AlignmentFlag.AlignBottom)
         self.chart.addAxis(self._y_axis, Qt.AlignmentFlag.AlignLeft)
 
+        # The whole recording is shown in a strip below the chart
+        self._overview = OverviewStrip()
+        self._overview.windowChanged.connect(self._overview_window_changed)
+        self._overview_update = UpdateCoalescer(self._update_overview, parent=self)
+
+        self._widget = QWidget()
+        layout = QVBoxLayout(self._widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+        layout.addWidget(self._chart_view)
+        layout.addWidget(self._overview)
+
         self.set_item_parent(item_parent)
         self.set_model(model, undo=False) # type: ignore
         self.set_name(name, undo=False) # type: ignore
 
         # Wait until after we adjust the ranges to start monitoring them
-        self._x_axis.rangeChanged.connect(self._axis_range_changed)
-        self._y_axis.rangeChanged.connect(self._axis_range_changed)
+        # Markers only depend on the x-axis. Pan and zoom can change
+        # the range many times per frame so only update once per frame.
+        self._axis_range_update = UpdateCoalescer(self._axis_range_changed, parent=self)
+        self._x_axis.rangeChanged.connect(self._axis_range_update.request)
 
         self._axis_range_changed()
 
@@ -218,7 +327,7 @@ class ViewController(QObject):
             series = self._view_series.get(key)
         elif isinstance(key, str):
             name = key
-            series = self._get_series_from_name(key)
+            series = self._series_names.get(key)
 
         if series is None:
             raise KeyError(f"{name} not in {self.name}")
@@ -229,7 +338,7 @@ class ViewController(QObject):
         if isinstance(key, QTreeWidgetItem):
             return key in self._view_series
         elif isinstance(key, str):
-            return self._get_series_from_name(key) is not None
+            return key in self._series_names
 
     def __iter__(self):
         yield from self._view_series.values()
@@ -267,20 +376,26 @@ class ViewController(QObject):
 
         model.series_added.connect(self._add_series)
         model.series_removed.connect(self._remove_series)
+        model.name_changed.connect(self._series_renamed)
         model.data_changed.connect(self._data_changed)
+        model.rows_appended.connect(self._rows_appended)
         self._model = model
 
         # Sync series to the new model keeping any existing series
         for name in sorted(removed_series):
             self._remove_series(name)
 
+        # Pick the renderer before adding any data so large
+        # models never have their points generated.
+        self._update_renderer(update_data=False)
+
         for name in sorted(added_series):
             self._add_series(name)
 
-        all_points = self._model.points
-        for name, points in all_points.items():
-            if name in self and name not in added_series:
-                self[name].points = points
+        added = set(added_series)
+        for series in self:
+            if series.name not in added:
+                series.update_data()
 
         self._x_axis.setTitleText(model.x_axis)
         self._y_axis.setTitleText(model.y_axis)
@@ -306,9 +421,6 @@ class ViewController(QObject):
         elif isinstance(parent, QTreeWidgetItem):
             parent.addChild(self._tree_item)
 
-        for series in self:
-            series._parent_changed()
-
     @property
     def tree_item(self) -> QTreeWidgetItem:
         return self._tree_item
@@ -317,6 +429,15 @@ class ViewController(QObject):
     def chart_view(self) -> InteractiveChart:
         return self._chart_view
 
+    @property
+    def overview(self) -> OverviewStrip:
+        return self._overview
+
+    @property
+    def widget(self) -> QWidget:
+        """The chart with the overview strip below it."""
+        return self._widget
+
     @property
     def chart(self) -> QChart:
         return self._chart_view.chart()
@@ -389,7 +510,21 @@ class ViewController(QObject):
         self._x_axis.setRange(x_min, x_max)
         self._y_axis.setRange(y_min, y_max)
         #TODO: Find a better way...
-        self._chart_view._update_callouts()
+        self._chart_view.update_callouts()
+
+    @property
+    def region(self) -> tuple[float, float] | None:
+        return self._chart_view.region
+
+    def region_stats(self) -> dict[str, RegionStats | None]:
+        if self.region is None:
+            return {}
+
+        start, end = self.region
+        return {
+            series.name: self._model.region_index(series.name).stats(start, end)
+            for series in self
+        }
 
     def crop(self) -> None:
         x_min = self._x_axis.min()
@@ -413,33 +548,22 @@ class ViewController(QObject):
         self.set_model(new_model, title="Crop") #type: ignore
 
     def fit_contents(self) -> None:
-        # Get a list of visible series
-        cols = [
-            series.name
+        # Use the cached stats of the visible series so
+        # we don't have to scan the underlying data.
+        stats = [
+            self._model.column_stats(series.name)
             for series in self._view_series.values()
             if series.chart_series.isVisible()
         ]
+        stats = [s for s in stats if not s.empty]
 
-        if not cols:
+        if not stats:
             return
 
-        # Create a dataframe with only the visible data
-        df = self._model.df[cols]
-        # Drop rows missing all data. This gives us accurate
-        # min/max values for our visible series.
-        df = df.dropna(how="all")
-
-        x_min = df.index.min()
-        x_max = df.index.max()
-        if df.index.inferred_type == "timedelta64":
-            x_min = x_min.total_seconds()
-            x_max = x_max.total_seconds()
-        elif df.index.inferred_type == "datetime64":
-            x_min = (x_min - pd.Timestamp("1970-01-01")) // pd.Timedelta("1s")
-            x_max = (x_max - pd.Timestamp("1970-01-01")) // pd.Timedelta("1s")
-
-        y_min = df.min(axis=1).min()
-        y_max = df.max(axis=1).max()
+        x_min = min(s.x_min for s in stats)
+        x_max = max(s.x_max for s in stats)
+        y_min = min(s.min for s in stats)
+        y_max = max(s.max for s in stats)
         # Add some margin to the y axis
         y_min -= abs(y_min * 0.1)
         y_max += abs(y_max * 0.1)
@@ -450,27 +574,55 @@ class ViewController(QObject):
         if color != series.color:
             series.color = color
 
-    def _generate_tooltip_text(self, pos: QPointF) -> str:
-        name = ""
-        sender = self.sender()
-        if isinstance(sender, QLineSeries):
-            name = sender.name() + "\n"
-
+    def _generate_tooltip_text(self, name: str, pos: QPointF) -> str:
         x_title = self.chart.axisX().titleText() or 'X'
         y_title = self.chart.axisY().titleText() or 'Y'
-        return f"{name}{x_title}: {pos.x():.2f}\n{y_title}: {pos.y():.2f}"
+        return f"{name}\n{x_title}: {pos.x():.2f}\n{y_title}: {pos.y():.2f}"
+
+    def _find_nearest_point(self, pos: QPointF) -> tuple[ViewSeries, QPointF] | None:
+        plot_area = self.chart.plotArea()
+        x_range = self._x_axis.max() - self._x_axis.min()
+        y_range = self._y_axis.max() - self._y_axis.min()
+        if not x_range or not y_range:
+            return None
+
+        # Pixels per unit on each axis
+        x_scale = plot_area.width() / x_range
+        y_scale = plot_area.height() / y_range
+        # Only search samples within the hover distance of the cursor
+        x_distance = self.hover_distance / x_scale
+
+        nearest = None
+        nearest_distance = self.hover_distance
+        for series in self:
+            if not series.chart_series.isVisible():
+                continue
+
+            x, y = self._model.values(series.name)
+            start = np.searchsorted(x, pos.x() - x_distance, side="left")
+            end = np.searchsorted(x, pos.x() + x_distance, side="right")
+            if start >= end:
+                continue
+
+            distances = np.hypot(
+                (x[start:end] - pos.x()) * x_scale,
+                (y[start:end] - pos.y()) * y_scale,
+            )
+            i = int(distances.argmin())
+            if distances[i] <= nearest_distance:
+                nearest_distance = distances[i]
+                nearest = (series, QPointF(x[start + i], y[start + i]))
 
-    def _point_hovered(self, pos: QPointF, state: bool) -> None:
-        if state:
-            tooltip_text = self._generate_tooltip_text(pos)
-            self.chart_view.show_tooltip(pos, tooltip_text)
-        else:
-            self.chart_view.tooltip.hide()
+        return nearest
 
-    def _point_double_clicked(self, pos: QPointF):
-        #tooltip_text = self._generate_tooltip_text(pos)
-        #self.chart_view.show_tooltip(pos, tooltip_text)
-        self.chart_view.keep_tooltip()
+    def _mouse_hovered(self, pos: QPointF) -> None:
+        nearest = self._find_nearest_point(pos)
+        if nearest is None:
+            self.chart_view.tooltip.hide()
+        else:
+            series, point = nearest
+            tooltip_text = self._generate_tooltip_text(series.name, point)
+            self.chart_view.show_tooltip(point, tooltip_text)
 
     def _add_series(self, name: str) -> ViewSeries:
         view_series = ViewSeries(name, parent=self)
@@ -483,23 +635,23 @@ class ViewController(QObject):
         self.chart.addSeries(chart_series)
         chart_series.attachAxis(self._x_axis)
         chart_series.attachAxis(self._y_axis)
-        chart_series.hovered.connect(self._point_hovered)
-        chart_series.doubleClicked.connect(self._point_double_clicked)
 
         tree_item = view_series.tree_item
         tree_item.setCheckState(0, Qt.CheckState.Checked)
 
         view_series.width = self._series_width
-        view_series.points = self._model.points[name]
+        view_series.use_array_renderer = self._use_array_renderer
+        view_series.update_data()
 
         self._view_series[tree_item] = view_series
+        self._series_names[name] = view_series
 
         return view_series
 
     def _remove_series(self, series: str | QTreeWidgetItem | ViewSeries) -> None:
         view_series = None
         if isinstance(series, str):
-            view_series = self._get_series_from_name(series)
+            view_series = self._series_names.get(series)
         elif isinstance(series, QTreeWidgetItem):
             view_series = self._view_series.get(series)
         elif isinstance(series, ViewSeries):
@@ -509,8 +661,18 @@ class ViewController(QObject):
             raise ValueError(f"Could not find {series} in {self.name}")
 
         self._view_series.pop(view_series.tree_item)
+        self._series_names.pop(view_series.name, None)
+        self._overview.remove(view_series.name)
         view_series.deleteLater()
 
+    def _series_renamed(self, old: str, new: str) -> None:
+        series = self._series_names.pop(old, None)
+        if series is not None:
+            self._series_names[new] = series
+            self._overview.rename(old, new)
+            if series.name != new:
+                series._rename(new)
+
     def _update_tooltip(self) -> None:
         lines = self._tooltip_lines.copy()
         lines.append(f"Points: {self._model.shape[0]:n}")
@@ -519,52 +681,84 @@ class ViewController(QObject):
 
         self._tree_item.setToolTip(0, "\n".join(lines))
 
+        stats = self._model.stats
+        for series in self:
+            if series.name in stats:
+                series.tree_item.setToolTip(0, stats[series.name].to_text())
+
     def _data_changed(self) -> None:
         self._update_tooltip()
-        # Use OpenGL with larger datasets
-        use_opengl = self._model.size > 500000
+        if self.region is not None:
+            self.region_changed.emit()
+        self._update_renderer()
+        if self._display_markers:
+            self._update_marker_points()
+        self._overview_update.request()
+        self.data_changed.emit()
+
+    def _rows_appended(
+        self, changes: dict[str, tuple[np.ndarray, np.ndarray, int]], previous_end: float
+    ) -> None:
+        x_min = self._x_axis.min()
+        x_max = self._x_axis.max()
+        # If the end of the data was in view before
+        # the rows were added keep following it.
+        following = x_max >= previous_end
+
         for series in self:
-            cs = series.chart_series
-            if cs.useOpenGL() != use_opengl:
-                cs.setUseOpenGL(use_opengl)
-                # Bug when disabling opengl causes the "old"
-                # series data to still be drawn on top of
-                # the new series data. Hide and show fixes this.
-                if cs.isVisible():
-                    QTimer.singleShot(10, series.chart_series.hide)
-                    QTimer.singleShot(20, series.chart_series.show)
+            if series.name in changes:
+                series.append_data(*changes[series.name])
+
+        added = [(x, y) for x, y, _ in changes.values() if x.size]
+        if following and added:
+            end = max(x[-1] for x, _ in added)
+            self.setAxisRanges(
+                end - (x_max - x_min),
+                end,
+                min([self._y_axis.min()] + [y.min() for _, y in added]),
+                max([self._y_axis.max()] + [y.max() for _, y in added]),
+            )
+
+    def _update_renderer(self, update_data: bool = True) -> None:
+        # Draw larger datasets directly from the model's arrays
+        use_array_renderer = self._model.size > self.array_renderer_threshold
+        if use_array_renderer != self._use_array_renderer:
+            self._use_array_renderer = use_array_renderer
+            for series in self:
+                series.use_array_renderer = use_array_renderer
+                if update_data:
+                    series.update_data()
 
     def _update_marker_points(self) -> None:
         if not self._display_markers:
+            self._marker_range = None
             for series in self:
-                series.chart_series.deselectAllPoints()
+                series.deselect_all_points()
             return
 
-        start = self._x_axis.min()
-        end = self._x_axis.max()
-
+        self._marker_range = (self._x_axis.min(), self._x_axis.max())
         # Create linearly spaced points even with the axis tick counts
-        indices = np.linspace(start, end, self._marker_count)
-
-        df = self._model.df
-        if df.index.inferred_type == "timedelta64":
-            start = pd.to_timedelta(start, "S")
-            end = pd.to_timedelta(end, "S")
-            indices = pd.to_timedelta(indices, "S")
-
-        points = df.index.get_indexer(indices, method="nearest")
-        for series in self._view_series.values():
-            series.chart_series.deselectAllPoints()
-            series.chart_series.selectPoints(points)
+        x_values = np.linspace(*self._marker_range, self._marker_count)
+        for series in self:
+            series.select_points(x_values)
 
     def _axis_range_changed(self) -> None:
-        if self._display_markers:
+        x_range = (self._x_axis.min(), self._x_axis.max())
+        if self._display_markers and x_range != self._marker_range:
             self._update_marker_points()
+        self._overview.set_window(*x_range)
+
+    def _update_overview(self) -> None:
+        self._overview.setVisible(not self._model.empty)
+        # Only references to the data are taken here. Dropping NaN values
+        # and sorting them is left to the thread building the envelopes.
+        for series in self:
+            values = partial(valid_values, *self._model.raw_values(series.name))
+            self._overview.set_data(series.name, values, series.color)
 
-    def _get_series_from_name(self, name: str) -> ViewSeries | None:
-        for s in self._view_series.values():
-            if s.name == name:
-                return s
+    def _overview_window_changed(self, start: float, end: float) -> None:
+        self._x_axis.setRange(start, end)
+        self._chart_view.update_callouts()
 
     def _legend_clicked(self) -> None:
         self.legend_clicked.emit(self.sender())
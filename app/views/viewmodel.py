@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from typing import TYPE_CHECKING
+
 import numpy as np
 import pandas as pd
 from endaq.calc.utils import sample_spacing
 from PySide6.QtCore import QObject, QPointF, QPointFList, Signal
 
-from app.utils import generate_time_index
+from app.utils import generate_time_index, index_to_float, valid_values
+from app.utils.appendarray import AppendArray
+
+from .statistics import ColumnStats, RegionIndex
+
+if TYPE_CHECKING:
+    from app.plugins.viewmodelplugin import ViewModelPlugin
 
 
 class ViewModel(QObject):
@@ -14,6 +22,9 @@ class ViewModel(QObject):
     series_removed = Signal(str)
     name_changed = Signal(str, str)
     sample_rate_changed = Signal(float)
+    # Column name: (appended x values, appended y values, number of points removed)
+    # and the x value of the last row before the new rows.
+    rows_appended = Signal(dict, float)
 
     def __init__(
         self,
@@ -21,18 +32,35 @@ class ViewModel(QObject):
         y_axis: str = "",
         x_axis: str | None = None,
         points: dict[str, QPointFList] | None = None,
+        stats: dict[str, ColumnStats] | None = None,
         parent: QObject | None = None,
         lazy: bool = True,
+        copy: bool = True,
     ):
         super().__init__(parent)
 
         self.data_changed.connect(self._update_sample_rate)
+        self.data_changed.connect(self._clear_supported)
 
-        self._df = df.copy()
+        # Callers handing over a frame nothing else uses can skip the copy
+        self._df = df.copy() if copy else df
         self._y_axis = y_axis
         self._x_axis = x_axis
         self._points: dict[str, QPointFList] = {}
+        self._stats: dict[str, ColumnStats] = {} if stats is None else stats.copy()
+        self._region_indexes: dict[str, RegionIndex] = {}
+        self._values: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        # The index and columns appended rows are written into. They only
+        # hold the frame while it is still the one built from them.
+        self._row_buffers: tuple[AppendArray, list[AppendArray]] | None = None
+        self._buffered_df: pd.DataFrame | None = None
+        # The same for each column's values along with the values built from them
+        self._value_buffers: dict[
+            str, tuple[AppendArray, AppendArray, tuple[np.ndarray, np.ndarray]]
+        ] = {}
         self._sample_rate: int = 0
+        # Whether each plugin can process the model, checked as it's needed
+        self._supported: dict[ViewModelPlugin, bool] = {}
 
         self._update_sample_rate()
 
@@ -46,19 +74,35 @@ class ViewModel(QObject):
         key = list(key)
 
         points = {}
+        stats = {}
         for name in key:
             if not isinstance(name, str):
                 raise TypeError(f"Invalid key type. Expected string, got {type(name)}.")
 
             if name in self._points:
                 points[name] = self._points[name]
+            if name in self._stats:
+                stats[name] = self._stats[name]
 
-        return ViewModel(self._df[key], points=points)
+        return ViewModel(self._df[key], points=points, stats=stats)
 
     @property
     def df(self) -> pd.DataFrame:
         return self._df.copy()
 
+    def snapshot(self) -> pd.DataFrame:
+        """Return the frame as it is now without copying its values.
+
+        The model only ever replaces its values and columns rather than
+        changing them in place, so the snapshot is safe to read from
+        another thread while the model keeps changing.
+        """
+        return self._df.copy(deep=False)
+
+    @property
+    def columns(self) -> list[str]:
+        return [str(col) for col in self._df.columns]
+
     @property
     def x_axis(self) -> str:
         if self._x_axis is not None:
@@ -90,6 +134,54 @@ class ViewModel(QObject):
 
         return self._points.copy()
 
+    def column_points(self, name: str) -> QPointFList:
+        # Only generate the points for the requested column
+        if name not in self._points:
+            self._points[name] = self._series_to_points(self._df[name])
+        return self._points[name]
+
+    @property
+    def stats(self) -> dict[str, ColumnStats]:
+        # Lazily calculate the stats. They are kept up to date
+        # when merging, renaming and removing series so each
+        # column only needs to be scanned once.
+        missing = [col for col in self._df if str(col) not in self._stats]
+        if missing:
+            x = index_to_float(self._df.index)
+            for col in missing:
+                y = self._df[col].to_numpy(dtype=float)
+                self._stats[str(col)] = ColumnStats.from_values(x, y)
+
+        return self._stats.copy()
+
+    def column_stats(self, name: str) -> ColumnStats:
+        if name not in self._stats:
+            x = index_to_float(self._df.index)
+            y = self._df[name].to_numpy(dtype=float)
+            self._stats[name] = ColumnStats.from_values(x, y)
+        return self._stats[name]
+
+    def values(self, name: str) -> tuple[np.ndarray, np.ndarray]:
+        """Return the x and y values of a column without NaN values, sorted by x."""
+        if name not in self._values:
+            self._values[name] = valid_values(*self.raw_values(name))
+        return self._values[name]
+
+    def raw_values(self, name: str) -> tuple[pd.Index, np.ndarray]:
+        """Return the index and values of a column as they are stored.
+
+        Nothing is converted so this is cheap enough to hand the data to
+        another thread, which can pass them to valid_values.
+        """
+        return self._df.index, self._df[name].to_numpy()
+
+    def region_index(self, name: str) -> RegionIndex:
+        # Building the index requires a full pass over the column
+        # so only do it the first time a region is requested.
+        if name not in self._region_indexes:
+            self._region_indexes[name] = RegionIndex(*self.values(name))
+        return self._region_indexes[name]
+
     @property
     def empty(self) -> bool:
         return self._df.empty
@@ -98,8 +190,20 @@ class ViewModel(QObject):
     def sample_rate(self) -> int:
         return self._sample_rate
 
+    def supported_by(self, plugin: ViewModelPlugin) -> bool:
+        """Return whether the plugin can process the model.
+
+        The answer is kept until the data changes so checking every plugin
+        each time the selection changes stays cheap.
+        """
+        if plugin not in self._supported:
+            self._supported[plugin] = plugin.can_process(self)
+        return self._supported[plugin]
+
     def copy(self) -> "ViewModel":
-        return ViewModel(df=self._df, y_axis=self._y_axis, points=self._points)
+        return ViewModel(
+            df=self._df, y_axis=self._y_axis, points=self._points, stats=self._stats
+        )
 
     def remove_series(self, name: str) -> None:
         assert name in self._df
@@ -108,10 +212,148 @@ class ViewModel(QObject):
         self._df.drop(name, axis="columns", inplace=True)
         if name in self._points:
             del self._points[name]
+        self._stats.pop(name, None)
+        self._region_indexes.pop(name, None)
+        self._values.pop(name, None)
 
         self.series_removed.emit(name)
         self.data_changed.emit()
 
+    def append(self, df: pd.DataFrame, max_rows: int | None = None) -> None:
+        """Add rows to the end of the model.
+
+        The rows must have the same columns as the model and come after
+        the existing rows. If max_rows is given the oldest rows are dropped
+        to keep the model at that size. Only the new and dropped rows are
+        touched. The rows are written into buffers with room to spare and
+        cached points, stats and values are trimmed and extended in place.
+        """
+        if df.empty:
+            return
+
+        if set(df.columns) != set(self._df.columns):
+            raise ValueError("Appended rows must have the same columns")
+
+        previous_end = float("-inf")
+        if not self._df.empty:
+            previous_end = float(index_to_float(self._df.index[-1:])[0])
+
+        df = df[self._df.columns]
+        rows = len(self._df)
+        removed = 0
+        if max_rows is not None and rows + len(df) > max_rows:
+            removed = rows + len(df) - max_rows
+        if removed <= rows:
+            trimmed = self._df.iloc[:removed]
+        else:
+            # Some of the new rows are dropped as well
+            trimmed = pd.concat([self._df, df.iloc[: removed - rows]])
+        self._df = self._append_rows(df, removed)
+
+        x = index_to_float(df.index)
+        trimmed_x = index_to_float(trimmed.index)
+        changes = {}
+        for col in df:
+            name = str(col)
+            y = df[col].to_numpy(dtype=float)
+            valid = ~np.isnan(y)
+            new_x = x[valid]
+            new_y = y[valid]
+            trimmed_y = trimmed[col].to_numpy(dtype=float)
+            removed_points = int(np.count_nonzero(~np.isnan(trimmed_y)))
+
+            if name in self._points:
+                points = self._points[name]
+                for i, v in zip(new_x.tolist(), new_y.tolist()):
+                    points.append(QPointF(i, v))
+                # Qt removes items from the front of a list in constant time
+                for _ in range(min(removed_points, len(points))):
+                    points.pop_front()
+
+            if name in self._stats:
+                stats = self._stats[name].combined(ColumnStats.from_values(x, y))
+                if removed:
+                    stats = stats.trimmed(
+                        ColumnStats.from_values(trimmed_x, trimmed_y),
+                        lambda rows: index_to_float(self._df.index[rows]),
+                        self._df[col].to_numpy(dtype=float),
+                    )
+                self._stats[name] = stats
+
+            if name in self._values:
+                self._append_values(name, new_x, new_y, removed_points)
+
+            self._region_indexes.pop(name, None)
+            changes[name] = (new_x, new_y, removed_points)
+
+        self.rows_appended.emit(changes, previous_end)
+        self.data_changed.emit()
+
+    def _append_rows(self, df: pd.DataFrame, removed: int) -> pd.DataFrame:
+        """Return the frame with the rows appended and its first rows removed.
+
+        The rows are written into buffers the frame is a view of, so the
+        rows kept are only copied when the buffers run out of room.
+        """
+        buffers = self._row_buffers
+        if (
+            buffers is None
+            or self._buffered_df is not self._df
+            or len(buffers[1]) != self._df.shape[1]
+        ):
+            buffers = _frame_buffers(self._df)
+
+        index, columns = buffers
+        new_index = df.index.to_numpy()
+        new_columns = [df.iloc[:, i].to_numpy() for i in range(df.shape[1])]
+        if index.can_hold(new_index) and all(
+            column.can_hold(values) for column, values in zip(columns, new_columns)
+        ):
+            index.extend(new_index)
+            for column, values in zip(columns, new_columns):
+                column.extend(values)
+        else:
+            # The new rows need a wider type so start again from all of the rows
+            index, columns = _frame_buffers(pd.concat([self._df, df]))
+
+        index.drop(removed)
+        for column in columns:
+            column.drop(removed)
+
+        frame = pd.DataFrame(
+            {col: column.values for col, column in zip(self._df.columns, columns)},
+            index=pd.Index(index.values, name=self._df.index.name, copy=False),
+            copy=False,
+        )
+        self._row_buffers = (index, columns)
+        self._buffered_df = frame
+        return frame
+
+    def _append_values(
+        self, name: str, x: np.ndarray, y: np.ndarray, removed: int
+    ) -> None:
+        """Extend the cached values of a column the same way as its rows."""
+        old_x, old_y = self._values[name]
+        in_order = (
+            not old_x.size or not x.size or x[0] >= old_x[-1]
+        ) and not np.any(x[1:] < x[:-1])
+        if not in_order:
+            del self._values[name]
+            return
+
+        buffers = self._value_buffers.get(name)
+        if buffers is None or buffers[2] is not self._values[name]:
+            buffers = (AppendArray(old_x), AppendArray(old_y), self._values[name])
+        x_buffer, y_buffer, _ = buffers
+        x_buffer.extend(x)
+        y_buffer.extend(y)
+        x_buffer.drop(removed)
+        y_buffer.drop(removed)
+
+        values = (x_buffer.values, y_buffer.values)
+        self._values[name] = values
+        self._value_buffers[name] = (x_buffer, y_buffer, values)
+
     def difference(self, other: ViewModel | None) -> list[str]:
         if other is None:
             return list(self._df.columns)
@@ -127,6 +369,9 @@ class ViewModel(QObject):
         if self.empty:
             self._df = other._df
             self._points = other._points
+            self._stats = other._stats.copy()
+            self._region_indexes = other._region_indexes.copy()
+            self._values = other._values.copy()
             self._y_axis = other._y_axis
         else:
             # We only want to add new columns.
@@ -146,8 +391,14 @@ class ViewModel(QObject):
                 # resample the dataframe we should redraw the new data
                 # so the user can see exactly how the data was modified.
                 other_points = {}
+                other_stats = {}
+                other_indexes = {}
+                other_values = {}
             else:
                 other_points = other._points
+                other_stats = other._stats
+                other_indexes = other._region_indexes
+                other_values = other._values
 
             self._df = pd.concat([self._df, new_df], axis="columns")
             self._df.sort_index(inplace=True)
@@ -156,6 +407,21 @@ class ViewModel(QObject):
                 # Use points from other if they have been generated
                 if col in other_points:
                     self._points[col] = other_points[col]
+                if col in other_stats:
+                    self._stats[col] = other_stats[col]
+                # Region indexes and values skip NaN values so they
+                # aren't affected by the padding added by concat.
+                if col in other_indexes:
+                    self._region_indexes[col] = other_indexes[col]
+                if col in other_values:
+                    self._values[col] = other_values[col]
+
+            # Concatenating only pads columns with NaN so the
+            # existing stats are still valid apart from their size.
+            size = len(self._df)
+            for col, stats in self._stats.items():
+                if stats.size != size:
+                    self._stats[col] = stats.resized(size)
 
         # Wait until we're done to emit the signals
         for col in new_cols:
@@ -163,6 +429,30 @@ class ViewModel(QObject):
 
         self.data_changed.emit()
 
+    @classmethod
+    def combine(cls, models: list[ViewModel]) -> ViewModel:
+        """Return a single model with the columns of all of the given models.
+
+        Models with the same sample rate are joined in one step rather than
+        merging them one at a time. Otherwise they are merged in order.
+        """
+        combined = cls()
+        if not models:
+            return combined
+
+        first = models[0]
+        columns = [col for model in models for col in model._df.columns]
+        same_rate = all(model.sample_rate == first.sample_rate for model in models)
+        same_type = all(model.index_type == first.index_type for model in models)
+        if same_rate and same_type and len(set(columns)) == len(columns):
+            df = pd.concat([model._df for model in models], axis="columns")
+            df.sort_index(inplace=True)
+            return cls(df, y_axis=first.y_axis)
+
+        for model in models:
+            combined.merge(model)
+        return combined
+
     def can_merge(self, other: ViewModel | None) -> bool:
         if self.empty:
             return True
@@ -183,9 +473,18 @@ class ViewModel(QObject):
         for old, new in columns.items():
             if old in self._points:
                 self._points[new] = self._points.pop(old)
+            if old in self._stats:
+                self._stats[new] = self._stats.pop(old)
+            if old in self._region_indexes:
+                self._region_indexes[new] = self._region_indexes.pop(old)
+            if old in self._values:
+                self._values[new] = self._values.pop(old)
 
             self.name_changed.emit(old, new)
 
+    def _clear_supported(self) -> None:
+        self._supported.clear()
+
     def _update_sample_rate(self) -> None:
         sample_rate = 0
         if self.index_type == "timedelta64":
@@ -198,10 +497,7 @@ class ViewModel(QObject):
             self.sample_rate_changed.emit(sample_rate)
 
     def _series_to_points(self, series: pd.Series) -> QPointFList:
-        if series.index.inferred_type == "timedelta64":
-            series.index = series.index.total_seconds() #type: ignore
-        elif series.index.inferred_type == "datetime64":
-            series.index = series.index.astype(np.int64) // 10**9
+        series.index = index_to_float(series.index)
 
         series = series.astype(float).dropna()
         points = QPointFList()
@@ -215,3 +511,10 @@ class ViewModel(QObject):
         for col, series in df.items():
             d[col] = self._series_to_points(series)
         return d
+
+
+def _frame_buffers(df: pd.DataFrame) -> tuple[AppendArray, list[AppendArray]]:
+    return (
+        AppendArray(df.index.to_numpy()),
+        [AppendArray(df.iloc[:, i].to_numpy()) for i in range(df.shape[1])],
+    )
@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import zipfile
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+WORKSPACE_EXTENSION = "axw"
+
+
+class WorkspaceError(Exception):
+    pass
+
+
+@dataclass
+class WorkspaceView:
+    """A view stored within a workspace file."""
+
+    metadata: dict
+    columns: list[str]
+    axis_ranges: tuple[float, float, float, float] | None = None
+    index_name: str | None = None
+    # Position of the view within the workspace. Used for the member names.
+    number: int = field(default=0, repr=False)
+
+
+class Workspace:
+    """Binary file containing any number of views.
+
+    The file is a zip archive with a JSON manifest describing each view
+    and one .npy member for the index and each column of every view. This
+    allows single views or columns to be loaded without reading the rest
+    of the file. Members are stored uncompressed by default so load_index
+    and load_column can memory map them straight from the file.
+    """
+
+    manifest_name = "manifest.json"
+    version = 1
+
+    def __init__(self, file: Path | str) -> None:
+        self._file = Path(file)
+        self._zip = zipfile.ZipFile(self._file, "r")
+        try:
+            manifest = json.loads(self._zip.read(self.manifest_name))
+        except (KeyError, ValueError) as ex:
+            self._zip.close()
+            raise WorkspaceError(f"{self._file.name} is not a valid workspace") from ex
+
+        self._views = [
+            WorkspaceView(
+                metadata=view["metadata"],
+                columns=view["columns"],
+                axis_ranges=tuple(view["axis_ranges"]) if view["axis_ranges"] else None,
+                index_name=view["index_name"],
+                number=i,
+            )
+            for i, view in enumerate(manifest["views"])
+        ]
+
+    def __enter__(self) -> "Workspace":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+    @property
+    def views(self) -> list[WorkspaceView]:
+        return self._views.copy()
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def load_index(self, view: WorkspaceView) -> np.ndarray:
+        return self._load_array(_index_member(view.number))
+
+    def load_column(self, view: WorkspaceView, column: str) -> np.ndarray:
+        return self._load_array(_column_member(view.number, view.columns.index(column)))
+
+    def load_view(
+        self, view: WorkspaceView, columns: Iterable[str] | None = None
+    ) -> pd.DataFrame:
+        """Read a view into memory.
+
+        Nothing stays mapped from the file so it can be saved over, which
+        Windows doesn't allow while any part of it is mapped.
+        """
+        if columns is None:
+            columns = view.columns
+
+        index = pd.Index(np.array(self.load_index(view)), name=view.index_name)
+        data = {column: self.load_column(view, column) for column in columns}
+        return pd.DataFrame(data, index=index, copy=True)
+
+    def _load_array(self, name: str) -> np.ndarray:
+        info = self._zip.getinfo(name)
+        if info.compress_type == zipfile.ZIP_STORED:
+            return self._memmap_array(info)
+
+        with self._zip.open(info) as f:
+            return np.lib.format.read_array(f, allow_pickle=False)
+
+    def _memmap_array(self, info: zipfile.ZipInfo) -> np.ndarray:
+        with self._file.open("rb") as f:
+            # Skip over the local file header to the start of the .npy data.
+            # The lengths of the name and extra fields are at offset 26.
+            f.seek(info.header_offset + 26)
+            name_length, extra_length = struct.unpack("<HH", f.read(4))
+            f.seek(name_length + extra_length, 1)
+
+            version = np.lib.format.read_magic(f)
+            if version == (1, 0):
+                shape, fortran, dtype = np.lib.format.read_array_header_1_0(f)
+            else:
+                shape, fortran, dtype = np.lib.format.read_array_header_2_0(f)
+            offset = f.tell()
+
+        if not shape or shape[0] == 0:
+            return np.empty(shape, dtype=dtype)
+
+        return np.memmap(
+            self._file,
+            dtype=dtype,
+            mode="r",
+            offset=offset,
+            shape=shape,
+            order="F" if fortran else "C",
+        )
+
+
+def save_workspace(
+    file: Path | str,
+    views: Iterable[tuple[WorkspaceView, pd.DataFrame]],
+    compress: bool = False,
+) -> None:
+    """Write the views and their data to a workspace file.
+
+    The file is written alongside and then swapped in so a failed save
+    leaves any existing file as it was.
+    """
+
+    file = Path(file)
+    temp_file = file.with_name(file.name + ".tmp")
+    try:
+        _write_workspace(temp_file, views, compress)
+        os.replace(temp_file, file)
+    except BaseException:
+        temp_file.unlink(missing_ok=True)
+        raise
+
+
+def _write_workspace(
+    file: Path, views: Iterable[tuple[WorkspaceView, pd.DataFrame]], compress: bool
+) -> None:
+    compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    manifest = []
+    with zipfile.ZipFile(file, "w", compression=compression) as zf:
+        for number, (view, df) in enumerate(views):
+            columns = [str(col) for col in df.columns]
+            _write_array(zf, _index_member(number), df.index.to_numpy())
+            for i, (_, series) in enumerate(df.items()):
+                _write_array(zf, _column_member(number, i), series.to_numpy())
+
+            manifest.append(
+                {
+                    "metadata": view.metadata,
+                    "columns": columns,
+                    "axis_ranges": view.axis_ranges,
+                    "index_name": df.index.name,
+                }
+            )
+
+        zf.writestr(
+            Workspace.manifest_name,
+            json.dumps({"version": Workspace.version, "views": manifest}),
+        )
+
+
+def _write_array(zf: zipfile.ZipFile, name: str, array: np.ndarray) -> None:
+    with zf.open(name, "w", force_zip64=True) as f:
+        np.lib.format.write_array(f, np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _index_member(view: int) -> str:
+    return f"views/{view}/index.npy"
+
+
+def _column_member(view: int, column: int) -> str:
+    return f"views/{view}/columns/{column}.npy"
@@ -1,5 +1,6 @@
-from .colorwidget import ColorWidget
+from .colordelegate import ColorDelegate
 from .interactivechart import InteractiveChart
+from .overviewstrip import OverviewStrip
 from .mainwindow import MainWindow
 from .optionsdialog import OptionsDialog
 from .parserdialog import ParserDialog
@@ -0,0 +1,224 @@
+import numpy as np
+from PySide6.QtCharts import QChart, QValueAxis
+from PySide6.QtCore import QPointF, QRectF, Qt, QTimer
+from PySide6.QtGui import QColor, QImage, QPainter, QPen, QPixmap, QPolygonF
+from PySide6.QtWidgets import QGraphicsObject
+
+AxisRange = tuple[float, float, float, float]
+
+
+class ArraySeriesItem(QGraphicsObject):
+    """Draws a line series directly from NumPy arrays.
+
+    Only the visible range is drawn and it is first reduced to the first,
+    min, max and last value of each pixel column. The result is cached in a
+    pixmap which is stretched to follow the axes while they are changing and
+    re-rendered once they settle.
+    """
+
+    settle_interval = 100
+    # Keep coordinates of points far outside the plot area within
+    # a range the raster engine can handle.
+    coordinate_limit = 100_000
+
+    def __init__(self, chart: QChart, x_axis: QValueAxis, y_axis: QValueAxis) -> None:
+        super().__init__(chart)
+        self._chart = chart
+        self._x_axis = x_axis
+        self._y_axis = y_axis
+
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._pen = QPen()
+        self._pen.setCosmetic(True)
+        self._marker_image = QImage()
+        self._marker_size = 10.0
+        self._marker_x = np.empty(0)
+        self._marker_y = np.empty(0)
+
+        self._cache: QPixmap | None = None
+        self._cache_range: AxisRange | None = None
+        self._dirty = True
+
+        self._settle_timer = QTimer(self)
+        self._settle_timer.setSingleShot(True)
+        self._settle_timer.setInterval(self.settle_interval)
+        self._settle_timer.timeout.connect(self._settled)
+
+        self._bounding_rect = QRectF(chart.plotArea())
+        x_axis.rangeChanged.connect(self._range_changed)
+        y_axis.rangeChanged.connect(self._range_changed)
+        chart.plotAreaChanged.connect(self._plot_area_changed)
+
+        # Draw above the chart's own series but below callouts
+        self.setZValue(5)
+
+    def set_data(self, x: np.ndarray, y: np.ndarray) -> None:
+        """Set the values to draw. X values must be sorted and neither may contain NaN."""
+        self._x = x
+        self._y = y
+        self.invalidate()
+
+    @property
+    def color(self) -> QColor:
+        return self._pen.color()
+
+    @color.setter
+    def color(self, color: QColor) -> None:
+        self._pen.setColor(color)
+        self.invalidate()
+
+    @property
+    def width(self) -> int:
+        return self._pen.width()
+
+    @width.setter
+    def width(self, width: int) -> None:
+        self._pen.setWidth(width)
+        self.invalidate()
+
+    def set_marker_image(self, image: QImage, size: float) -> None:
+        self._marker_image = image
+        self._marker_size = size
+        self.invalidate()
+
+    def set_markers(self, x: np.ndarray, y: np.ndarray) -> None:
+        self._marker_x = x
+        self._marker_y = y
+        # Markers follow the axis range so treat
+        # this the same as the range changing.
+        self._range_changed()
+
+    def invalidate(self) -> None:
+        self._dirty = True
+        self.update()
+
+    def boundingRect(self) -> QRectF:
+        return self._bounding_rect
+
+    def paint(self, painter: QPainter, option, widget=None) -> None:
+        plot_area = self._chart.plotArea()
+        axis_range = self._axis_range()
+        if self._dirty or self._cache is None:
+            ratio = widget.devicePixelRatioF() if widget is not None else 1.0
+            self._render(plot_area, axis_range, ratio)
+
+        if self._cache is None or self._cache_range is None:
+            return
+
+        if axis_range == self._cache_range:
+            painter.drawPixmap(plot_area.topLeft(), self._cache)
+        else:
+            target = self._map_range(self._cache_range, axis_range, plot_area)
+            painter.save()
+            painter.setClipRect(plot_area)
+            painter.drawPixmap(target, self._cache, QRectF(self._cache.rect()))
+            painter.restore()
+
+    def _axis_range(self) -> AxisRange:
+        return (
+            self._x_axis.min(),
+            self._x_axis.max(),
+            self._y_axis.min(),
+            self._y_axis.max(),
+        )
+
+    @staticmethod
+    def _map_range(old: AxisRange, new: AxisRange, plot_area: QRectF) -> QRectF:
+        """Map the area covered by the old axis range into the plot area of the new range."""
+        x_min, x_max, y_min, y_max = new
+        x_scale = plot_area.width() / ((x_max - x_min) or 1)
+        y_scale = plot_area.height() / ((y_max - y_min) or 1)
+
+        left = plot_area.left() + (old[0] - x_min) * x_scale
+        right = plot_area.left() + (old[1] - x_min) * x_scale
+        top = plot_area.top() + (y_max - old[3]) * y_scale
+        bottom = plot_area.top() + (y_max - old[2]) * y_scale
+        return QRectF(left, top, right - left, bottom - top)
+
+    def _to_pixels(
+        self, x: np.ndarray, y: np.ndarray, width: float, height: float, axis_range: AxisRange
+    ) -> tuple[np.ndarray, np.ndarray]:
+        x_min, x_max, y_min, y_max = axis_range
+        px = (x - x_min) * (width / ((x_max - x_min) or 1))
+        py = (y_max - y) * (height / ((y_max - y_min) or 1))
+        limit = self.coordinate_limit
+        return px.clip(-limit, limit), py.clip(-limit, limit)
+
+    def _visible_polygon(self, width: float, height: float, axis_range: AxisRange) -> QPolygonF:
+        x_min, x_max = axis_range[:2]
+        # Include one point on either side so the line reaches the edges
+        start = max(int(np.searchsorted(self._x, x_min, side="left")) - 1, 0)
+        end = min(int(np.searchsorted(self._x, x_max, side="right")) + 1, self._x.size)
+        px, py = self._to_pixels(
+            self._x[start:end], self._y[start:end], width, height, axis_range
+        )
+
+        # Drawing more than a few points per pixel column doesn't change
+        # the result. Keep the first, min, max and last point of each column.
+        if px.size > 4 * width:
+            columns = np.floor(px).astype(np.int64)
+            starts = np.flatnonzero(np.r_[True, columns[1:] != columns[:-1]])
+            ends = np.r_[starts[1:], px.size] - 1
+            px = np.repeat(px[starts], 4)
+            py = np.column_stack(
+                (
+                    py[starts],
+                    np.minimum.reduceat(py, starts),
+                    np.maximum.reduceat(py, starts),
+                    py[ends],
+                )
+            ).ravel()
+
+        return QPolygonF([QPointF(x, y) for x, y in zip(px.tolist(), py.tolist())])
+
+    def _render(self, plot_area: QRectF, axis_range: AxisRange, ratio: float) -> None:
+        self._dirty = False
+        self._cache_range = axis_range
+
+        size = plot_area.size().toSize()
+        if size.isEmpty():
+            self._cache = None
+            return
+
+        pixmap = QPixmap(size * ratio)
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(Qt.GlobalColor.transparent)
+
+        painter = QPainter(pixmap)
+        if self._x.size:
+            painter.setPen(self._pen)
+            painter.drawPolyline(
+                self._visible_polygon(plot_area.width(), plot_area.height(), axis_range)
+            )
+
+        if self._marker_x.size and not self._marker_image.isNull():
+            px, py = self._to_pixels(
+                self._marker_x,
+                self._marker_y,
+                plot_area.width(),
+                plot_area.height(),
+                axis_range,
+            )
+            half = self._marker_size / 2
+            for x, y in zip(px.tolist(), py.tolist()):
+                painter.drawImage(
+                    QRectF(x - half, y - half, self._marker_size, self._marker_size),
+                    self._marker_image,
+                )
+        painter.end()
+
+        self._cache = pixmap
+
+    def _range_changed(self) -> None:
+        # Reuse the cached render until the axes stop changing
+        self._settle_timer.start()
+        self.update()
+
+    def _settled(self) -> None:
+        self.invalidate()
+
+    def _plot_area_changed(self, plot_area: QRectF) -> None:
+        self.prepareGeometryChange()
+        self._bounding_rect = QRectF(plot_area)
+        self.invalidate()
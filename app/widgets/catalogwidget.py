@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import numpy as np
+from PySide6.QtCore import QPointF, QSize, Qt, QThread, QTimer, Signal
+from PySide6.QtGui import QIcon, QPainter, QPen, QPixmap, QPolygonF
+from PySide6.QtWidgets import (
+    QDoubleSpinBox,
+    QFileDialog,
+    QFormLayout,
+    QHBoxLayout,
+    QLineEdit,
+    QMessageBox,
+    QProgressBar,
+    QPushButton,
+    QTreeWidget,
+    QTreeWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from app.utils.catalog import Catalog, CatalogEntry, CatalogFilter, CatalogScanner
+
+
+class CatalogWidget(QWidget):
+    """Searchable list of the recordings found by scanning directories.
+
+    Scans run in a background thread which summarizes the files in the
+    app's worker pool. Double clicking a result opens the file.
+    """
+
+    filesOpened = Signal(list)
+    directoryChanged = Signal(str)
+
+    columns = ("File", "Sample Rate", "Duration (s)", "Channels", "Peak", "RMS", "Envelope")
+    thumbnail_size = QSize(96, 24)
+    # Wait for typing to stop before searching
+    search_delay = 250
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self._catalog: Catalog | None = None
+        self._catalog_file: Path | None = None
+        self._extensions: list[str] = []
+        self._scanner: CatalogScanner | None = None
+        self._scan_thread: QThread | None = None
+
+        self._directory_edit = QLineEdit()
+        self._directory_edit.setPlaceholderText("Directory to scan")
+        browse_button = QPushButton("Browse...")
+        browse_button.clicked.connect(self._browse)
+        self._scan_button = QPushButton("Scan")
+        self._scan_button.clicked.connect(self._scan_clicked)
+        self._progress_bar = QProgressBar()
+        self._progress_bar.hide()
+
+        directory_layout = QHBoxLayout()
+        directory_layout.addWidget(self._directory_edit)
+        directory_layout.addWidget(browse_button)
+        directory_layout.addWidget(self._scan_button)
+
+        self._search_edit = QLineEdit()
+        self._search_edit.setPlaceholderText("File or channel name")
+        self._min_rate_spin = self._create_spin_box(" Hz")
+        self._min_duration_spin = self._create_spin_box(" s")
+        self._min_peak_spin = self._create_spin_box()
+        self._min_rms_spin = self._create_spin_box()
+
+        filter_layout = QFormLayout()
+        filter_layout.addRow("Search", self._search_edit)
+        filter_layout.addRow("Min Sample Rate", self._min_rate_spin)
+        filter_layout.addRow("Min Duration", self._min_duration_spin)
+        filter_layout.addRow("Min Peak", self._min_peak_spin)
+        filter_layout.addRow("Min RMS", self._min_rms_spin)
+
+        self._results = QTreeWidget()
+        self._results.setRootIsDecorated(False)
+        self._results.setAlternatingRowColors(True)
+        self._results.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
+        self._results.setHeaderLabels(self.columns)
+        self._results.setIconSize(self.thumbnail_size)
+        self._results.itemDoubleClicked.connect(self._open_selected)
+
+        open_button = QPushButton("Open Selected")
+        open_button.clicked.connect(self._open_selected)
+
+        layout = QVBoxLayout()
+        layout.addLayout(directory_layout)
+        layout.addWidget(self._progress_bar)
+        layout.addLayout(filter_layout)
+        layout.addWidget(self._results)
+        layout.addWidget(open_button)
+        self.setLayout(layout)
+
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(self.search_delay)
+        self._search_timer.timeout.connect(self.refresh)
+        self._search_edit.textChanged.connect(self._search_timer.start)
+        for spin_box in (
+            self._min_rate_spin,
+            self._min_duration_spin,
+            self._min_peak_spin,
+            self._min_rms_spin,
+        ):
+            spin_box.valueChanged.connect(self._search_timer.start)
+
+    def _create_spin_box(self, suffix: str = "") -> QDoubleSpinBox:
+        spin_box = QDoubleSpinBox()
+        spin_box.setRange(0, 1e9)
+        spin_box.setDecimals(3)
+        spin_box.setSuffix(suffix)
+        spin_box.setSpecialValueText("Any")
+        return spin_box
+
+    def set_catalog(self, file: Path, extensions: list[str]) -> None:
+        """Set the catalog database and what is needed to scan for recordings."""
+        if self._catalog is not None:
+            self._catalog.close()
+
+        self._catalog_file = file
+        self._catalog = Catalog(file)
+        self._extensions = extensions
+        self.refresh()
+
+    @property
+    def directory(self) -> str:
+        return self._directory_edit.text()
+
+    @directory.setter
+    def directory(self, directory: str) -> None:
+        self._directory_edit.setText(directory)
+
+    def close_catalog(self) -> None:
+        if self._scanner is not None and self._scan_thread is not None:
+            # Wait for the scan to stop before closing
+            self._scanner.cancel()
+            self._scan_thread.quit()
+            self._scan_thread.wait()
+        if self._catalog is not None:
+            self._catalog.close()
+            self._catalog = None
+
+    def refresh(self) -> None:
+        self._results.clear()
+        if self._catalog is None:
+            return
+
+        where = CatalogFilter(
+            text=self._search_edit.text().strip(),
+            min_sample_rate=self._min_rate_spin.value(),
+            min_duration=self._min_duration_spin.value(),
+            min_peak=self._min_peak_spin.value(),
+            min_rms=self._min_rms_spin.value(),
+        )
+        for entry in self._catalog.search(where):
+            self._results.addTopLevelItem(self._create_item(entry))
+
+        for col in range(self._results.columnCount() - 1):
+            self._results.resizeColumnToContents(col)
+
+    def _create_item(self, entry: CatalogEntry) -> QTreeWidgetItem:
+        values = (entry.sample_rate, entry.duration)
+        stats = (entry.peak, entry.rms)
+        item = QTreeWidgetItem(
+            [entry.path.name]
+            + [f"{value:.6g}" if value else "" for value in values]
+            + [str(len(entry.channels))]
+            + [f"{value:.4g}" if value is not None else "" for value in stats]
+        )
+        item.setToolTip(0, str(entry.path))
+        item.setData(0, Qt.ItemDataRole.UserRole, str(entry.path))
+        item.setToolTip(
+            len(self.columns) - 1, ", ".join(channel.name for channel in entry.channels)
+        )
+        item.setIcon(len(self.columns) - 1, self._thumbnail(entry))
+        return item
+
+    def _thumbnail(self, entry: CatalogEntry) -> QIcon:
+        """Draw the envelope of each channel on top of each other."""
+        size = self.thumbnail_size
+        pixmap = QPixmap(size)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        envelopes = [channel.envelope for channel in entry.channels if channel.envelope.size]
+        if not envelopes:
+            return QIcon(pixmap)
+
+        low = min(float(np.nanmin(env[0])) for env in envelopes)
+        high = max(float(np.nanmax(env[1])) for env in envelopes)
+        scale = (size.height() - 1) / ((high - low) or 1)
+
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(self.palette().text().color(), 1))
+        for env in envelopes:
+            x = np.linspace(0, size.width() - 1, env.shape[1])
+            # Trace along the maximums and back along the minimums
+            points = [
+                QPointF(px, (high - py) * scale)
+                for px, py in zip(
+                    np.r_[x, x[::-1]].tolist(), np.r_[env[1], env[0][::-1]].tolist()
+                )
+            ]
+            painter.drawPolygon(QPolygonF(points))
+        painter.end()
+        return QIcon(pixmap)
+
+    def _browse(self) -> None:
+        directory = QFileDialog.getExistingDirectory(self, "Select Directory", self.directory)
+        if directory:
+            self.directory = directory
+            self.directoryChanged.emit(directory)
+
+    def _scan_clicked(self) -> None:
+        if self._scanner is not None:
+            self._scanner.cancel()
+            return
+
+        directory = self.directory
+        if self._catalog_file is None or not os.path.isdir(directory):
+            return
+
+        scanner = CatalogScanner(self._catalog_file, Path(directory), self._extensions)
+        thread = QThread(self)
+        scanner.moveToThread(thread)
+        thread.started.connect(scanner.run)
+        scanner.progress.connect(self._scan_progress)
+        scanner.failed.connect(
+            lambda error: QMessageBox.warning(self, "Scan Failed", error)
+        )
+        scanner.finished.connect(thread.quit)
+        scanner.failed.connect(thread.quit)
+        thread.finished.connect(self._scan_finished)
+        thread.finished.connect(scanner.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+
+        self._scanner = scanner
+        self._scan_thread = thread
+        self._scan_button.setText("Cancel")
+        self._progress_bar.setRange(0, 0)
+        self._progress_bar.show()
+        thread.start()
+
+    def _scan_progress(self, scanned: int, total: int) -> None:
+        self._progress_bar.setRange(0, total)
+        self._progress_bar.setValue(scanned)
+        # Show new results as they come in, but not after every file
+        if scanned and scanned % 50 == 0:
+            self.refresh()
+
+    def _scan_finished(self) -> None:
+        self._scanner = None
+        self._scan_thread = None
+        self._scan_button.setText("Scan")
+        self._progress_bar.hide()
+        self.refresh()
+
+    def _open_selected(self) -> None:
+        files = [
+            Path(item.data(0, Qt.ItemDataRole.UserRole))
+            for item in self._results.selectedItems()
+        ]
+        if files:
+            self.filesOpened.emit(files)
@@ -0,0 +1,87 @@
+from PySide6.QtCore import QAbstractItemModel, QEvent, QModelIndex, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QBrush, QColor, QMouseEvent, QPainter, QPen
+from PySide6.QtWidgets import QStyle, QStyledItemDelegate, QStyleOptionViewItem, QWidget
+
+
+class ColorDelegate(QStyledItemDelegate):
+    """Paints a color swatch from an item's data instead of using a widget per item.
+
+    The color is read from color_role. Clicking the swatch emits clicked
+    rather than changing the selection.
+    """
+
+    clicked = Signal(QModelIndex)
+
+    color_role = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(
+        self,
+        size: QSize = QSize(16, 16),
+        border_width: int = 2,
+        border_color: QColor = QColor(Qt.GlobalColor.black),
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self._size = size
+        self._border_width = border_width
+        self._border_color = border_color
+        self._pressed: QModelIndex | None = None
+
+    def paint(
+        self, painter: QPainter, option: QStyleOptionViewItem, index: QModelIndex
+    ) -> None:
+        # Draw the selection and hover background as usual
+        widget = option.widget # type: ignore
+        style = widget.style() if widget else None
+        if style is not None:
+            style.drawPrimitive(
+                QStyle.PrimitiveElement.PE_PanelItemViewItem, option, painter, widget
+            )
+
+        color = index.data(self.color_role)
+        if not isinstance(color, QColor):
+            return
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.setPen(QPen(self._border_color, self._border_width))
+        painter.setBrush(QBrush(color))
+        painter.drawRect(self._swatch_rect(option.rect)) # type: ignore
+        painter.restore()
+
+    def sizeHint(self, option: QStyleOptionViewItem, index: QModelIndex) -> QSize:
+        if index.data(self.color_role) is None:
+            return super().sizeHint(option, index)
+        return self._size
+
+    def editorEvent(
+        self,
+        event: QEvent,
+        model: QAbstractItemModel,
+        option: QStyleOptionViewItem,
+        index: QModelIndex,
+    ) -> bool:
+        if index.data(self.color_role) is None or not isinstance(event, QMouseEvent):
+            return super().editorEvent(event, model, option, index)
+
+        inside = option.rect.contains(event.position().toPoint()) # type: ignore
+        left = event.button() == Qt.MouseButton.LeftButton
+        if event.type() == QEvent.Type.MouseButtonPress and left and inside:
+            self._pressed = QModelIndex(index)
+            return True
+        if event.type() == QEvent.Type.MouseButtonRelease and self._pressed is not None:
+            pressed, self._pressed = self._pressed, None
+            if left and inside and pressed == index:
+                self.clicked.emit(index)
+            return True
+        if event.type() == QEvent.Type.MouseButtonDblClick and inside:
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def _swatch_rect(self, rect: QRect) -> QRect:
+        swatch = QRect(0, 0, self._size.width(), self._size.height())
+        # Keep the border within the cell
+        inset = self._border_width // 2
+        swatch.adjust(inset, inset, -inset, -inset)
+        swatch.moveCenter(rect.center())
+        return swatch
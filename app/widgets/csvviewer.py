@@ -1,3 +1,5 @@
+from pathlib import Path
+
 from PySide6.QtWidgets import QPlainTextEdit, QWidget, QTextEdit
 from PySide6.QtGui import (
     QPainter,
@@ -9,6 +11,8 @@ from PySide6.QtGui import (
 )
 from PySide6.QtCore import QRect, Qt, Signal, QSize
 
+from app.utils.compression import open_text
+
 
 class LineNumberArea(QWidget):
     def __init__(self, viewer: "CSVViewer") -> None:
@@ -23,11 +27,29 @@ class LineNumberArea(QWidget):
 
 
 class CSVViewer(QPlainTextEdit):
+    """Shows a preview of a CSV file along with line numbers.
+
+    Only the first page of lines is read when a file is set. More pages
+    are read as the user scrolls towards the end of what has been loaded.
+    """
+
     lineNumberChanged = Signal(int)
 
+    page_size = 2000
+
     def __init__(self, parent: QWidget | None = None):
         super().__init__(parent)
 
+        self._file: Path | None = None
+        self._encoding = "utf-8"
+        # Position to continue reading the file from
+        self._position = 0
+        self._at_end = True
+        self._loading = False
+        self._lines: list[str] = []
+
+        self.verticalScrollBar().valueChanged.connect(self._handle_scrolled)
+
         self._lineNumberArea = LineNumberArea(self)
 
         self.blockCountChanged.connect(self.updateLineNumberAreaWidth)
@@ -43,10 +65,89 @@ class CSVViewer(QPlainTextEdit):
         self._line_number = None
         return super().setPlainText(text)
 
+    def setFile(self, file: Path, encoding: str) -> None:
+        # Clear the old text before setting the file so
+        # nothing tries to load lines while it is cleared.
+        self._file = None
+        self._lines = []
+        self.setPlainText("")
+
+        self._file = file
+        self._encoding = encoding
+        self._position = 0
+        self._at_end = False
+        self._load_page()
+
+    def setEncoding(self, encoding: str) -> None:
+        if self._file is not None and encoding != self._encoding:
+            self.setFile(self._file, encoding)
+
+    def line(self, number: int) -> str | None:
+        """Return the line with the given line number, starting from 1.
+
+        Pages are loaded until the line is reached. Returns None if the
+        file doesn't contain that many lines or couldn't be decoded.
+        """
+        while len(self._lines) < number and self._load_page():
+            pass
+
+        if number > len(self._lines):
+            return None
+        return self._lines[number - 1]
+
+    def _load_page(self) -> bool:
+        if self._file is None or self._at_end:
+            return False
+
+        lines = []
+        try:
+            with open_text(self._file, self._encoding) as f:
+                f.seek(self._position)
+                for _ in range(self.page_size):
+                    line = f.readline()
+                    if not line:
+                        self._at_end = True
+                        break
+                    lines.append(line.rstrip("\r\n"))
+                self._position = f.tell()
+        # Handle wrong encoding
+        except (UnicodeDecodeError, LookupError):
+            self._at_end = True
+            return False
+
+        if not lines:
+            return False
+
+        # Keep the view where it is rather than following the new text.
+        # Ignore the scrolling this causes so it doesn't load another page.
+        scroll_bar = self.verticalScrollBar()
+        value = scroll_bar.value()
+        self._loading = True
+        if self._lines:
+            self.appendPlainText("\n".join(lines))
+        else:
+            super().setPlainText("\n".join(lines))
+        scroll_bar.setValue(value)
+        self._loading = False
+
+        self._lines += lines
+        return True
+
+    def _handle_scrolled(self, value: int) -> None:
+        if self._loading:
+            return
+
+        scroll_bar = self.verticalScrollBar()
+        if value >= scroll_bar.maximum() - scroll_bar.pageStep():
+            self._load_page()
+
     def setCurrentLine(self, line: int) -> None:
         if line == self._line_number:
             return
 
+        # Make sure the line has been loaded
+        self.line(line)
+
         block = self.document().findBlockByLineNumber(line - 1)
         cursor = QTextCursor(block)
         cursor.clearSelection()
@@ -1,13 +1,17 @@
 from PySide6.QtCharts import QChartView
-from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtCore import QEvent, QPoint, QPointF, QRectF, Qt, Signal
 from PySide6.QtGui import (
+    QBrush,
+    QColor,
     QCursor,
     QKeyEvent,
     QMouseEvent,
     QResizeEvent,
     QWheelEvent,
 )
-from PySide6.QtWidgets import QApplication, QWidget
+from PySide6.QtWidgets import QApplication, QGraphicsRectItem, QWidget
+
+from app.utils import UpdateCoalescer
 
 from .callout import Callout
 
@@ -17,7 +21,19 @@ def control_pressed() -> bool:
     return modifiers == Qt.KeyboardModifier.ControlModifier
 
 
+def shift_pressed() -> bool:
+    modifiers = QApplication.keyboardModifiers()
+    return modifiers == Qt.KeyboardModifier.ShiftModifier
+
+
 class InteractiveChart(QChartView):
+    regionSelected = Signal(float, float)
+    regionCleared = Signal()
+    # Emitted at most once per frame with the mouse position in axis values
+    mouseHovered = Signal(QPointF)
+
+    region_color = QColor(235, 177, 133, 80)
+
     def __init__(self, parent: QWidget | None = None) -> None:
         super().__init__(parent)
         self.setRubberBand(
@@ -33,6 +49,21 @@ class InteractiveChart(QChartView):
 
         self._last_mouse_pos = None
 
+        # Start and end of the selected region in axis values
+        self._region: tuple[float, float] | None = None
+        self._region_item = QGraphicsRectItem(self.chart())
+        self._region_item.setBrush(QBrush(self.region_color))
+        self._region_item.setPen(Qt.PenStyle.NoPen)
+        self._region_item.setZValue(10)
+        self._region_item.hide()
+        self._selecting_region = False
+
+        self._hover_pos: QPoint | None = None
+        self._hover_update = UpdateCoalescer(self._emit_hover, parent=self)
+        # Zooming and panning can generate many events per frame
+        # but the callouts only need to be moved once per frame.
+        self._callouts_update = UpdateCoalescer(self._update_callouts, parent=self)
+
     @property
     def tooltip(self) -> Callout:
         return self._tool_tip
@@ -51,6 +82,40 @@ class InteractiveChart(QChartView):
         self._tool_tip.hide()
         self._tool_tip.setAcceptedMouseButtons(Qt.MouseButton.NoButton)
 
+    @property
+    def region(self) -> tuple[float, float] | None:
+        return self._region
+
+    def clear_region(self) -> None:
+        if self._region is not None:
+            self._region = None
+            self._region_item.hide()
+            self.regionCleared.emit()
+
+    def _map_to_value(self, pos: QPoint) -> float:
+        chart = self.chart()
+        return chart.mapToValue(chart.mapFromScene(self.mapToScene(pos))).x()
+
+    def _update_region_item(self) -> None:
+        if self._region is None:
+            return
+
+        chart = self.chart()
+        plot_area = chart.plotArea()
+        start = chart.mapToPosition(QPointF(self._region[0], 0)).x()
+        end = chart.mapToPosition(QPointF(self._region[1], 0)).x()
+        rect = QRectF(start, plot_area.top(), end - start, plot_area.height())
+        self._region_item.setRect(rect.normalized().intersected(plot_area))
+        self._region_item.show()
+
+    def _emit_hover(self) -> None:
+        if self._hover_pos is not None and self.chart().series():
+            self.mouseHovered.emit(
+                self.chart().mapToValue(
+                    self.chart().mapFromScene(self.mapToScene(self._hover_pos))
+                )
+            )
+
     def _zoom(self, rect: QRectF) -> None:
         self.chart().zoomIn(rect)
 
@@ -93,11 +158,21 @@ class InteractiveChart(QChartView):
                     self._zoom_y(factor)
 
             event.accept()
-            self._update_callouts()
+            self._callouts_update.request()
         return super().wheelEvent(event)
 
     def mousePressEvent(self, event: QMouseEvent) -> None:
-        if event.button() == Qt.MouseButton.MiddleButton or (
+        if (
+            event.button() == Qt.MouseButton.LeftButton
+            and shift_pressed()
+            and self.chart().series()
+        ):
+            value = self._map_to_value(event.pos())
+            self._region = (value, value)
+            self._selecting_region = True
+            self._update_region_item()
+            event.setAccepted(True)
+        elif event.button() == Qt.MouseButton.MiddleButton or (
             event.button() == Qt.MouseButton.LeftButton and control_pressed()
         ):
             QApplication.setOverrideCursor(QCursor(Qt.CursorShape.SizeAllCursor))
@@ -107,7 +182,11 @@ class InteractiveChart(QChartView):
             super().mousePressEvent(event)
 
     def mouseMoveEvent(self, event: QMouseEvent) -> None:
-        if event.buttons() & Qt.MouseButton.MiddleButton or (
+        if self._selecting_region and self._region is not None:
+            self._region = (self._region[0], self._map_to_value(event.pos()))
+            self._update_region_item()
+            event.setAccepted(True)
+        elif event.buttons() & Qt.MouseButton.MiddleButton or (
             event.buttons() & Qt.MouseButton.LeftButton and control_pressed()
         ):
             if self._last_mouse_pos is None:
@@ -119,31 +198,70 @@ class InteractiveChart(QChartView):
             self.chart().scroll(d_pos.x(), d_pos.y())
 
             self._last_mouse_pos = event.pos()
-            self._update_callouts()
+            self._callouts_update.request()
             event.setAccepted(True)
         else:
             QApplication.restoreOverrideCursor()
             super().mouseMoveEvent(event)
 
+        # Throttle hover updates to the frame rate. The
+        # latest position is used when the update runs.
+        self._hover_pos = event.pos()
+        self._hover_update.request()
+
+    def leaveEvent(self, event: QEvent) -> None:
+        self._hover_pos = None
+        self._hover_update.cancel()
+        self._tool_tip.hide()
+        super().leaveEvent(event)
+
+    def mouseDoubleClickEvent(self, event: QMouseEvent) -> None:
+        deleted = sum(callout.delete for callout in self._callouts)
+        super().mouseDoubleClickEvent(event)
+        # Don't keep the tooltip if the double click deleted a callout
+        if self._tool_tip.isVisible() and deleted == sum(
+            callout.delete for callout in self._callouts
+        ):
+            self.keep_tooltip()
+
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        if self._selecting_region and self._region is not None:
+            self._selecting_region = False
+            start, end = sorted(self._region)
+            # A click without dragging clears the region
+            if start == end:
+                self.clear_region()
+            else:
+                self._region = (start, end)
+                self.regionSelected.emit(start, end)
+            event.setAccepted(True)
+            return
+
         self._last_mouse_pos = None
         QApplication.restoreOverrideCursor()
         super().mouseReleaseEvent(event)
         # This handles cases where the rubber band tool was
         # used to zoom in or right click was used to zoom out.
-        self._update_callouts()
+        self._callouts_update.request()
 
     def keyReleaseEvent(self, event: QKeyEvent) -> None:
         if control_pressed() and event.key() == Qt.Key.Key_R:
             chart = self.chart()
             chart.zoomReset()
+        elif event.key() == Qt.Key.Key_Escape:
+            self.clear_region()
 
-        self._update_callouts()
+        self._callouts_update.request()
         return super().keyReleaseEvent(event)
 
     def resizeEvent(self, event: QResizeEvent) -> None:
         # Resize first, then update callouts
         super().resizeEvent(event)
+        self._callouts_update.request()
+
+    def update_callouts(self) -> None:
+        """Move the callouts to match the current axis ranges."""
+        self._callouts_update.cancel()
         self._update_callouts()
 
     def _update_callouts(self) -> None:
@@ -156,4 +274,4 @@ class InteractiveChart(QChartView):
                 callout.update_geometry()
                 callouts.append(callout)
         self._callouts = callouts
-        self.scene().update()
+        self._update_region_item()
@@ -4,12 +4,13 @@ import dataclasses
 import json
 import logging
 import os
+import zipfile
 from pathlib import Path
 from collections.abc import Iterable
-from io import TextIOWrapper
+from io import StringIO, TextIOWrapper
 
 import pandas as pd
-from PySide6.QtCore import QObject, QSettings, QTimer
+from PySide6.QtCore import QObject, QSettings, QStandardPaths, QThread, QTimer
 from PySide6.QtGui import (
     QAction,
     QCloseEvent,
@@ -21,6 +22,8 @@ from PySide6.QtWidgets import (
     QColorDialog,
     QFileDialog,
     QMainWindow,
+    QMessageBox,
+    QProgressDialog,
     QDoubleSpinBox,
     QSpinBox,
 )
@@ -31,13 +34,50 @@ from app.plugins.viewmodelplugin import (
     FilterPlugin,
     ViewPlugin,
 )
-from app.plugins.options import BoolOption, ListOption
-from app.plugins.parserplugins import ParserPlugin, ParseError
+from app.plugins.options import BoolOption, DataOption, ListOption, NumericOption
+from app.plugins.parserplugins import CSVTail, ParserPlugin, ParserRegistry
+from app.plugins.progress import Cancelled, call_with_progress
 from app.ui.ui_mainwindow import Ui_MainWindow
-from app.utils import SignalBlocker, timing, get_plugin_path
+from app.utils import (
+    CSVExporter,
+    SignalBlocker,
+    UpdateCoalescer,
+    timing,
+    get_plugin_path,
+)
+from app.utils.compression import (
+    ARCHIVE_EXTENSION,
+    archive_members,
+    compressed_extensions,
+    compression,
+    data_extension,
+    is_compressed,
+    open_binary,
+)
+from app.utils.workerpool import (
+    parse_file,
+    process_data,
+    shutdown_worker_pool,
+    worker_pool,
+)
 from app.views import ViewModel, ViewController, ViewSeries
+from app.views.filefollower import FileFollower
+from app.views.columnar import (
+    COLUMNAR_FORMATS,
+    available_formats,
+    read_views,
+    supports_multiple_views,
+    write_views,
+)
+from app.views.workspace import (
+    WORKSPACE_EXTENSION,
+    Workspace,
+    WorkspaceView,
+    save_workspace,
+)
 from app.widgets.optionsdialog import OptionsDialog
 from app.widgets.parserdialog import ParserDialog
+from app.widgets.taskprogressdialog import TaskProgressDialog
 
 
 class MainWindow(QMainWindow):
@@ -49,23 +89,47 @@ class MainWindow(QMainWindow):
             f"{QApplication.applicationName()} {QApplication.applicationVersion()}[*]"
         )
 
+        # Pan and zoom change the axis ranges many times per
+        # frame. Only refresh the chart settings once per frame.
+        self._chart_settings_update = UpdateCoalescer(
+            self._update_chart_settings, parent=self
+        )
+
+        # Views parsed from CSV files along with the settings used to parse them,
+        # the model that was parsed and where to carry on reading from as the
+        # byte offset (None until the file has been followed) and the number
+        # of rows read.
+        self._followable: dict[
+            ViewController, tuple[Path, dict, ViewModel, tuple[int | None, int]]
+        ] = {}
+        self._followers: dict[ViewController, FileFollower] = {}
+
+        # Hidden until it is shown from the view menu
+        self.ui.catalogDockWidget.hide()
+
+        self._selected_controllers: list[ViewController] = []
+
         self._connect_signals()
         self._load_plugins()
         self._load_settings()
+        self._load_catalog()
 
         self.ui.menuView.addAction(self.ui.viewsDockWidget.toggleViewAction())
         self.ui.menuView.addAction(self.ui.chartSettingsDockWidget.toggleViewAction())
         self.ui.menuView.addAction(self.ui.undoDockWidget.toggleViewAction())
+        self.ui.menuView.addAction(self.ui.regionStatsDockWidget.toggleViewAction())
+        self.ui.menuView.addAction(self.ui.catalogDockWidget.toggleViewAction())
 
         self.ui.menuFilters.setEnabled(not self.ui.menuFilters.isEmpty())
         self.ui.menuViews.setEnabled(not self.ui.menuViews.isEmpty())
 
     @property
     def supported_extensions(self) -> list[str]:
-        exts = []
-        for parser in self._parsers:
-            exts += [ext.lower() for ext in parser.supported_extensions()]
-
+        exts = self._parsers.supported_extensions
+        # Only parsers that stream their files can open them compressed
+        exts += compressed_extensions(self._parsers.compressible_extensions)
+        exts.append(WORKSPACE_EXTENSION)
+        exts += available_formats()
         return list(set(exts))
 
     def _connect_signals(self) -> None:
@@ -97,12 +161,16 @@ class MainWindow(QMainWindow):
         self.ui.actionOpen.triggered.connect(self._open_files)
         self.ui.actionFit_Contents.triggered.connect(self._fit_to_contents)
         self.ui.actionClose.triggered.connect(self._close_current_selection)
-        self.ui.actionExport.triggered.connect(self._export_current_view)
+        self.ui.actionExport.triggered.connect(self._export_views)
+        self.ui.actionSave_Workspace.triggered.connect(self._save_workspace)
+        self.ui.actionFollow_File.toggled.connect(self._follow_current_view)
         self.ui.actionCrop.triggered.connect(self._crop_current_view)
         self.ui.actionUndo.triggered.connect(self._undo)
         self.ui.actionRedo.triggered.connect(self._redo)
 
         self.ui.saveDefaults_button.clicked.connect(self._save_chart_settings)
+        # Catalog
+        self.ui.catalogWidget.filesOpened.connect(self._add_files)
 
     def _load_settings(self) -> None:
         settings = QSettings()
@@ -123,12 +191,16 @@ class MainWindow(QMainWindow):
         self.ui.selectedSeriesWidth_spin.setValue(self._selected_series_width)
 
         self._last_directory = str(settings.value("last_directory", ""))
+        self._export_precision = int(settings.value("export_precision", 10)) #type: ignore
+        self.ui.catalogWidget.directory = str(settings.value("catalog_directory", ""))
 
     def _save_settings(self) -> None:
         settings = QSettings()
         settings.setValue("geometry", self.saveGeometry())
         settings.setValue("state", self.saveState())
         settings.setValue("last_directory", self._last_directory)
+        settings.setValue("export_precision", self._export_precision)
+        settings.setValue("catalog_directory", self.ui.catalogWidget.directory)
 
     def _save_chart_settings(self):
         settings = QSettings()
@@ -157,9 +229,9 @@ class MainWindow(QMainWindow):
         pm.setCategoriesFilter({"parsers": ParserPlugin, "dataframe": ViewModelPlugin})
         pm.collectPlugins()
 
-        self._parsers: list[ParserPlugin] = [
+        self._parsers = ParserRegistry(
             plugin.plugin_object for plugin in pm.getPluginsOfCategory("parsers")
-        ]
+        )
 
         for plugin in pm.getPluginsOfCategory("dataframe"):
             action = DataframePluginAction(
@@ -177,8 +249,22 @@ class MainWindow(QMainWindow):
             if action.plugin.add_to_toolbar:
                 self.ui.toolBar.addAction(action)
 
+    def _load_catalog(self) -> None:
+        data_path = Path(
+            QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+        )
+        try:
+            data_path.mkdir(parents=True, exist_ok=True)
+            self.ui.catalogWidget.set_catalog(
+                data_path / "catalog.sqlite", self._parsers.supported_extensions
+            )
+        except Exception:
+            logging.exception(__name__)
+
     def closeEvent(self, event: QCloseEvent) -> None:
         self._save_settings()
+        self.ui.catalogWidget.close_catalog()
+        shutdown_worker_pool()
         return super().closeEvent(event)
 
     def _add_view(
@@ -200,7 +286,7 @@ class MainWindow(QMainWindow):
         if len(controller.chart.series()) > 1:
             tree_item.setExpanded(True)
 
-        self.ui.stackedWidget.addWidget(controller.chart_view)
+        self.ui.stackedWidget.addWidget(controller.widget)
         self.ui.treeWidget.add_view(controller)
 
         self.ui.treeWidget.setCurrentItem(tree_item)
@@ -218,6 +304,7 @@ class MainWindow(QMainWindow):
         controller.y_axis.setMinorTickCount(self._y_minor_ticks)
 
         controller.legend_clicked.connect(self._series_legend_clicked)
+        controller.data_changed.connect(self._controller_data_changed)
 
         return controller
 
@@ -231,29 +318,117 @@ class MainWindow(QMainWindow):
     def _add_files(self, files: Iterable[Path]) -> None:
         unparsed_files = []
         for file in files:
-            model = None
             extension = get_ext(file)
-            if not self._parse_exported_file(file):
-                for parser in self._parsers:
-                    if extension in parser.supported_extensions():
-                        try:
-                            model = parser.parse(file)
-                            break
-                        except ParseError:
-                            pass
-                        except Exception:
-                            logging.exception(__name__)
-
-                if model is not None:
-                    self._add_file(file, model)
-                elif extension == "csv":
-                    unparsed_files.append(file)
+            if extension == WORKSPACE_EXTENSION:
+                self._open_workspace(file)
+                continue
+            if extension == ARCHIVE_EXTENSION:
+                unparsed_files += self._add_archive(file)
+                continue
+
+            try:
+                # Read the start of the file once and use it to pick the parser
+                header = self._parsers.read_header(file)
+            except OSError:
+                logging.exception(__name__)
+                continue
+
+            if extension in available_formats() or ViewMetaData.matches(header):
+                if self._parse_exported_file(file):
+                    continue
+
+            dialog = TaskProgressDialog(f"Loading {file.name}...", self)
+            try:
+                model = self._parsers.parse(
+                    file, header, self._choose_load_options, dialog.progress
+                )
+            except Cancelled:
+                continue
+            finally:
+                dialog.close()
+                dialog.deleteLater()
+
+            if model is not None:
+                self._add_file(file, model)
+            elif data_extension(file) == "csv":
+                unparsed_files.append(file)
 
         if unparsed_files:
-            models = ParserDialog(unparsed_files, self).exec()
+            dialog = ParserDialog(unparsed_files, self)
+            models = dialog.exec()
             if models:
+                settings = dialog.parse_settings
                 for file, model in models.items():
-                    self._add_file(file, model)
+                    controller = self._add_file(file, model)
+                    # Compressed files can't be followed as they grow
+                    if file in settings and not is_compressed(file):
+                        position = (None, model.shape[0])
+                        self._followable[controller] = (
+                            file, settings[file], model, position
+                        )
+                # The current view was set before it could be followed
+                self._update_follow_action()
+
+    def _add_archive(self, archive: Path) -> list[Path]:
+        """Parse the files within a zip archive in parallel using the worker pool.
+
+        Returns the CSV files that need to be parsed with the parser dialog.
+        """
+        try:
+            members = archive_members(archive)
+        except (OSError, zipfile.BadZipFile):
+            logging.exception(__name__)
+            return []
+
+        exts = self._parsers.compressible_extensions
+        members = [member for member in members if data_extension(member) in exts]
+        jobs = {}
+        for member in members:
+            try:
+                header = self._parsers.read_header(member)
+                if ViewMetaData.matches(header):
+                    exported = ViewMetaData.read_csv(member)
+                    if exported is not None:
+                        self._add_exported_view(member, *exported)
+                        continue
+            except Exception:
+                logging.exception(__name__)
+                continue
+            # Load options can't be shown for files parsed by the pool
+            jobs[member] = worker_pool().submit(parse_file, str(member))
+
+        unparsed_files = []
+        if not jobs:
+            return unparsed_files
+
+        dialog = TaskProgressDialog(f"Opening {archive.name}...", self)
+        try:
+            if not dialog.wait(list(jobs.values())):
+                return unparsed_files
+        finally:
+            dialog.close()
+            dialog.deleteLater()
+
+        for member, job in jobs.items():
+            try:
+                result = job.result()
+            except Exception:
+                logging.exception(__name__)
+                result = None
+
+            if result is not None:
+                df, y_axis = result
+                self._add_file(member, ViewModel(df, y_axis=y_axis))
+            elif data_extension(member) == "csv":
+                unparsed_files.append(member)
+        return unparsed_files
+
+    def _choose_load_options(
+        self, file: Path, options: dict[str, DataOption]
+    ) -> dict | None:
+        dialog = OptionsDialog(options, self)
+        dialog.setWindowTitle(f"Load {file.name}")
+        return dialog.exec()
 
     def _get_supported_files(self, event: QDropEvent) -> list[Path]:
         files = []
@@ -282,8 +457,11 @@ class MainWindow(QMainWindow):
             super().dropEvent(event)
 
     def _close_view(self, controller: ViewController) -> None:
+        if controller in self._followers:
+            self._followers[controller].stop()
+        self._followable.pop(controller, None)
         self.ui.treeWidget.remove_view(controller)
-        self.ui.stackedWidget.removeWidget(controller.chart_view)
+        self.ui.stackedWidget.removeWidget(controller.widget)
         controller.deleteLater()
 
     def _close_current_selection(self) -> None:
@@ -316,22 +494,232 @@ class MainWindow(QMainWindow):
                         new_model = controller.model[cols]
                         controller.set_model(new_model, title="Removed series") #type: ignore
 
-    def _export_current_view(self) -> None:
+    def _export_views(self) -> None:
+        controllers = self.ui.treeWidget.get_selected_controllers()
+        if not controllers:
+            current = self.ui.treeWidget.get_current_controller()
+            controllers = [current] if current else []
+        if not controllers:
+            return
+
+        # Keep the views in the same order as the tree
+        controllers = [c for c in self.ui.treeWidget.get_controllers() if c in controllers]
+
+        suggested_name = controllers[0].tree_item.text(0).split(".")[0]
+        if self._last_directory:
+            suggested_name = os.path.join(self._last_directory, suggested_name)
+
+        filters = ["CSV (*.csv)", "Compressed CSV (*.csv.gz)"]
+        filters += [COLUMNAR_FORMATS[ext][0] for ext in available_formats()]
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Export File",
+            suggested_name,
+            ";;".join(filters),
+        )
+        if not filename:
+            return
+
+        self._last_directory = os.path.dirname(filename)
+        if get_ext(Path(filename)) in available_formats():
+            self._export_columnar(filename, controllers)
+        else:
+            self._export_csv(filename, controllers)
+
+    def _export_filenames(
+        self, filename: str, controllers: list[ViewController]
+    ) -> list[str]:
+        """Create a file name for each view when a format only supports a single view."""
+        if len(controllers) == 1:
+            return [filename]
+
+        if filename.lower().endswith(".csv.gz"):
+            base, ext = filename[: -len(".csv.gz")], filename[-len(".csv.gz") :]
+        else:
+            base, ext = os.path.splitext(filename)
+        return [f"{base} - {controller.name}{ext}" for controller in controllers]
+
+    def _export_csv(self, filename: str, controllers: list[ViewController]) -> None:
+        options = {
+            "precision": NumericOption("Significant Digits", self._export_precision, 1, 17)
+        }
+        values = OptionsDialog(options, self).exec()
+        if not values:
+            return
+        self._export_precision = values["precision"]
+
+        for controller, filename in zip(
+            controllers, self._export_filenames(filename, controllers)
+        ):
+            header = StringIO()
+            ViewMetaData.from_controller(controller).to_file(header)
+            exporter = CSVExporter(
+                filename,
+                # The export runs in another thread while the view may change
+                controller.model.snapshot(),
+                header=header.getvalue(),
+                precision=self._export_precision,
+                compress=filename.lower().endswith(".gz"),
+            )
+            self._run_export(exporter, os.path.basename(filename))
+
+    def _export_columnar(self, filename: str, controllers: list[ViewController]) -> None:
+        views = [
+            (dataclasses.asdict(ViewMetaData.from_controller(controller)), controller.df)
+            for controller in controllers
+        ]
+        try:
+            if supports_multiple_views(get_ext(Path(filename))):
+                write_views(filename, views)
+            else:
+                for view, name in zip(views, self._export_filenames(filename, controllers)):
+                    write_views(name, [view])
+        except Exception as ex:
+            logging.exception(__name__)
+            QMessageBox.warning(self, "Export Failed", str(ex))
+
+    def _run_export(self, exporter: CSVExporter, name: str) -> None:
+        progress = QProgressDialog(f"Exporting {name}...", "Cancel", 0, 100, self)
+        progress.setWindowTitle("Export")
+        progress.setMinimumDuration(500)
+        progress.setValue(0)
+
+        thread = QThread(self)
+        exporter.moveToThread(thread)
+        thread.started.connect(exporter.run)
+        # The exporter lives in the worker thread so cancel
+        # directly rather than through a queued connection.
+        progress.canceled.connect(lambda: exporter.cancel())
+        exporter.progress.connect(progress.setValue)
+        exporter.failed.connect(
+            lambda error: QMessageBox.warning(self, "Export Failed", error)
+        )
+        exporter.finished.connect(thread.quit)
+        exporter.failed.connect(thread.quit)
+        thread.finished.connect(progress.deleteLater)
+        thread.finished.connect(exporter.deleteLater)
+        thread.finished.connect(thread.deleteLater)
+        thread.start()
+
+    def _save_workspace(self) -> None:
+        controllers = self.ui.treeWidget.get_controllers()
+        if not controllers:
+            return
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Workspace",
+            self._last_directory,
+            f"Workspace (*.{WORKSPACE_EXTENSION})",
+        )
+        if filename:
+            self._last_directory = os.path.dirname(filename)
+            views = []
+            for controller in controllers:
+                x_axis = controller.x_axis
+                y_axis = controller.y_axis
+                view = WorkspaceView(
+                    metadata=dataclasses.asdict(ViewMetaData.from_controller(controller)),
+                    columns=controller.model.columns,
+                    axis_ranges=(x_axis.min(), x_axis.max(), y_axis.min(), y_axis.max()),
+                )
+                # Every access to the frame copies it so only take it once
+                views.append((view, controller.df))
+
+            try:
+                save_workspace(filename, views)
+            except Exception as ex:
+                logging.exception(__name__)
+                QMessageBox.warning(self, "Save Failed", str(ex))
+
+    def _open_workspace(self, file: Path) -> None:
+        try:
+            with Workspace(file) as workspace:
+                for view in workspace.views:
+                    metadata = ViewMetaData(**view.metadata)
+                    # The view is read into a new frame so the model can keep it
+                    model = ViewModel(
+                        workspace.load_view(view), y_axis=metadata.y_title, copy=False
+                    )
+                    controller = self._add_file(file, model)
+                    metadata.to_controller(controller)
+                    if view.axis_ranges:
+                        controller.setAxisRanges(*view.axis_ranges)
+        except Exception:
+            logging.exception(__name__)
+
+    def _follow_current_view(self, follow: bool) -> None:
         controller = self.ui.treeWidget.get_current_controller()
-        if controller:
-            item = controller.tree_item
-            suggested_name = item.text(0).split(".")[0]
-            if self._last_directory:
-                suggested_name = os.path.join(self._last_directory, suggested_name)
-            filename, filter = QFileDialog.getSaveFileName(
-                self, "Export File", suggested_name, "CSV (*.csv)"
+        if controller is None or follow == (controller in self._followers):
+            return
+
+        if not follow:
+            self._followers[controller].stop()
+            return
+
+        options = {
+            "max_rows": NumericOption("Rolling Window (Rows, 0 = All)", 0, 0, 0)
+        }
+        values = OptionsDialog(options, self).exec()
+        if not values:
+            self._update_follow_action()
+            return
+
+        entry = self._followable_entry(controller)
+        if entry is None:
+            self._update_follow_action()
+            return
+
+        file, settings, _, (offset, rows) = entry
+        settings = settings.copy()
+        settings.pop("y_axis_title", None)
+        try:
+            tail = CSVTail(
+                file, controller.model.columns, rows, offset=offset, **settings
             )
-            if filename:
-                self._last_directory = os.path.dirname(filename)
-                with open(filename, "w") as f:
-                    metadata = ViewMetaData.from_controller(controller)
-                    metadata.to_file(f)
-                    controller.df.to_csv(f)
+        except Exception as ex:
+            logging.exception(__name__)
+            QMessageBox.warning(self, "Follow File", str(ex))
+            self._update_follow_action()
+            return
+
+        max_rows = max(values["max_rows"], 0) or None
+        follower = FileFollower(tail, controller, max_rows, self)
+        follower.stopped.connect(lambda: self._follower_stopped(follower))
+        self._followers[controller] = follower
+        self._update_follow_action()
+
+    def _follower_stopped(self, follower: FileFollower) -> None:
+        controller = follower.controller
+        if self._followers.get(controller) is follower:
+            del self._followers[controller]
+        # Carry on from here if the view is followed again. The model may
+        # have been trimmed so its size can't be used to find the place.
+        entry = self._followable_entry(controller)
+        if entry is not None:
+            file, settings, model, _ = entry
+            position = (follower.tail.offset, follower.tail.rows)
+            self._followable[controller] = (file, settings, model, position)
+        follower.deleteLater()
+        self._update_follow_action()
+
+    def _followable_entry(
+        self, controller: ViewController
+    ) -> tuple[Path, dict, ViewModel, tuple[int | None, int]] | None:
+        entry = self._followable.get(controller)
+        if entry is not None and entry[2] is not controller.model:
+            # The view no longer holds the rows parsed from the file, e.g.
+            # after a filter or crop, so new rows can't be added to it.
+            del self._followable[controller]
+            return None
+        return entry
+
+    def _update_follow_action(self) -> None:
+        controller = self.ui.treeWidget.get_current_controller()
+        followable = controller is not None and self._followable_entry(controller) is not None
+        with SignalBlocker(self.ui.actionFollow_File):
+            self.ui.actionFollow_File.setEnabled(followable)
+            self.ui.actionFollow_File.setChecked(controller in self._followers)
 
     def _crop_current_view(self) -> None:
         controller = self.ui.treeWidget.get_current_controller()
@@ -404,6 +792,9 @@ class MainWindow(QMainWindow):
             with SignalBlocker(spin_box):
                 spin_box.setValue(value) #type: ignore
 
+    def _schedule_chart_settings_update(self) -> None:
+        self._chart_settings_update.request()
+
     def _update_chart_settings(self) -> None:
         controller = self.ui.treeWidget.get_current_controller()
         if controller:
@@ -426,6 +817,13 @@ class MainWindow(QMainWindow):
             self._set_value_silent(self.ui.markerCount_spin, controller.marker_count)
             self.ui.marker_group.setChecked(controller.display_markers)
 
+    def _update_region_stats(self) -> None:
+        controller = self.ui.treeWidget.get_current_controller()
+        if controller:
+            self.ui.regionStatsWidget.set_stats(controller.region_stats())
+        else:
+            self.ui.regionStatsWidget.clear()
+
     def _current_view_changed(
         self,
         current: ViewController,
@@ -437,46 +835,64 @@ class MainWindow(QMainWindow):
             x_axis.disconnect(self)
             y_axis.disconnect(self)
             previous.undo_stack.disconnect(self)
+            previous.region_changed.disconnect(self._update_region_stats)
 
         self.ui.chartSettingsWidget.setEnabled((current != None))
 
         if current is not None:
+            self._chart_settings_update.cancel()
             self._update_chart_settings()
             x_axis = current.x_axis
             y_axis = current.y_axis
 
-            x_axis.rangeChanged.connect(self._update_chart_settings)
-            x_axis.tickCountChanged.connect(self._update_chart_settings)
-            x_axis.minorTickCountChanged.connect(self._update_chart_settings)
+            x_axis.rangeChanged.connect(self._schedule_chart_settings_update)
+            x_axis.tickCountChanged.connect(self._schedule_chart_settings_update)
+            x_axis.minorTickCountChanged.connect(self._schedule_chart_settings_update)
 
-            y_axis.rangeChanged.connect(self._update_chart_settings)
-            y_axis.tickCountChanged.connect(self._update_chart_settings)
-            y_axis.minorTickCountChanged.connect(self._update_chart_settings)
+            y_axis.rangeChanged.connect(self._schedule_chart_settings_update)
+            y_axis.tickCountChanged.connect(self._schedule_chart_settings_update)
+            y_axis.minorTickCountChanged.connect(self._schedule_chart_settings_update)
 
             current.undo_stack.canUndoChanged.connect(self._update_undo_actions)
             current.undo_stack.canRedoChanged.connect(self._update_undo_actions)
+            current.region_changed.connect(self._update_region_stats)
 
-            self.ui.stackedWidget.setCurrentWidget(current.chart_view)
+            self.ui.stackedWidget.setCurrentWidget(current.widget)
             self.ui.undoView.setStack(current.undo_stack)
 
         enable = current is not None
         self.ui.actionFit_Contents.setEnabled(enable)
         self.ui.actionClose.setEnabled(enable)
         self.ui.actionExport.setEnabled(enable)
+        self.ui.actionSave_Workspace.setEnabled(enable)
         self.ui.actionCrop.setEnabled(enable)
         self.ui.menuData.setEnabled(enable)
 
         self._update_undo_actions()
+        self._update_region_stats()
+        self._update_follow_action()
 
     def _selection_changed(self, controllers: list[ViewController]) -> None:
+        self._selected_controllers = controllers
+        self._update_plugin_actions()
+
+    def _controller_data_changed(self) -> None:
+        # A plugin may no longer apply once the data changes
+        if self.sender() in self._selected_controllers:
+            self._update_plugin_actions()
+        # Nor may following the file if the model was replaced
+        if self.sender() is self.ui.treeWidget.get_current_controller():
+            self._update_follow_action()
+
+    def _update_plugin_actions(self) -> None:
+        controllers = self._selected_controllers
         actions = self.ui.menuViews.actions() + self.ui.menuFilters.actions()
         for action in actions:
             if isinstance(action, DataframePluginAction):
-                can_process = bool(controllers)
-                for controller in controllers:
-                    if not action.plugin.can_process(controller.model):
-                        can_process = False
-                        break
+                can_process = bool(controllers) and all(
+                    controller.model.supported_by(action.plugin)
+                    for controller in controllers
+                )
                 action.setEnabled(can_process)
 
     def _series_legend_clicked(self, series: ViewSeries):
@@ -522,14 +938,16 @@ class MainWindow(QMainWindow):
         else:
             values = {}
 
-        new_controllers: list[ViewController] = []
         combine = values.pop("combine", False)
+        models = self._run_plugin(plugin, controllers, values, combine)
+        if models is None:
+            return
+
+        new_controllers: list[ViewController] = []
         if combine:
-            combined_model = ViewModel()
-            for controller in controllers:
-                model = plugin.process(controller.model, **values)
+            for controller, model in zip(controllers, models):
                 model.add_suffix(f" - {controller.name}")
-                combined_model.merge(model)
+            combined_model = ViewModel.combine(models)
 
             controller = self._add_view(
                 plugin.name,
@@ -539,8 +957,7 @@ class MainWindow(QMainWindow):
 
             new_controllers.append(controller)
         else:
-            for controller in controllers:
-                model = plugin.process(controller.model, **values)
+            for controller, model in zip(controllers, models):
                 new_controller = self._add_view(
                     f"{plugin.name} - {controller.name}",
                     model,
@@ -575,8 +992,12 @@ class MainWindow(QMainWindow):
             else:
                 values = {}
 
-            for controller in controllers:
-                model = plugin.process(controller.model, **values)
+            # Only change the models once every one has been processed
+            models = self._run_plugin(plugin, controllers, values)
+            if models is None:
+                return
+
+            for controller, model in zip(controllers, models):
                 title = f"{plugin.name} ("
                 for key, option in options.items():
                     if key in values:
@@ -590,6 +1011,76 @@ class MainWindow(QMainWindow):
                 title += ")"
                 controller.set_model(model, title=title) #type: ignore
 
+    def _run_plugin(
+        self,
+        plugin: ViewModelPlugin,
+        controllers: list[ViewController],
+        values: dict,
+        combine: bool = False,
+    ) -> list[ViewModel] | None:
+        """Process the model of each controller, returning None if cancelled.
+
+        Models that will be combined are processed together so the plugin
+        can handle them in a single pass. Several models that aren't
+        combined are processed in parallel by the worker pool.
+        """
+        dialog = TaskProgressDialog(f"Running {plugin.name}...", self)
+        models = []
+        try:
+            if len(controllers) > 1 and not combine:
+                return self._run_plugin_in_pool(plugin, controllers, values, dialog)
+
+            if combine:
+                return plugin.process_many(
+                    [controller.model for controller in controllers],
+                    progress=dialog.progress,
+                    **values,
+                )
+
+            for i, controller in enumerate(controllers):
+                # Each model gets an equal share of the progress bar
+                progress = dialog.progress.sub(
+                    i / len(controllers), (i + 1) / len(controllers)
+                )
+                models.append(
+                    call_with_progress(
+                        plugin.process, controller.model, progress=progress, **values
+                    )
+                )
+        except Cancelled:
+            return None
+        finally:
+            dialog.close()
+            dialog.deleteLater()
+        return models
+
+    def _run_plugin_in_pool(
+        self,
+        plugin: ViewModelPlugin,
+        controllers: list[ViewController],
+        values: dict,
+        dialog: TaskProgressDialog,
+    ) -> list[ViewModel] | None:
+        pool = worker_pool()
+        jobs = [
+            pool.submit(
+                process_data,
+                plugin.name,
+                controller.model.df,
+                controller.model.y_axis,
+                **values,
+            )
+            for controller in controllers
+        ]
+        if not dialog.wait(jobs):
+            return None
+
+        models = []
+        for job in jobs:
+            df, y_axis = job.result()
+            models.append(ViewModel(df, y_axis=y_axis))
+        return models
+
     def _plugin_action_triggered(self) -> None:
         sender = self.sender()
 
@@ -600,23 +1091,16 @@ class MainWindow(QMainWindow):
                 self._filter_plugin_triggered(sender.plugin)
 
     def _parse_exported_file(self, file: Path) -> bool:
-        if get_ext(file) != "csv":
+        if get_ext(file) in available_formats():
+            return self._parse_exported_columnar_file(file)
+        if data_extension(file) != "csv":
             return False
 
         try:
-            with file.open("r") as f:
-                metadata = ViewMetaData.from_file(f)
-                if metadata:
-                    parse_dates = bool(metadata.index_type == "timedelta64")
-                    df = pd.read_csv(f, index_col=metadata.index_name)
-
-                    if parse_dates:
-                        df.index = pd.to_timedelta(df.index, unit=None)
-
-                    model = ViewModel(df, y_axis=metadata.y_title)
-                    controller = self._add_file(file, model)
-                    metadata.to_controller(controller)
-                    return True
+            exported = ViewMetaData.read_csv(file)
+            if exported is not None:
+                self._add_exported_view(file, *exported)
+                return True
         # If we couldn't parse it just return False
         # so the parser dialog will handle it.
         except Exception:
@@ -624,6 +1108,25 @@ class MainWindow(QMainWindow):
         return False
 
 
+    def _parse_exported_columnar_file(self, file: Path) -> bool:
+        try:
+            views = read_views(file)
+        except Exception:
+            logging.exception(__name__)
+            return False
+
+        for data, df in views:
+            self._add_exported_view(file, ViewMetaData(**data), df)
+        return bool(views)
+
+    def _add_exported_view(
+        self, file: Path, metadata: ViewMetaData, df: pd.DataFrame
+    ) -> None:
+        model = ViewModel(df, y_axis=metadata.y_title)
+        controller = self._add_file(file, model)
+        metadata.to_controller(controller)
+
+
 class DataframePluginAction(QAction):
     def __init__(
         self, plugin: ViewModelPlugin, description: str = "", parent: QObject | None = None
@@ -641,6 +1144,8 @@ class DataframePluginAction(QAction):
 class ViewMetaData:
     start_string = "#AccelExplorer MetaData\n"
     end_string = "#End AccelExplorer Metadata\n"
+    # Upper limit on the size of the metadata read from a file
+    max_size = 1024 * 1024
 
     name: str
     index_name: str
@@ -712,26 +1217,58 @@ class ViewMetaData:
         return cls(**kwargs)
 
     @classmethod
-    def from_file(cls, file: TextIOWrapper) -> ViewMetaData | None:
-        data = ""
-        for i, line in enumerate(file):
-            if i == 0:
-                if line == cls.start_string:
-                    continue
-                else:
-                    return None
-            elif line == cls.end_string:
-                break
+    def matches(cls, header: bytes) -> bool:
+        """Return whether the start of a file contains metadata."""
+        return header.startswith(cls.start_string.rstrip().encode())
 
-            data += line
+    @classmethod
+    def from_path(cls, file: Path) -> tuple[ViewMetaData, int] | None:
+        """Read the metadata from the start of an exported file.
+
+        Returns the metadata and the byte offset the data starts at,
+        or None if the file doesn't start with metadata.
+        """
+        # Strip the newlines since the file may have been written with "\r\n"
+        start = cls.start_string.rstrip().encode()
+        end = cls.end_string.rstrip().encode()
+
+        with open_binary(file) as f:
+            if f.read(len(start)) != start:
+                return None
+            block = f.read(cls.max_size)
+
+        end_pos = block.find(end)
+        if end_pos < 0:
+            return None
+
+        kwargs = json.loads(block[:end_pos])
+        offset = block.find(b"\n", end_pos)
+        if offset < 0:
+            return None
+        return cls(**kwargs), len(start) + offset + 1
 
-        kwargs = json.loads(data)
-        return cls(**kwargs)
+    @classmethod
+    def read_csv(cls, file: Path) -> tuple[ViewMetaData, pd.DataFrame] | None:
+        """Read an exported CSV file, or return None if it doesn't contain metadata."""
+        header = cls.from_path(file)
+        if header is None:
+            return None
+
+        metadata, offset = header
+        with open_binary(file) as f:
+            # Skip straight past the metadata to the data
+            f.seek(offset)
+            df = pd.read_csv(f, index_col=metadata.index_name, engine="c")
+
+        if metadata.index_type == "timedelta64":
+            df.index = pd.to_timedelta(df.index, unit=None)
+        return metadata, df
 
 
 def get_ext(file: Path) -> str:
-    ext = file.suffix.lower()
-    # Drop the "." off the extension name
-    if ext:
-        ext = ext[1:]
+    ext = data_extension(file)
+    # Keep the compression so compressed files can be told apart, e.g. csv.gz
+    compressed = compression(file)
+    if compressed:
+        ext = f"{ext}.{compressed}"
     return ext
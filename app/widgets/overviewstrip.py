@@ -0,0 +1,360 @@
+from __future__ import annotations
+
+import logging
+from collections.abc import Callable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+
+import numpy as np
+from PySide6.QtCore import QPointF, QRectF, QSize, Qt, Signal
+from PySide6.QtGui import (
+    QBrush,
+    QColor,
+    QMouseEvent,
+    QPaintEvent,
+    QPainter,
+    QPen,
+    QPixmap,
+    QPolygonF,
+    QResizeEvent,
+)
+from PySide6.QtWidgets import QSizePolicy, QWidget
+
+# Envelopes are built one at a time so a large recording
+# doesn't take every core away from the rest of the app.
+_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="overview")
+
+
+@dataclass(frozen=True)
+class Envelope:
+    """The min and max of a column within evenly spaced buckets along the x-axis.
+
+    Buckets without any values hold NaN.
+    """
+
+    x_min: float
+    x_max: float
+    low: np.ndarray
+    high: np.ndarray
+
+    @property
+    def y_min(self) -> float:
+        return float(np.nanmin(self.low)) if np.any(~np.isnan(self.low)) else np.nan
+
+    @property
+    def y_max(self) -> float:
+        return float(np.nanmax(self.high)) if np.any(~np.isnan(self.high)) else np.nan
+
+    @classmethod
+    def from_values(cls, x: np.ndarray, y: np.ndarray, buckets: int) -> "Envelope":
+        """Build the envelope from x values sorted in ascending order and y values without NaN."""
+        low = np.full(buckets, np.nan)
+        high = np.full(buckets, np.nan)
+        if not x.size:
+            return cls(0.0, 0.0, low, high)
+
+        x_min = float(x[0])
+        x_max = float(x[-1])
+        edges = np.linspace(x_min, x_max, buckets + 1)
+        starts = np.searchsorted(x, edges[:-1], side="left")
+        # The last bucket includes the last value
+        ends = np.append(starts[1:], x.size)
+        filled = ends > starts
+        # Empty buckets start where the next bucket with values does, so
+        # reducing from each filled bucket's start stops at its own end.
+        low[filled] = np.minimum.reduceat(y, starts[filled])
+        high[filled] = np.maximum.reduceat(y, starts[filled])
+        return cls(x_min, x_max, low, high)
+
+
+class OverviewStrip(QWidget):
+    """A strip showing the whole of each column with a window over the visible range.
+
+    The columns are drawn from min / max envelopes built in a background
+    thread when their data is set, so repainting never touches the
+    samples themselves. Dragging the window, or clicking outside of it,
+    emits windowChanged with the new range.
+    """
+
+    windowChanged = Signal(float, float)
+    # Emitted from the build thread and handled in the GUI thread
+    _envelopeBuilt = Signal(str, int, object)
+
+    buckets = 2048
+    window_color = QColor(235, 177, 133, 80)
+    shade_color = QColor(0, 0, 0, 40)
+    fill_alpha = 160
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setSizePolicy(QSizePolicy.Policy.Expanding, QSizePolicy.Policy.Fixed)
+        self.setMouseTracking(True)
+
+        self._envelopes: dict[str, Envelope] = {}
+        self._colors: dict[str, QColor] = {}
+        self._hidden: set[str] = set()
+        # Incremented each time a column's data is set so stale builds are dropped
+        self._generations: dict[str, int] = {}
+        self._builds: dict[str, Future] = {}
+
+        self._window: tuple[float, float] | None = None
+        self._drag_offset: float | None = None
+
+        self._cache: QPixmap | None = None
+        self._x_range: tuple[float, float] | None = None
+
+        self._envelopeBuilt.connect(self._envelope_built)
+
+    def sizeHint(self) -> QSize:
+        return QSize(200, 48)
+
+    def minimumSizeHint(self) -> QSize:
+        return QSize(50, 48)
+
+    def set_data(
+        self,
+        name: str,
+        values: Callable[[], tuple[np.ndarray, np.ndarray]],
+        color: QColor,
+    ) -> None:
+        """Build the envelope of a column in the background, replacing any previous one.
+
+        Values is called in the build thread and returns the x and y values,
+        with x sorted and neither containing NaN. The previous envelope is
+        drawn until the new one is ready.
+        """
+        generation = self._generations.get(name, 0) + 1
+        self._generations[name] = generation
+        self._colors[name] = QColor(color)
+
+        previous = self._builds.pop(name, None)
+        if previous is not None:
+            previous.cancel()
+
+        future = _executor.submit(self._build, values, self.buckets)
+        future.add_done_callback(
+            lambda future: self._build_done(name, generation, future)
+        )
+        self._builds[name] = future
+
+    def remove(self, name: str) -> None:
+        future = self._builds.pop(name, None)
+        if future is not None:
+            future.cancel()
+        self._generations.pop(name, None)
+        self._colors.pop(name, None)
+        self._hidden.discard(name)
+        if self._envelopes.pop(name, None) is not None:
+            self._invalidate()
+
+    def rename(self, old: str, new: str) -> None:
+        for values in (self._envelopes, self._colors, self._generations, self._builds):
+            if old in values:
+                values[new] = values.pop(old) # type: ignore
+        if old in self._hidden:
+            self._hidden.discard(old)
+            self._hidden.add(new)
+        # Builds still running are matched by generation under the new name
+        future = self._builds.get(new)
+        if future is not None:
+            generation = self._generations[new]
+            future.add_done_callback(
+                lambda future: self._build_done(new, generation, future)
+            )
+
+    def clear(self) -> None:
+        for name in list(self._generations):
+            self.remove(name)
+
+    def set_color(self, name: str, color: QColor) -> None:
+        if name in self._colors and self._colors[name] != color:
+            self._colors[name] = QColor(color)
+            self._invalidate()
+
+    def set_visible(self, name: str, visible: bool) -> None:
+        if visible == (name in self._hidden):
+            if visible:
+                self._hidden.discard(name)
+            else:
+                self._hidden.add(name)
+            self._invalidate()
+
+    @property
+    def window(self) -> tuple[float, float] | None:
+        return self._window
+
+    def set_window(self, start: float, end: float) -> None:
+        """Move the window without emitting windowChanged."""
+        if (start, end) != self._window:
+            self._window = (start, end)
+            self.update()
+
+    @staticmethod
+    def _build(values: Callable[[], tuple[np.ndarray, np.ndarray]], buckets: int) -> Envelope:
+        return Envelope.from_values(*values(), buckets)
+
+    def _build_done(self, name: str, generation: int, future: Future) -> None:
+        if future.cancelled():
+            return
+        try:
+            envelope = future.result()
+        except Exception:
+            logging.getLogger(__name__).exception("Failed to build the overview of %s", name)
+            return
+
+        try:
+            self._envelopeBuilt.emit(name, generation, envelope)
+        except RuntimeError:
+            # The strip was deleted while the envelope was being built
+            pass
+
+    def _envelope_built(self, name: str, generation: int, envelope: Envelope) -> None:
+        if self._generations.get(name) != generation:
+            return
+        self._builds.pop(name, None)
+        self._envelopes[name] = envelope
+        self._invalidate()
+
+    def _invalidate(self) -> None:
+        self._cache = None
+        self.update()
+
+    def _visible_envelopes(self) -> dict[str, Envelope]:
+        return {
+            name: envelope
+            for name, envelope in self._envelopes.items()
+            if name not in self._hidden and envelope.x_max > envelope.x_min
+        }
+
+    def _render(self) -> None:
+        ratio = self.devicePixelRatioF()
+        self._cache = QPixmap(self.size() * ratio)
+        self._cache.setDevicePixelRatio(ratio)
+        self._cache.fill(Qt.GlobalColor.transparent)
+
+        envelopes = self._visible_envelopes()
+        self._x_range = None
+        if not envelopes:
+            return
+
+        x_min = min(envelope.x_min for envelope in envelopes.values())
+        x_max = max(envelope.x_max for envelope in envelopes.values())
+        y_min = np.nanmin([envelope.y_min for envelope in envelopes.values()])
+        y_max = np.nanmax([envelope.y_max for envelope in envelopes.values()])
+        self._x_range = (x_min, x_max)
+        if np.isnan(y_min) or np.isnan(y_max):
+            return
+
+        width = self.width()
+        height = self.height() - 2
+        x_scale = width / (x_max - x_min)
+        y_scale = height / ((y_max - y_min) or 1)
+
+        painter = QPainter(self._cache)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        for name, envelope in envelopes.items():
+            valid = ~np.isnan(envelope.low)
+            spacing = (envelope.x_max - envelope.x_min) / envelope.low.size
+            centers = envelope.x_min + (np.arange(envelope.low.size) + 0.5) * spacing
+            x = (centers[valid] - x_min) * x_scale
+            top = 1 + (y_max - envelope.high[valid]) * y_scale
+            bottom = 1 + (y_max - envelope.low[valid]) * y_scale
+
+            # Trace along the maximums and back along the minimums
+            xs = np.concatenate((x, x[::-1]))
+            ys = np.concatenate((top, bottom[::-1]))
+            polygon = QPolygonF([QPointF(i, j) for i, j in zip(xs.tolist(), ys.tolist())])
+
+            color = QColor(self._colors.get(name, QColor(Qt.GlobalColor.gray)))
+            painter.setPen(QPen(color, 1))
+            color.setAlpha(self.fill_alpha)
+            painter.setBrush(QBrush(color))
+            painter.drawPolygon(polygon)
+        painter.end()
+
+    def _to_pixel(self, value: float) -> float:
+        assert self._x_range is not None
+        x_min, x_max = self._x_range
+        return (value - x_min) / (x_max - x_min) * self.width()
+
+    def _to_value(self, pixel: float) -> float:
+        assert self._x_range is not None
+        x_min, x_max = self._x_range
+        return x_min + pixel / (self.width() or 1) * (x_max - x_min)
+
+    def paintEvent(self, event: QPaintEvent) -> None:
+        if self._cache is None:
+            self._render()
+
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._cache) # type: ignore
+        if self._x_range is None or self._window is None:
+            return
+
+        # Shade everything outside of the window
+        left = self._to_pixel(self._window[0])
+        right = self._to_pixel(self._window[1])
+        rect = QRectF(self.rect())
+        painter.fillRect(QRectF(0, 0, max(left, 0), rect.height()), self.shade_color)
+        painter.fillRect(
+            QRectF(right, 0, max(rect.width() - right, 0), rect.height()), self.shade_color
+        )
+        window = QRectF(left, 0, max(right - left, 1), rect.height() - 1)
+        painter.setPen(QPen(self.window_color.darker(150), 1))
+        painter.setBrush(QBrush(self.window_color))
+        painter.drawRect(window)
+
+    def resizeEvent(self, event: QResizeEvent) -> None:
+        self._cache = None
+        super().resizeEvent(event)
+
+    def mousePressEvent(self, event: QMouseEvent) -> None:
+        if (
+            event.button() != Qt.MouseButton.LeftButton
+            or self._x_range is None
+            or self._window is None
+        ):
+            return super().mousePressEvent(event)
+
+        value = self._to_value(event.position().x())
+        start, end = self._window
+        if not start <= value <= end:
+            # Center the window on the click and keep dragging from there
+            self._move_window(value - (end - start) / 2)
+            start, end = self._window
+        self._drag_offset = value - start
+        self.setCursor(Qt.CursorShape.ClosedHandCursor)
+        event.accept()
+
+    def mouseMoveEvent(self, event: QMouseEvent) -> None:
+        if self._drag_offset is not None:
+            self._move_window(self._to_value(event.position().x()) - self._drag_offset)
+            event.accept()
+            return
+
+        inside = False
+        if self._x_range is not None and self._window is not None:
+            value = self._to_value(event.position().x())
+            inside = self._window[0] <= value <= self._window[1]
+        if inside:
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+        else:
+            self.unsetCursor()
+        super().mouseMoveEvent(event)
+
+    def mouseReleaseEvent(self, event: QMouseEvent) -> None:
+        if self._drag_offset is not None and event.button() == Qt.MouseButton.LeftButton:
+            self._drag_offset = None
+            self.setCursor(Qt.CursorShape.OpenHandCursor)
+            event.accept()
+            return
+        super().mouseReleaseEvent(event)
+
+    def _move_window(self, start: float) -> None:
+        assert self._x_range is not None and self._window is not None
+        x_min, x_max = self._x_range
+        width = self._window[1] - self._window[0]
+        # Keep the window within the recording unless it's wider than it
+        start = min(max(start, x_min), max(x_max - width, x_min))
+        self.set_window(start, start + width)
+        self.windowChanged.emit(start, start + width)
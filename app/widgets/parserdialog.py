@@ -1,12 +1,25 @@
 import csv
+import logging
+import os
 
 from collections.abc import Iterable
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-
-from PySide6.QtWidgets import QCheckBox, QDialog, QMessageBox, QWidget
+from typing import Any
+
+import pandas as pd
+from PySide6.QtWidgets import (
+    QApplication,
+    QCheckBox,
+    QDialog,
+    QMessageBox,
+    QProgressDialog,
+    QWidget,
+)
 
 from app.plugins.parserplugins import CSVParser, ParseError
 from app.ui.ui_parserdialog import Ui_Dialog
+from app.utils.compression import open_text
 from app.views import ViewModel
 
 
@@ -27,11 +40,11 @@ class ParserDialog(QDialog):
 
         self._column_checkboxes: dict[str, QCheckBox] = {}
         self._models: dict[Path, ViewModel] = {}
+        self._parse_settings: dict[Path, dict[str, Any]] = {}
         self._skipped_files = set()
 
         self.ui.headerRowSpinBox.valueChanged.connect(self._headerRowChanged)
-        self.ui.encodingComboBox.currentTextChanged.connect(self._update_headers)
-        self.ui.encodingComboBox.currentTextChanged.connect(self._handle_file_changed)
+        self.ui.encodingComboBox.currentTextChanged.connect(self._encoding_changed)
         self.ui.csvViewer.lineNumberChanged.connect(self.ui.headerRowSpinBox.setValue)
         self.ui.indexComboBox.currentTextChanged.connect(self._indexChanged)
 
@@ -47,6 +60,11 @@ class ParserDialog(QDialog):
 
         self.set_files(files)
 
+    @property
+    def parse_settings(self) -> dict[Path, dict[str, Any]]:
+        """The CSVParser keyword arguments each file was parsed with."""
+        return self._parse_settings.copy()
+
     @property
     def _current_file(self) -> Path:
         return self._files[self._file_index]
@@ -63,13 +81,11 @@ class ParserDialog(QDialog):
             f"{self._file_index + 1} / {len(self._files)} - {file.stem}"
         )
 
-        with file.open(encoding=self.ui.encodingComboBox.currentText()) as csvfile:
-            # Handle wrong encoding
-            try:
-                self.ui.csvViewer.setPlainText(csvfile.read())
-            except UnicodeDecodeError:
-                pass
+        self.ui.csvViewer.setFile(file, self.ui.encodingComboBox.currentText())
+        self._headerRowChanged(self.ui.headerRowSpinBox.value())
 
+    def _encoding_changed(self, encoding: str) -> None:
+        self.ui.csvViewer.setEncoding(encoding)
         self._headerRowChanged(self.ui.headerRowSpinBox.value())
 
     def _set_next_file(self) -> bool:
@@ -102,13 +118,17 @@ class ParserDialog(QDialog):
         lineno = self.ui.headerRowSpinBox.value()
         encoding = self.ui.encodingComboBox.currentText()
 
-        line = ''
-        with file.open('r', encoding=encoding) as f:
-            for _ in range(lineno):
-                try:
-                    line = f.readline()
-                except UnicodeDecodeError:
-                    return []
+        # The current file has already been loaded into the viewer
+        if file == self._current_file:
+            line = self.ui.csvViewer.line(lineno) or ''
+        else:
+            line = ''
+            with open_text(file, encoding) as f:
+                for _ in range(lineno):
+                    try:
+                        line = f.readline()
+                    except UnicodeDecodeError:
+                        return []
 
         # Parse the headers using the built in CSV lib
         reader = csv.reader([line], quoting=csv.QUOTE_MINIMAL)
@@ -144,10 +164,8 @@ class ParserDialog(QDialog):
         self.ui.indexTypeComboBox.setCurrentIndex(0)
         self._indexChanged()
 
-    def _parse(self, file: Path) -> bool:
-        header_row = self.ui.headerRowSpinBox.value()
-        parser = CSVParser()
-
+    def _settings(self) -> dict[str, Any]:
+        """Return the keyword arguments for CSVParser using the current settings."""
         usecols = []
         for cb in self._column_checkboxes.values():
             if cb.isChecked():
@@ -164,18 +182,23 @@ class ParserDialog(QDialog):
         else:
             index_type = self.ui.indexTypeComboBox.currentText()
 
+        return {
+            "y_axis_title": self.ui.yAxisLineEdit.text(),
+            "header_row": self.ui.headerRowSpinBox.value(),
+            "usecols": usecols,
+            "index_col": index,
+            "index_type": index_type,
+            "sample_rate": sample_rate,
+            "quoting": csv.QUOTE_MINIMAL,
+            "encoding": self.ui.encodingComboBox.currentText(),
+        }
+
+    def _parse(self, file: Path) -> bool:
+        parser = CSVParser()
+        settings = self._settings()
         try:
-            self._models[file] = parser.parse(
-                file=file,
-                y_axis_title=self.ui.yAxisLineEdit.text(),
-                header_row=header_row,
-                usecols=usecols,
-                index_col=index,
-                index_type=index_type,
-                sample_rate=sample_rate,
-                quoting=csv.QUOTE_MINIMAL,
-                encoding=self.ui.encodingComboBox.currentText()
-            )
+            self._models[file] = parser.parse(file=file, **settings)
+            self._parse_settings[file] = settings
             # If we have at least one file parsed
             # we can let the user finish. Otherwise
             # they should just click cancel.
@@ -203,19 +226,63 @@ class ParserDialog(QDialog):
                 self.accept()
 
     def _parse_all(self) -> None:
-        # Store the current headers. We only want to parse
-        # files with the exact same headers.
-        headers = None
-        current_index = self._file_index
-        for i in range(current_index, len(self._files)):
-            file = self._files[i]
-            if headers is None:
-                headers = set(self._get_headers(file))
-
-            if headers == set(self._get_headers(file)):
-                if not self._parse(file):
+        # Snapshot the settings and headers of the current file. We
+        # only want to parse files with the exact same headers.
+        settings = self._settings()
+        y_axis_title = settings.pop("y_axis_title")
+        headers = set(self._get_headers(self._current_file))
+        files = self._files[self._file_index :]
+
+        progress = QProgressDialog("Parsing files...", "Cancel", 0, len(files), self)
+        progress.setWindowTitle("Parse All")
+        progress.setMinimumDuration(500)
+
+        failures: dict[Path, str] = {}
+        with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+            pending = {
+                executor.submit(_parse_file, file, headers, settings): file
+                for file in files
+            }
+            while pending:
+                done, _ = wait(pending, timeout=0.05, return_when=FIRST_COMPLETED)
+                for future in done:
+                    file = pending.pop(future)
+                    try:
+                        df = future.result()
+                    except (OSError, ValueError, ParseError) as ex:
+                        failures[file] = str(ex) or "Verify the header row is correct."
+                    except Exception as ex:
+                        # Record anything unexpected too so one bad file
+                        # doesn't abort the rest of the files.
+                        logging.exception(__name__)
+                        failures[file] = str(ex) or type(ex).__name__
+                    else:
+                        # Models are created on this thread so they belong to it
+                        if df is not None:
+                            self._models[file] = ViewModel(df, y_axis=y_axis_title)
+                            self._parse_settings[file] = dict(
+                                settings, y_axis_title=y_axis_title
+                            )
+
+                progress.setValue(len(files) - len(pending))
+                QApplication.processEvents()
+                if progress.wasCanceled():
+                    for future in pending:
+                        future.cancel()
                     break
 
+        progress.reset()
+        if self._models:
+            self.ui.finish_button.setEnabled(True)
+
+        if failures:
+            QMessageBox.warning(
+                self,
+                "Parsing Error",
+                "Unable to parse the following files:\n"
+                + "\n".join(f"{file.name}: {error}" for file, error in failures.items()),
+            )
+
         files = set(self._files)
         # Get all remaining files that haven't been parsed
         unparsed_files = files.difference(set(self._models.keys()))
@@ -229,7 +296,25 @@ class ParserDialog(QDialog):
 
     def exec(self) -> dict[Path, ViewModel] | None:
         self._models.clear()
+        self._parse_settings.clear()
         self.ui.finish_button.setDisabled(True)
         ret = super().exec()
         if ret:
             return self._models.copy()
+
+
+def _parse_file(
+    file: Path, headers: set[str], settings: dict[str, Any]
+) -> pd.DataFrame | None:
+    """Parse a file in a worker thread. Returns None if the headers don't match."""
+    header_row = settings["header_row"]
+    line = ""
+    with open_text(file, settings["encoding"]) as f:
+        for _ in range(header_row):
+            line = f.readline()
+
+    file_headers = next(csv.reader([line], quoting=csv.QUOTE_MINIMAL), [])
+    if set(header for header in file_headers if header) != headers:
+        return None
+
+    return CSVParser()._parse_to_df(file=file, **settings)
@@ -0,0 +1,35 @@
+from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QWidget
+
+from app.views import RegionStats
+
+
+class RegionStatsWidget(QTreeWidget):
+    columns = ("Series", "Points", "Min", "Max", "Peak", "Mean", "RMS", "Crest Factor")
+
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setRootIsDecorated(False)
+        self.setAlternatingRowColors(True)
+        self.setHeaderLabels(self.columns)
+
+    def set_stats(self, stats: dict[str, RegionStats | None]) -> None:
+        self.clear()
+        for name, region in stats.items():
+            if region is None:
+                continue
+
+            values = (
+                region.min,
+                region.max,
+                region.peak,
+                region.mean,
+                region.rms,
+                region.crest_factor,
+            )
+            item = QTreeWidgetItem(
+                [name, f"{region.count:n}"] + [f"{value:.4g}" for value in values]
+            )
+            self.addTopLevelItem(item)
+
+        for col in range(self.columnCount()):
+            self.resizeColumnToContents(col)
@@ -0,0 +1,62 @@
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+
+from PySide6.QtCore import QElapsedTimer, QEventLoop, Qt
+from PySide6.QtWidgets import QApplication, QProgressDialog, QWidget
+
+from app.plugins.progress import Progress
+
+
+class TaskProgressDialog(QProgressDialog):
+    """Shows the progress reported by a plugin running in the GUI thread.
+
+    Each report processes events so the Cancel button stays responsive,
+    which cancels the Progress passed to the plugin. The dialog is only
+    shown once the task has taken longer than the minimum duration.
+    """
+
+    steps = 1000
+
+    def __init__(self, label: str, parent: QWidget | None = None) -> None:
+        super().__init__(label, "Cancel", 0, self.steps, parent)
+        self.setWindowModality(Qt.WindowModality.WindowModal)
+        self.setMinimumDuration(500)
+        self.setAutoReset(False)
+
+        self._progress = Progress(self._report)
+        self.canceled.connect(self._progress.cancel)
+
+    @property
+    def progress(self) -> Progress:
+        return self._progress
+
+    def wait(self, futures: list[Future], interval: float = 0.05) -> bool:
+        """Wait for jobs running elsewhere, such as the worker pool, to finish.
+
+        Progress is the fraction of jobs done. Events are processed while
+        waiting, but user input only once the dialog is shown. Returns False
+        and cancels the jobs that haven't started if Cancel is pressed.
+        """
+        timer = QElapsedTimer()
+        timer.start()
+        pending = set(futures)
+        while pending:
+            if self._progress.cancelled:
+                for future in pending:
+                    future.cancel()
+                return False
+
+            _, pending = wait(pending, timeout=interval, return_when=FIRST_COMPLETED)
+            self._progress.report((len(futures) - len(pending)) / len(futures))
+
+            if not self.isVisible() and timer.elapsed() >= self.minimumDuration():
+                self.show()
+            if self.isVisible():
+                QApplication.processEvents()
+            else:
+                QApplication.processEvents(
+                    QEventLoop.ProcessEventsFlag.ExcludeUserInputEvents
+                )
+        return True
+
+    def _report(self, fraction: float) -> None:
+        self.setValue(int(fraction * self.steps))
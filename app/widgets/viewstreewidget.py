@@ -1,6 +1,6 @@
 from typing import Optional
 
-from PySide6.QtCore import Qt, Signal
+from PySide6.QtCore import QModelIndex, Qt, Signal
 from PySide6.QtGui import (
     QBrush,
     QColor,
@@ -13,6 +13,8 @@ from PySide6.QtWidgets import QTreeWidget, QTreeWidgetItem, QWidget, QStyle
 
 from app.views import ViewController, ViewModel, ViewSeries
 
+from .colordelegate import ColorDelegate
+
 
 class ViewsTreeWidget(QTreeWidget):
     currentViewChanged = Signal(ViewController, ViewController)
@@ -35,11 +37,17 @@ class ViewsTreeWidget(QTreeWidget):
         self.setSelectionMode(QTreeWidget.SelectionMode.ExtendedSelection)
         self.itemChanged.connect(self._item_changed)
 
+        # Series colors are painted rather than shown with a widget per series
+        self._color_delegate = ColorDelegate(parent=self)
+        self._color_delegate.clicked.connect(self._color_clicked)
+        self.setItemDelegateForColumn(1, self._color_delegate)
+
         self._controllers: dict[QTreeWidgetItem, ViewController] = {}
 
         self._drag_model = None
         self._hovered_series = None
         self._current_controller = None
+        self._selected_controllers: list[ViewController] = []
 
     def add_view(self, controller: ViewController) -> None:
         items = [controller.tree_item] + [view.tree_item for view in controller]
@@ -51,6 +59,7 @@ class ViewsTreeWidget(QTreeWidget):
         item = controller.tree_item
         self._controllers.pop(item)
         self.invisibleRootItem().removeChild(item)
+        self._selection_changed()
 
     def mouseReleaseEvent(self, event: QMouseEvent) -> None:
         self._drag_model = None
@@ -160,8 +169,12 @@ class ViewsTreeWidget(QTreeWidget):
                     old.tree_item.setBackground(col, QBrush())
 
     def _selection_changed(self) -> None:
+        # Selecting a view selects each of its series one at a time.
+        # Only let others know when the selected views actually change.
         controllers = self.get_selected_controllers()
-        self.viewSelectionChanged.emit(controllers)
+        if controllers != self._selected_controllers:
+            self._selected_controllers = controllers
+            self.viewSelectionChanged.emit(controllers)
 
     def _get_root_parent(self, item):
         while item and item.parent() is not None:
@@ -169,22 +182,41 @@ class ViewsTreeWidget(QTreeWidget):
         return item
 
     def get_controller(self, item: QTreeWidgetItem) -> ViewController | None:
-        if item not in self._controllers:
-            item = self._get_root_parent(item)
-
-        if item:
-            return self._controllers.get(item)
-        return None
+        if item is None:
+            return None
+
+        controller = self._controllers.get(item)
+        if controller is None:
+            # Series items are direct children of their view's item
+            parent = item.parent()
+            controller = self._controllers.get(parent) if parent is not None else None
+            if controller is None:
+                controller = self._controllers.get(self._get_root_parent(item))
+        return controller
 
     def get_current_controller(self) -> ViewController | None:
         return self.get_controller(self.currentItem())
 
     def get_selected_controllers(self) -> list[ViewController]:
-        controllers = []
+        """Return the views with a selected item in the order they were selected."""
+        controllers: dict[ViewController, None] = {}
         for item in self.selectedItems():
-            controllers.append(self.get_controller(item))
+            controller = self.get_controller(item)
+            if controller is not None:
+                controllers[controller] = None
+
+        return list(controllers)
 
-        return list(set(controllers))
+    def get_controllers(self) -> list[ViewController]:
+        """Return all of the controllers in the order they appear in the tree."""
+        items = (self.topLevelItem(i) for i in range(self.topLevelItemCount()))
+        return [self._controllers[item] for item in items if item in self._controllers]
+
+    def _color_clicked(self, index: QModelIndex) -> None:
+        item = self.itemFromIndex(index)
+        controller = self.get_controller(item)
+        if controller and item in controller:
+            controller[item].legend_clicked.emit()
 
     def _item_clicked(self, item: QTreeWidgetItem, col: int) -> None:
         controller = self.get_controller(item)
@@ -1,9 +1,14 @@
 import logging
+import multiprocessing
 from logging.handlers import RotatingFileHandler
 
 from app import run
 
-handler = RotatingFileHandler("AccelExplorer.log", maxBytes=100_000_000, backupCount=2)
-logging.basicConfig(level=logging.WARN, handlers=[handler])
+# Worker processes import this module too so only run the app from the main process
+if __name__ == "__main__":
+    multiprocessing.freeze_support()
 
-run()
+    handler = RotatingFileHandler("AccelExplorer.log", maxBytes=100_000_000, backupCount=2)
+    logging.basicConfig(level=logging.WARN, handlers=[handler])
+
+    run()
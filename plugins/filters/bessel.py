@@ -45,9 +45,13 @@ class Bessel(viewmodelplugin.FilterPlugin):
         max_cutoff = (fs / 2) - 1
         cutoff = min(max_cutoff, cutoff)
 
+        # Pass both cutoffs so endaq's default low cutoff
+        # doesn't also apply to a low pass filter
         if filter_type == "high_pass":
             kwargs["low_cutoff"] = cutoff
+            kwargs["high_cutoff"] = None
         else:
+            kwargs["low_cutoff"] = None
             kwargs["high_cutoff"] = cutoff
 
         df = ed.endaq.calc.filters.bessel(model.df, **kwargs)
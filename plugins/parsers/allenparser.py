@@ -1,6 +1,5 @@
 __all__ = ["AllenCSVParser"]
 
-import linecache
 from pathlib import Path
 
 from app.plugins import parserplugins
@@ -8,9 +7,18 @@ from app.views import ViewModel
 
 
 class AllenCSVParser(parserplugins.CSVParser):
+    def sniff(self, header: bytes) -> float:
+        lines = parserplugins.header_lines(header)
+        if len(lines) >= 22 and lines[21].lower().startswith("sampling period"):
+            return 1.0
+        return 0.0
+
     def parse(self, file: Path) -> ViewModel:
-        sample_rate = self._get_sample_rate(file)
-        df = self._parse_to_df(file=file, sample_rate=sample_rate, header_row=29)
+        header = parserplugins.read_header(file, 29)
+        sample_rate = self._get_sample_rate(header)
+        df = self._parse_to_df(
+            file=file, sample_rate=sample_rate, offset=header.row_offset(29)
+        )
         # We only care about the second column which contains voltage
         df = df.iloc(axis="columns")[1].to_frame()
 
@@ -19,8 +27,8 @@ class AllenCSVParser(parserplugins.CSVParser):
         df.rename(columns={col_name: "Acceleration"}, inplace=True)
         return ViewModel(df, y_axis="Acceleration (g)")
 
-    def _get_sample_rate(self, file: Path) -> int:
-        sample_rate_row = linecache.getline(filename=str(file), lineno=22).lower()
+    def _get_sample_rate(self, header: parserplugins.FileHeader) -> int:
+        sample_rate_row = header.line(22).lower()
         if sample_rate_row.startswith("sampling period"):
             value = sample_rate_row.split(",")[1]
             try:
@@ -1,17 +1,174 @@
 __all__ = ["EndaqParser"]
 
+from pathlib import Path
+
 import endaq as ed
+import numpy as np
+import pandas as pd
 
 from app.plugins import parserplugins
+from app.plugins.options import BoolOption, DataOption, NumericOption
+from app.plugins.progress import Progress
+from app.utils.catalog import ChannelSummary, RecordingSummary, envelope
 from app.views import ViewModel
 
 
 class EndaqParser(parserplugins.ParserPlugin):
+    """Parses IDE files generated by enDAQ sensors.
+
+    Opening an IDE file only reads the index of its data blocks. The sample
+    values are decoded lazily, so the channels and their rates, durations
+    and ranges can be shown before anything is loaded. Only the chosen
+    subchannels within the chosen time window are then decoded.
+    """
+
+    def __init__(self):
+        super().__init__()
+        # The last scanned file is kept open so it isn't indexed twice
+        self._scanned: tuple[Path, object] | None = None
+
     @staticmethod
     def supported_extensions() -> tuple[str]:
         return ("ide",)
 
-    def parse(self, filename: str, **kwargs) -> ViewModel:
+    def sniff(self, header: bytes) -> float:
+        # IDE files are EBML documents
+        if header.startswith(b"\x1a\x45\xdf\xa3"):
+            return 1.0
+        return 0.0
+
+    def load_options(self, file: Path) -> dict[str, DataOption]:
+        doc = self._get_doc(file)
+        primary = self._primary_channel(doc)
+
+        options: dict[str, DataOption] = {}
+        duration = 0.0
+        for channel in doc.channels.values():
+            session = channel.getSession()
+            if not len(session):
+                continue
+
+            rate = session.getSampleRate()
+            duration = max(duration, (session[-1][0] - session[0][0]) / 1e6)
+            envelope = self._envelope(session)
+            for i, subchannel in enumerate(channel.subchannels):
+                name = f"{channel.name} {subchannel.name} ({rate:.0f} Hz"
+                if envelope is not None:
+                    units = subchannel.units[1]
+                    name += f", {envelope[0][i]:.3g} to {envelope[1][i]:.3g} {units}"
+                name += ")"
+                options[_subchannel_key(channel, i)] = BoolOption(
+                    name, channel is primary
+                )
+
+        options["start"] = NumericOption("Start (s)", 0.0, 0.0, duration)
+        options["end"] = NumericOption("End (s)", duration, 0.0, duration)
+        return options
+
+    def options_cancelled(self, file: Path) -> None:
+        self._close()
+
+    def parse(
+        self, filename: str, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
+        if not kwargs:
+            return self._parse_primary(filename)
+
+        try:
+            frames, units = self._read_selection(
+                Path(filename), progress or Progress(), **kwargs
+            )
+        finally:
+            self._close()
+
+        if not frames:
+            raise parserplugins.ParseError("No channels selected")
+
+        df = pd.concat(frames, axis=1) if len(frames) > 1 else frames[0]
+        df.index.name = "Time"
+        y_axis = ""
+        # Only label the axis when every selected subchannel shares its units
+        if len(units) == 1:
+            label, unit = next(iter(units))
+            if unit:
+                y_axis = f"{label} ({unit})"
+        return ViewModel(df, y_axis=y_axis)
+
+    def _read_selection(
+        self, file: Path, progress: Progress, **kwargs
+    ) -> tuple[list[pd.DataFrame], set[tuple]]:
+        doc = self._get_doc(file)
+        start = kwargs.get("start", 0.0)
+        end = kwargs.get("end")
+        if end is not None and end <= start:
+            raise parserplugins.ParseError("The end must be after the start")
+
+        selection = []
+        for channel in doc.channels.values():
+            selected = [
+                i
+                for i in range(len(channel.subchannels))
+                if kwargs.get(_subchannel_key(channel, i))
+            ]
+            if selected:
+                selection.append((channel, selected))
+
+        frames = []
+        units = set()
+        # Each channel is decoded separately so report progress between them
+        for count, (channel, selected) in enumerate(selection, 1):
+            progress.check()
+            session = channel.getSession()
+            # Times are in microseconds from the start of the session
+            first = session[0][0]
+            start_time = first + start * 1e6
+            end_time = None if end is None else first + end * 1e6
+            data = session.arrayRange(start_time, end_time)
+
+            index = pd.to_timedelta(
+                np.round((data[0] - first) * 1e3).astype(np.int64), unit="ns"
+            )
+            # Channels can share subchannel names, e.g. "X", so include the channel
+            columns = {
+                f"{channel.name} {channel.subchannels[i].name}": data[i + 1]
+                for i in selected
+            }
+            frames.append(pd.DataFrame(columns, index=index))
+            units.update(tuple(channel.subchannels[i].units) for i in selected)
+            progress.report(count / len(selection))
+
+        return frames, units
+
+    def summarize(self, file: Path) -> RecordingSummary:
+        """Summarize the primary accelerometer from the data block summaries.
+
+        Only the block index is read so the RMS isn't known.
+        """
+        try:
+            channel = self._primary_channel(self._get_doc(file))
+            if channel is None:
+                raise parserplugins.ParseError("No acceleration channel found")
+
+            session = channel.getSession()
+            stats = session.arrayMinMeanMax(times=False)
+            duration = (session[-1][0] - session[0][0]) / 1e6 if len(session) else 0.0
+            channels = []
+            if stats is not None and stats.size:
+                for i, subchannel in enumerate(channel.subchannels):
+                    low = envelope(stats[0][i], RecordingSummary.envelope_size)[0]
+                    high = envelope(stats[2][i], RecordingSummary.envelope_size)[1]
+                    peak = max(abs(float(low.min())), abs(float(high.max())))
+                    channels.append(
+                        ChannelSummary(
+                            subchannel.name, peak, float("nan"), np.vstack((low, high))
+                        )
+                    )
+            return RecordingSummary(session.getSampleRate(), duration, channels)
+        finally:
+            self._close()
+
+    def _parse_primary(self, filename: str) -> ViewModel:
+        self._close()
         df = ed.endaq.ide.get_primary_sensor_data(
             name=filename, measurement_type=ed.ide.ACCELERATION #type: ignore
         ) #type: ignore
@@ -19,3 +176,40 @@ class EndaqParser(parserplugins.ParserPlugin):
         series = df.index.to_series()
         df.index = series - series[0]
         return ViewModel(df, y_axis="Acceleration (g)")
+
+    def _get_doc(self, file: Path):
+        if self._scanned is None or self._scanned[0] != file:
+            self._close()
+            self._scanned = (file, ed.ide.get_doc(str(file)))
+        return self._scanned[1]
+
+    def _close(self) -> None:
+        if self._scanned is not None:
+            self._scanned[1].close()
+            self._scanned = None
+
+    @staticmethod
+    def _primary_channel(doc):
+        """Return the acceleration channel with the most samples, like get_primary_sensor_data."""
+        subchannels = ed.ide.get_channels(doc, ed.ide.ACCELERATION) #type: ignore
+        if not subchannels:
+            return None
+        return max(
+            (subchannel.parent for subchannel in subchannels),
+            key=lambda channel: len(channel.getSession()),
+        )
+
+    @staticmethod
+    def _envelope(session) -> tuple[np.ndarray, np.ndarray] | None:
+        """Return the min and max of each subchannel from the data block summaries."""
+        try:
+            stats = session.arrayMinMeanMax(times=False)
+        except Exception:
+            return None
+        if stats is None or stats.size == 0:
+            return None
+        return stats[0].min(axis=-1), stats[2].max(axis=-1)
+
+
+def _subchannel_key(channel, subchannel: int) -> str:
+    return f"channel_{channel.id}_{subchannel}"
@@ -11,6 +11,18 @@ from app.views import ViewModel
 
 
 class HWiNFOParser(parserplugins.CSVParser):
+    def sniff(self, header: bytes) -> float:
+        # Logs with many sensors have a column header longer than the bytes
+        # sniffed, so check the first line even when it's incomplete.
+        line = header.split(b"\n", 1)[0].decode("iso-8859-1").rstrip("\r")
+        if not line:
+            return 0.0
+
+        headers = next(csv.reader([line], quoting=csv.QUOTE_MINIMAL))
+        if headers[:2] == ["Date", "Time"]:
+            return 1.0
+        return 0.0
+
     def parse(self, file: Path) -> ViewModel:
         usecols = self._get_headers(file)
         try:
@@ -34,9 +46,7 @@ class HWiNFOParser(parserplugins.CSVParser):
         return ViewModel(df, y_axis="", x_axis="Time(S)")
 
     def _get_headers(self, file: Path) -> list[str]:
-        line = ""
-        with file.open("r", encoding="iso-8859-1") as f:
-            line = f.readline()
+        line = parserplugins.read_header(file, 1).row(1)
 
         # Parse the headers using the built in CSV lib
         reader = csv.reader([line], quoting=csv.QUOTE_MINIMAL)
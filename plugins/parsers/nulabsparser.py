@@ -1,6 +1,5 @@
 __all__ = ["NULabsCSVParser"]
 
-import linecache
 from pathlib import Path
 
 from app.plugins import parserplugins
@@ -8,14 +7,23 @@ from app.views import ViewModel
 
 
 class NULabsCSVParser(parserplugins.CSVParser):
+    def sniff(self, header: bytes) -> float:
+        lines = parserplugins.header_lines(header)
+        if len(lines) >= 8 and lines[7].lower().startswith("sample rate"):
+            return 1.0
+        return 0.0
+
     def parse(self, file: Path) -> ViewModel:
-        sample_rate = self._get_sample_rate(file)
-        df = self._parse_to_df(file=file, sample_rate=sample_rate, header_row=16)
+        header = parserplugins.read_header(file, 16)
+        sample_rate = self._get_sample_rate(header)
+        df = self._parse_to_df(
+            file=file, sample_rate=sample_rate, offset=header.row_offset(16)
+        )
         df = df.iloc[:, 1:]
         return ViewModel(df, y_axis="Acceleration (g)")
 
-    def _get_sample_rate(self, file: Path) -> int:
-        sample_rate_row = linecache.getline(str(file), 8).lower()
+    def _get_sample_rate(self, header: parserplugins.FileHeader) -> int:
+        sample_rate_row = header.line(8).lower()
         if sample_rate_row.startswith("sample rate"):
             value = sample_rate_row.split(",")[1]
             try:
@@ -0,0 +1,239 @@
+__all__ = ["RawBinaryParser"]
+
+import json
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.plugins import parserplugins
+from app.plugins.options import DataOption, ListOption, ListOptionPair, NumericOption
+from app.plugins.progress import Progress
+from app.utils import generate_time_index
+from app.utils.compression import is_compressed
+from app.views import ViewModel
+
+DTYPES = ("int16", "int32", "float32", "float64", "uint16", "uint32")
+BYTE_ORDERS = {"little": "<", "big": ">"}
+
+
+@dataclass
+class RawLayout:
+    """Describes how samples are stored in a raw binary file.
+
+    Samples are interleaved, one frame of all channels after another,
+    following an optional fixed size header. Each channel's values are
+    converted with value * scale + offset.
+    """
+
+    channels: int
+    dtype: str
+    sample_rate: int
+    byteorder: str = "little"
+    header_bytes: int = 0
+    scales: list[float] = field(default_factory=list)
+    offsets: list[float] = field(default_factory=list)
+    names: list[str] = field(default_factory=list)
+    y_axis: str = ""
+
+    def __post_init__(self) -> None:
+        if self.channels < 1:
+            raise ValueError("There must be at least one channel")
+        if self.dtype not in DTYPES:
+            raise ValueError(f"Unsupported data type: {self.dtype}")
+        if self.byteorder not in BYTE_ORDERS:
+            raise ValueError(f"Unsupported byte order: {self.byteorder}")
+        if self.header_bytes < 0:
+            raise ValueError("The header size can't be negative")
+
+        # A single scale or offset applies to every channel
+        self.scales = _per_channel(self.scales, self.channels, 1.0)
+        self.offsets = _per_channel(self.offsets, self.channels, 0.0)
+        if not self.names:
+            self.names = [f"Channel {i + 1}" for i in range(self.channels)]
+        elif len(self.names) != self.channels:
+            raise ValueError("There must be one name for each channel")
+
+    @property
+    def numpy_dtype(self) -> np.dtype:
+        return np.dtype(self.dtype).newbyteorder(BYTE_ORDERS[self.byteorder])
+
+    @staticmethod
+    def sidecar(file: Path) -> Path:
+        """Return the path of the JSON file describing the layout, e.g. data.bin.json."""
+        return file.with_name(file.name + ".json")
+
+    @classmethod
+    def from_sidecar(cls, file: Path) -> "RawLayout | None":
+        sidecar = cls.sidecar(file)
+        if not sidecar.exists():
+            return None
+
+        with sidecar.open() as f:
+            values = json.load(f)
+        try:
+            return cls(**values)
+        except TypeError as ex:
+            raise parserplugins.ParseError(f"Invalid layout in {sidecar.name}") from ex
+
+
+class RawFile:
+    """A raw binary file memory mapped as a frames by channels array.
+
+    Nothing is read until the values are used. Each channel is a strided
+    view into the mapping. Scaled values are computed by scaled, which
+    reads the range of the channel it is given.
+    """
+
+    def __init__(self, file: Path, layout: RawLayout) -> None:
+        self._layout = layout
+
+        dtype = layout.numpy_dtype
+        frame_size = dtype.itemsize * layout.channels
+        # Ignore a partially written frame at the end of the file
+        frames = max(file.stat().st_size - layout.header_bytes, 0) // frame_size
+        if frames:
+            self._data = np.memmap(
+                file,
+                dtype=dtype,
+                mode="r",
+                offset=layout.header_bytes,
+                shape=(frames, layout.channels),
+            )
+        else:
+            self._data = np.empty((0, layout.channels), dtype=dtype)
+
+    def __len__(self) -> int:
+        return self._data.shape[0]
+
+    @property
+    def layout(self) -> RawLayout:
+        return self._layout
+
+    @property
+    def result_type(self) -> np.dtype:
+        # Keep 16 bit values as single precision to halve the memory used
+        return np.result_type(self._data.dtype.newbyteorder("="), np.float32)
+
+    def channel(self, channel: int) -> np.ndarray:
+        """Return the unscaled values of a channel without copying them."""
+        return self._data[:, channel]
+
+    def scaled(
+        self,
+        channel: int,
+        start: int = 0,
+        stop: int | None = None,
+        out: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Return the scaled values of part of a channel."""
+        values = self.channel(channel)[start:stop]
+        if out is None:
+            out = np.empty(values.shape, dtype=self.result_type)
+        scale = self._layout.scales[channel]
+        offset = self._layout.offsets[channel]
+
+        # Scale straight into the output so only one copy is made
+        if scale == 1:
+            out[...] = values
+        else:
+            np.multiply(values, scale, out=out, casting="unsafe")
+        if offset:
+            np.add(out, offset, out=out)
+        return out
+
+    @property
+    def unscaled(self) -> bool:
+        """Whether the stored values can be used as they are."""
+        return (
+            all(scale == 1 for scale in self._layout.scales)
+            and not any(self._layout.offsets)
+            and self._data.dtype.isnative
+        )
+
+    def to_df(self, progress: Progress | None = None) -> pd.DataFrame:
+        """Return the channels as a frame.
+
+        Values that don't need scaling are used straight from the mapping
+        so nothing is read until it's needed. Otherwise the whole file is
+        read and every channel is scaled into a single array in memory,
+        as a frame can't scale its values as they are used.
+        """
+        layout = self._layout
+        progress = progress or Progress()
+        index = generate_time_index(layout.sample_rate, len(self))
+        index.name = "Time"
+        if self.unscaled:
+            progress.report(1.0)
+            return pd.DataFrame(self._data, index=index, columns=layout.names, copy=False)
+
+        # A frame built from a channels by rows array keeps
+        # it as its only block instead of copying each column.
+        values = np.empty((layout.channels, len(self)), dtype=self.result_type)
+        for channel in range(layout.channels):
+            progress.check()
+            self.scaled(channel, out=values[channel])
+            progress.report((channel + 1) / layout.channels)
+
+        return pd.DataFrame(values.T, index=index, columns=layout.names, copy=False)
+
+
+class RawBinaryParser(parserplugins.ParserPlugin):
+    """Parses interleaved binary samples described by a JSON sidecar file.
+
+    The sidecar has the same name as the data file with .json appended. If
+    it doesn't exist the layout is entered in a dialog instead.
+    """
+
+    @staticmethod
+    def supported_extensions() -> tuple[str]:
+        return ("bin", "raw")
+
+    def load_options(self, file: Path) -> dict[str, DataOption]:
+        if RawLayout.sidecar(file).exists():
+            return {}
+
+        return {
+            "channels": NumericOption("Channels", 1, 1, 1024),
+            "dtype": ListOption(
+                "Data Type", [ListOptionPair(dtype, dtype) for dtype in DTYPES]
+            ),
+            "byteorder": ListOption(
+                "Byte Order",
+                [ListOptionPair(order.title(), order) for order in BYTE_ORDERS],
+            ),
+            "header_bytes": NumericOption("Header (Bytes)", 0, 0, 0),
+            "sample_rate": NumericOption("Sample Rate (Hz)", 1000, 1, 0),
+            "scales": NumericOption("Scale", 1.0, None, None, decimals=9),
+            "offsets": NumericOption("Offset", 0.0, None, None, decimals=6),
+        }
+
+    def parse(
+        self, file: Path, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
+        file = Path(file)
+        if is_compressed(file):
+            raise parserplugins.ParseError("Compressed files can't be memory mapped")
+
+        try:
+            layout = RawLayout(**kwargs) if kwargs else RawLayout.from_sidecar(file)
+        except ValueError as ex:
+            raise parserplugins.ParseError(str(ex)) from ex
+
+        if layout is None:
+            raise parserplugins.ParseError(f"No layout found for {file.name}")
+
+        raw = RawFile(file, layout)
+        # The frame is only used by the model so don't copy it again
+        return ViewModel(raw.to_df(progress), y_axis=layout.y_axis, copy=False)
+
+
+def _per_channel(values: list[float] | float, channels: int, default: float) -> list[float]:
+    if isinstance(values, (int, float)):
+        return [float(values)] * channels
+    if not values:
+        return [default] * channels
+    if len(values) != channels:
+        raise ValueError("There must be one value for each channel")
+    return [float(value) for value in values]
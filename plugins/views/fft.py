@@ -2,7 +2,9 @@ import endaq as ed
 import pandas as pd
 
 from app.plugins import viewmodelplugin
+from app.plugins.batching import stack, stackable_groups, unstack
 from app.plugins.options import DataOption, NumericOption
+from app.plugins.progress import Progress
 from app.views import ViewModel
 
 
@@ -25,12 +27,49 @@ class FFTPlugin(viewmodelplugin.ViewPlugin):
     def can_process(self, model: ViewModel) -> bool:
         return model.index_type in ("timedelta64",)
 
-    def process(self, model: ViewModel, **kwargs) -> ViewModel:
+    def process(
+        self, model: ViewModel, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
         min_x = kwargs.get("min_freq", 10)
         max_x = kwargs.get("max_freq", 1000)
+        progress = progress or Progress()
 
         df = model.df.dropna(how="any")
-        fft = ed.endaq.calc.fft.fft(df)
+        # Each column is transformed on its own so progress can be reported between them
+        columns = []
+        for i, col in enumerate(df.columns):
+            progress.check()
+            columns.append(ed.endaq.calc.fft.fft(df[[col]]))
+            progress.report((i + 1) / len(df.columns))
+        if columns:
+            fft = pd.concat(columns, axis="columns")
+        else:
+            fft = ed.endaq.calc.fft.fft(df)
+        return ViewModel(self._clamp(fft, min_x, max_x), y_axis="Magnitude")
+
+    def process_many(
+        self, models: list[ViewModel], progress: Progress | None = None, **kwargs
+    ) -> list[ViewModel]:
+        min_x = kwargs.get("min_freq", 10)
+        max_x = kwargs.get("max_freq", 1000)
+        progress = progress or Progress()
+
+        frames = [model.df.dropna(how="any") for model in models]
+        total = sum(df.shape[1] for df in frames) or 1
+        done = 0
+        results: list[ViewModel] = [None] * len(models) #type: ignore
+        for group in stackable_groups(frames):
+            progress.check()
+            inputs = [frames[i] for i in group]
+            # Transform every channel in the group at once
+            fft = self._clamp(ed.endaq.calc.fft.fft(stack(inputs)), min_x, max_x)
+            for i, df in zip(group, unstack(fft, inputs)):
+                results[i] = ViewModel(df, y_axis="Magnitude")
+            done += sum(df.shape[1] for df in inputs)
+            progress.report(done / total)
+        return results
+
+    @staticmethod
+    def _clamp(df: pd.DataFrame, min_x: float, max_x: float) -> pd.DataFrame:
         # Clamp to min / max values
-        fft = fft[(fft.index >= min_x) & (fft.index <= max_x)]
-        return ViewModel(fft, y_axis="Magnitude")
+        return df[(df.index >= min_x) & (df.index <= max_x)]
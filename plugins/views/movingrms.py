@@ -2,6 +2,8 @@ import pandas as pd
 
 from app.plugins import viewmodelplugin
 from app.plugins.options import DataOption, NumericOption
+from app.plugins.progress import Progress
+from app.plugins.streaming import ChunkContext, ChunkSpec
 from app.views import ViewModel
 
 
@@ -19,9 +21,24 @@ class MovingRms(viewmodelplugin.ViewPlugin):
     def can_process(self, model: ViewModel) -> bool:
         return model is not None
 
-    def process(self, model: ViewModel, **kwargs) -> ViewModel:
-        df = model.df
-        steps = kwargs.get("steps", 100)
-        n = int(df.shape[0] / steps)
-        df = df.abs().rolling(n).std().iloc[::n]
-        return ViewModel(df, y_axis=model.y_axis)
+    def chunk_spec(self, rows: int, sample_rate: float, **kwargs) -> ChunkSpec:
+        n = self._window(rows, kwargs.get("steps", 100))
+        # Read a full window before each chunk so the first rows are complete
+        return ChunkSpec(warm_up=n - 1)
+
+    def process_chunk(
+        self, chunk: pd.DataFrame, context: ChunkContext, **kwargs
+    ) -> pd.DataFrame:
+        n = self._window(context.rows, kwargs.get("steps", 100))
+        # Keep every nth row of the whole input rather than of the chunk
+        first = -context.first_row % n
+        return chunk.abs().rolling(n).std().iloc[first::n]
+
+    def process(
+        self, model: ViewModel, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
+        return self.process_chunked(model, progress, **kwargs)
+
+    @staticmethod
+    def _window(rows: int, steps: int) -> int:
+        return max(int(rows / steps), 1)
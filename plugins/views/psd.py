@@ -2,7 +2,9 @@ import endaq as ed
 import pandas as pd
 
 from app.plugins import viewmodelplugin
+from app.plugins.batching import stack, stackable_groups, unstack
 from app.plugins.options import DataOption, NumericOption, ListOption, ListOptionPair
+from app.plugins.progress import Progress
 from app.views import ViewModel
 
 
@@ -34,20 +36,56 @@ class PSDPlugin(viewmodelplugin.ViewPlugin):
     def can_process(self, model: ViewModel) -> bool:
         return model.index_type in ("timedelta64",)
 
-    def process(self, model: ViewModel, **kwargs) -> ViewModel:
+    def process(
+        self, model: ViewModel, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
         min_x = kwargs.pop("min_freq", 10)
         max_x = kwargs.pop("max_freq", 1000)
+        progress = progress or Progress()
 
         df = model.df.dropna(how="any")
-        psd = ed.endaq.calc.psd.welch(df, **kwargs)
+        # Each column is transformed on its own so progress can be reported between them
+        columns = []
+        for i, col in enumerate(df.columns):
+            progress.check()
+            columns.append(ed.endaq.calc.psd.welch(df[[col]], **kwargs))
+            progress.report((i + 1) / len(df.columns))
+        if columns:
+            psd = pd.concat(columns, axis="columns")
+        else:
+            psd = ed.endaq.calc.psd.welch(df, **kwargs)
         psd = psd[(psd.index >= min_x) & (psd.index <= max_x)]
-        y_axis = model.y_axis
+        return ViewModel(psd, y_axis=self._y_axis(model.y_axis))
 
+    def process_many(
+        self, models: list[ViewModel], progress: Progress | None = None, **kwargs
+    ) -> list[ViewModel]:
+        min_x = kwargs.pop("min_freq", 10)
+        max_x = kwargs.pop("max_freq", 1000)
+        progress = progress or Progress()
+
+        frames = [model.df.dropna(how="any") for model in models]
+        total = sum(df.shape[1] for df in frames) or 1
+        done = 0
+        results: list[ViewModel] = [None] * len(models) #type: ignore
+        for group in stackable_groups(frames):
+            progress.check()
+            inputs = [frames[i] for i in group]
+            # Transform every channel in the group at once
+            psd = ed.endaq.calc.psd.welch(stack(inputs), **kwargs)
+            psd = psd[(psd.index >= min_x) & (psd.index <= max_x)]
+            for i, df in zip(group, unstack(psd, inputs)):
+                results[i] = ViewModel(df, y_axis=self._y_axis(models[i].y_axis))
+            done += sum(df.shape[1] for df in inputs)
+            progress.report(done / total)
+        return results
+
+    @staticmethod
+    def _y_axis(y_axis: str) -> str:
         # PSD results in the same y-axis units but squared per Hz.
         # Find the closing parentheses that contains the unit and add "^2/Hz" to it.
         # Example: "Acceleration (g)" becomes "Acceleration (g^2/Hz)""
         index = y_axis.rfind(")")
         if index > 0:
             y_axis = f"{y_axis[:index]}^2/Hz)"
-
-        return ViewModel(psd, y_axis=y_axis)
+        return y_axis
@@ -4,11 +4,17 @@ import pandas as pd
 from PySide6.QtGui import QIcon
 
 from app.plugins import viewmodelplugin
+from app.plugins.batching import sample_spacing, stack, stackable_groups, unstack
 from app.plugins.options import DataOption, NumericOption, ListOption, ListOptionPair
+from app.plugins.progress import Progress
 from app.views import ViewModel
 
 
 class SRSPlugin(viewmodelplugin.ViewPlugin):
+    bins_per_octave = 12
+    # Recordings longer than this many seconds are only calculated around their peaks
+    max_time = 2.0
+
     @property
     def name(self) -> str:
         return "SRS"
@@ -35,17 +41,64 @@ class SRSPlugin(viewmodelplugin.ViewPlugin):
     def can_process(self, model: ViewModel) -> bool:
         return model.index_type in ("timedelta64",)
 
-    def process(self, model: ViewModel, **kwargs) -> ViewModel:
+    def process(
+        self, model: ViewModel, progress: Progress | None = None, **kwargs
+    ) -> ViewModel:
+        df = model.df.dropna(how="any")
+        srs = self._shock_spectrum(df, progress or Progress(), **kwargs)
+        return ViewModel(srs, y_axis="Peak Acceleration (g)")
+
+    def process_many(
+        self, models: list[ViewModel], progress: Progress | None = None, **kwargs
+    ) -> list[ViewModel]:
+        progress = progress or Progress()
+        frames = [model.df.dropna(how="any") for model in models]
+        groups = []
+        for group in stackable_groups(frames):
+            df = frames[group[0]]
+            # Longer recordings are only calculated around the peaks found across
+            # all of their channels, so stacking them would change the results.
+            if len(df) * (sample_spacing(df) or 0) > self.max_time:
+                groups += [[i] for i in group]
+            else:
+                groups.append(group)
+
+        total = sum(df.shape[1] for df in frames) or 1
+        done = 0
+        results: list[ViewModel] = [None] * len(models) #type: ignore
+        for group in groups:
+            inputs = [frames[i] for i in group]
+            size = sum(df.shape[1] for df in inputs)
+            part = progress.sub(done / total, (done + size) / total)
+            srs = self._shock_spectrum(stack(inputs), part, **kwargs)
+            for i, df in zip(group, unstack(srs, inputs)):
+                results[i] = ViewModel(df, y_axis="Peak Acceleration (g)")
+            done += size
+        return results
+
+    def _shock_spectrum(self, df: pd.DataFrame, progress: Progress, **kwargs) -> pd.DataFrame:
         min_x = kwargs.pop("min_freq", 10)
         max_x = kwargs.pop("max_freq", 1000)
         dampening = kwargs.pop("dampening", 5) / 100
-        df = model.df.dropna(how="any")
-        srs = ed.endaq.calc.shock.shock_spectrum(
-            df,
-            damp=dampening,
-            init_freq=min_x,
-            **kwargs,
+
+        # Calculate an octave of frequencies at a time so progress
+        # can be reported and the calculation stopped between them.
+        freqs = ed.endaq.calc.utils.logfreqs(
+            df, init_freq=min_x, bins_per_octave=self.bins_per_octave
         )
-        # Clamp to max value. init_freq parameter will handle min value.
-        srs = srs[srs.index <= max_x]
-        return ViewModel(srs, y_axis="Peak Acceleration (g)")
+        # Only calculate up to the max value. init_freq handles the min value.
+        freqs = freqs[freqs <= max_x]
+        blocks = []
+        for start in range(0, len(freqs), self.bins_per_octave):
+            progress.check()
+            blocks.append(
+                ed.endaq.calc.shock.shock_spectrum(
+                    df,
+                    freqs=freqs[start : start + self.bins_per_octave],
+                    damp=dampening,
+                    max_time=self.max_time,
+                    **kwargs,
+                )
+            )
+            progress.report(min(start + self.bins_per_octave, len(freqs)) / len(freqs))
+        return pd.concat(blocks) if blocks else pd.DataFrame(columns=df.columns)